@@ -0,0 +1,198 @@
+# cache.py
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from . import __version__
+from .io import _json_default, load_arrays, save_arrays
+from .waveform import generate_waveform
+
+
+def hash_inputs(*parts):
+    """
+    Return a stable SHA-256 hex digest of the given inputs.
+
+    Arrays are hashed by dtype, shape and content; other values by their JSON
+    representation, with dictionary keys sorted.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            part = np.ascontiguousarray(part)
+            digest.update(f"array:{part.dtype.str}:{part.shape}:".encode())
+            digest.update(part.view(np.uint8).data)
+        else:
+            text = json.dumps(part, sort_keys=True, default=_json_default)
+            digest.update(f"json:{text}:".encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache of arrays keyed by a hash of the inputs that produced them.
+
+    Recently used entries are kept in memory, up to `max_items`. With a `path`,
+    entries are also written to disk, one `npy` directory per key, and read back
+    memory-mapped. The least recently used directories are removed once the
+    directory grows beyond `max_bytes`.
+
+    Cached arrays are shared between hits and are read-only.
+
+    Parameters:
+    - path (str): Directory of the on-disk tier (default: None, memory only).
+    - max_items (int): Number of entries kept in memory (default: 32).
+    - max_bytes (int): Size cap of the on-disk tier in bytes (default: 1 GiB).
+
+    Attributes:
+    - hits, misses (int): Number of lookups that found or missed an entry.
+    - memory_hits, disk_hits (int): Hits served by each tier.
+    - evictions (int): Number of entries removed from the on-disk tier.
+    """
+
+    def __init__(self, path=None, max_items=32, max_bytes=1 << 30):
+        self.path = None if path is None else os.fspath(path)
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        if self.path is not None:
+            os.makedirs(self.path, exist_ok=True)
+
+    @property
+    def stats(self):
+        """
+        Counters of the cache as a dictionary.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+        }
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        Look up an entry.
+
+        Returns:
+        - entry (tuple): `(arrays, metadata)` stored under `key`, or None.
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            self.memory_hits += 1
+            return self._memory[key]
+
+        if self.path is not None:
+            entry_path = os.path.join(self.path, key)
+            if os.path.isdir(entry_path):
+                entry = load_arrays(entry_path, mmap=True, format="npy")
+                # The modification time orders the entries for eviction
+                os.utime(entry_path)
+                self._remember(key, entry)
+                self.hits += 1
+                self.disk_hits += 1
+                return entry
+
+        self.misses += 1
+        return None
+
+    def put(self, key, arrays, metadata=None):
+        """
+        Store read-only copies of `arrays` and JSON metadata under `key`.
+
+        Returns:
+        - entry (tuple): The cached `(arrays, metadata)`.
+        """
+        arrays = {name: np.array(array) for name, array in arrays.items()}
+        for array in arrays.values():
+            array.flags.writeable = False
+        entry = (arrays, dict(metadata or {}))
+        self._remember(key, entry)
+
+        if self.path is not None:
+            # Write to a unique directory first, then move it into place
+            tmp_path = os.path.join(self.path, f".tmp-{uuid.uuid4().hex}")
+            save_arrays(tmp_path, arrays, entry[1], format="npy")
+            entry_path = os.path.join(self.path, key)
+            try:
+                os.replace(tmp_path, entry_path)
+            except OSError:
+                # Stored concurrently under the same key
+                shutil.rmtree(tmp_path, ignore_errors=True)
+            self._evict()
+        return entry
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.path):
+            entry_path = os.path.join(self.path, name)
+            if name.startswith(".") or not os.path.isdir(entry_path):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(entry_path, f))
+                for f in os.listdir(entry_path)
+            )
+            entries.append((os.path.getmtime(entry_path), size, name))
+            total += size
+
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+            self._memory.pop(name, None)
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Remove all entries from both tiers.
+        """
+        self._memory.clear()
+        if self.path is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.makedirs(self.path, exist_ok=True)
+
+    def waveform(self, t_array, r1_array, r2_array, m1, m2, function=None):
+        """
+        Cached `generate_waveform` (or `function` with the same signature).
+
+        The key is a hash of the trajectory arrays, the masses, the name of the
+        function and the package version.
+
+        Returns:
+        - h_plus, h_cross (numpy.ndarray): Polarizations of the waveform.
+        """
+        function = generate_waveform if function is None else function
+        key = hash_inputs(
+            function.__module__ + "." + function.__qualname__,
+            __version__,
+            np.asarray(t_array),
+            np.asarray(r1_array),
+            np.asarray(r2_array),
+            m1,
+            m2,
+        )
+        entry = self.get(key)
+        if entry is None:
+            h_plus, h_cross = function(t_array, r1_array, r2_array, m1, m2)
+            entry = self.put(key, {"h_plus": h_plus, "h_cross": h_cross})
+        return entry[0]["h_plus"], entry[0]["h_cross"]
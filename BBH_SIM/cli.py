@@ -0,0 +1,213 @@
+# cli.py
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from .io import _json_default
+from .simulation import BBHSimulation
+from .sweep import parameter_grid
+from .waveform import generate_waveform
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+_INIT_KEYS = ("r1_init", "r2_init", "v1_init", "v2_init", "spin1", "spin2")
+PLOTS = ("orbits_2d", "orbits_3d", "waveform")
+
+
+def load_job(path):
+    """
+    Read a job file and expand it into the parameters of its runs.
+
+    The file is JSON, or TOML for a `.toml` extension. Its `simulation` table
+    holds `BBHSimulation` arguments. An optional `grid` table maps argument names
+    to lists of values; every point of their Cartesian product is run with the
+    `simulation` arguments as defaults. The remaining keys are options:
+    `output` (directory, default: `bbh_output`), `format` (`npz` or `npy`,
+    default: `npz`), `waveform` (default: true), `velocities` (default: false)
+    and `plot` (list of plot names, default: none).
+
+    Parameters:
+    - path (str): Path of the job file.
+
+    Returns:
+    - job (dict): The options of the job, with the run parameters in `runs`.
+    """
+    if os.path.splitext(path)[1].lower() == ".toml":
+        if tomllib is None:
+            raise ValueError("Reading TOML job files requires Python 3.11 or tomli.")
+        with open(path, "rb") as f:
+            job = tomllib.load(f)
+    else:
+        with open(path) as f:
+            job = json.load(f)
+
+    base = job.pop("simulation", {})
+    grid = job.pop("grid", None)
+    runs = [dict(base, **point) for point in parameter_grid(grid)] if grid else [base]
+    plots = job.get("plot", [])
+    unknown = set(plots) - set(PLOTS)
+    if unknown:
+        raise ValueError(f"Invalid plots: {sorted(unknown)}. Supported are {PLOTS}.")
+
+    job.setdefault("output", "bbh_output")
+    job.setdefault("format", "npz")
+    job.setdefault("waveform", True)
+    job.setdefault("velocities", False)
+    job["plot"] = plots
+    job["runs"] = runs
+    return job
+
+
+def _plot(simulation, waveform, plots, prefix):
+    # matplotlib is only imported when a plot is requested
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    from . import visualization
+
+    for name in plots:
+        save_path = f"{prefix}_{name}.png"
+        if name == "waveform":
+            h_plus, h_cross = waveform
+            visualization.plot_waveform(
+                simulation.t_array, h_plus, h_cross, show=False, save_path=save_path
+            )
+        else:
+            plot = getattr(visualization, f"plot_{name}")
+            plot(
+                simulation.r1_array,
+                simulation.r2_array,
+                show=False,
+                save_path=save_path,
+            )
+        plt.close("all")
+
+
+def run_job(job, progress=None):
+    """
+    Run every simulation of a job and write its outputs.
+
+    Each run `i` is saved as `run_<i>` in the output directory, with its waveform
+    and any requested plots, and a `summary.json` file records the parameters,
+    step counts and timings of all runs.
+
+    Parameters:
+    - job (dict): Job returned by `load_job`.
+    - progress (callable): Called as `progress(i, record)` after each run
+      (default: None).
+
+    Returns:
+    - summary (dict): The contents of `summary.json`.
+    """
+    output = job["output"]
+    os.makedirs(output, exist_ok=True)
+    extension = ".npz" if job["format"] == "npz" else ""
+    records = []
+    t_job = time.perf_counter()
+
+    for i, params in enumerate(job["runs"]):
+        kwargs = dict(params)
+        for key in _INIT_KEYS:
+            if kwargs.get(key) is not None:
+                kwargs[key] = np.array(kwargs[key], dtype=float)
+        prefix = os.path.join(output, f"run_{i:04d}")
+
+        t0 = time.perf_counter()
+        simulation = BBHSimulation(**kwargs)
+        simulation.run(velocities=job["velocities"])
+        t1 = time.perf_counter()
+        waveform = None
+        if job["waveform"] or "waveform" in job["plot"]:
+            waveform = generate_waveform(
+                simulation.t_array,
+                simulation.r1_array,
+                simulation.r2_array,
+                simulation.m1,
+                simulation.m2,
+            )
+        t2 = time.perf_counter()
+        simulation.save_data(
+            prefix + extension,
+            format=job["format"],
+            waveform=waveform if job["waveform"] else None,
+        )
+        t3 = time.perf_counter()
+        if job["plot"]:
+            _plot(simulation, waveform, job["plot"], prefix)
+        t4 = time.perf_counter()
+
+        record = {
+            "run": i,
+            "file": os.path.basename(prefix + extension),
+            "params": params,
+            "n_samples": len(simulation.t_array),
+            "termination": simulation.termination,
+            "step_stats": simulation.step_stats,
+            "timings": {
+                "simulation": t1 - t0,
+                "waveform": t2 - t1,
+                "save": t3 - t2,
+                "plot": t4 - t3,
+                "total": t4 - t0,
+            },
+        }
+        records.append(record)
+        if progress is not None:
+            progress(i, record)
+
+    summary = {"elapsed": time.perf_counter() - t_job, "runs": records}
+    with open(os.path.join(output, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2, default=_json_default)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="bbh-sim", description="Run BBH_SIM simulations from a job file."
+    )
+    parser.add_argument("job", help="JSON or TOML job file")
+    parser.add_argument("-o", "--output", help="output directory (overrides the job)")
+    parser.add_argument(
+        "--format", choices=("npz", "npy"), help="output format (overrides the job)"
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="no progress output")
+    args = parser.parse_args(argv)
+
+    try:
+        job = load_job(args.job)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    if args.output is not None:
+        job["output"] = args.output
+    if args.format is not None:
+        job["format"] = args.format
+
+    def progress(i, record):
+        timings = record["timings"]
+        print(
+            f"run {i:4d}: {record['n_samples']} samples in {timings['total']:.3f} s "
+            f"(simulation {timings['simulation']:.3f} s)",
+            flush=True,
+        )
+
+    summary = run_job(job, None if args.quiet else progress)
+    if not args.quiet:
+        print(f"{len(summary['runs'])} run(s) in {summary['elapsed']:.3f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
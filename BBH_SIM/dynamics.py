@@ -6,64 +6,146 @@ G = 6.67430e-11  # Gravitational constant
 c = 3.0e8  # Speed of light
 
 
-def compute_acceleration(r, v, m1, m2, pn_order=1, radiation=False, spins=None):
-    r_mag = np.linalg.norm(r)
-    v_mag = np.linalg.norm(v)
-
-    # Newtonian acceleration
-    a_newton = -G * (m1 + m2) / r_mag**3 * r
-
-    # Post-Newtonian corrections
-    a_pn = np.zeros(3)
-    if pn_order >= 1:
-        a_pn += compute_1pn_correction(r, v, r_mag, v_mag, m1, m2)
-    if pn_order >= 2:
-        a_pn += compute_2pn_correction(r, v, r_mag, v_mag, m1, m2)
+# All force terms accept either a single binary (r, v of shape (3,), scalar masses)
+# or a stack of N binaries (r, v of shape (N, 3), masses of shape (N,)). Scalars are
+# lifted onto a trailing axis so they broadcast against the vector components.
+def _col(x):
+    return np.asarray(x)[..., np.newaxis]
+
+
+def _dot(a, b):
+    return np.einsum("...i,...i->...", a, b)
+
+
+class ForceModel:
+    """
+    Relative acceleration of a binary with all constant coefficients precomputed.
+
+    The model is built once from the masses and the enabled effects and keeps only
+    the enabled terms in `terms`, so evaluating it does no work for disabled
+    corrections. Like the free functions, it accepts a single binary or a stack of
+    N binaries (masses and spins with a leading axis of length N).
+
+    Parameters:
+    - m1, m2 (float or numpy.ndarray): Masses of the black holes.
+    - pn_order (int): Post-Newtonian order (default: 1).
+    - radiation (bool): Whether to include radiation reaction (default: False).
+    - spins (tuple): Spin vectors `(s1, s2)` of the black holes (default: None).
+    """
+
+    def __init__(self, m1, m2, pn_order=1, radiation=False, spins=None):
+        self.m1 = m1
+        self.m2 = m2
+        self.pn_order = pn_order
+        self.radiation = radiation
+        self.spins = spins
+
+        self._gm = _col(G * (m1 + m2))
+        self.terms = []
+        if pn_order >= 1:
+            self.terms.append(self._1pn)
+        if pn_order >= 2:
+            self.terms.append(self._2pn)
+        if radiation:
+            self._rad = _col(-32 / 5 * G**3 * m1 * m2 * (m1 + m2) / c**5)
+            self.terms.append(self._radiation_reaction)
+        if spins is not None:
+            s1, s2 = spins
+            # cross(v, s1) + cross(v, s2) == cross(v, s1 + s2)
+            self._spin = 2 * G / c**2 * (np.asarray(s1) + np.asarray(s2))
+            self.terms.append(self._spin_effects)
+
+    def __call__(self, r, v, out=None):
+        """
+        Evaluate the acceleration for separation `r` and relative velocity `v`.
+
+        Parameters:
+        - r (numpy.ndarray): Separation vector(s), shape (3,) or (N, 3).
+        - v (numpy.ndarray): Relative velocity vector(s), same shape as `r`.
+        - out (numpy.ndarray): Optional buffer to write the result into.
+
+        Returns:
+        - a (numpy.ndarray): Acceleration, shaped like `r`.
+        """
+        r = np.asarray(r, dtype=float)
+        v = np.asarray(v, dtype=float)
+        r_mag = _col(np.sqrt(_dot(r, r)))
+        v_sq = _col(_dot(v, v))
+        r_dot_v = _col(_dot(r, v))
+        u = self._gm / r_mag
+
+        # Newtonian acceleration
+        if out is None:
+            out = np.multiply(-u / r_mag**2, r)
+        else:
+            np.multiply(-u / r_mag**2, r, out=out)
+
+        for term in self.terms:
+            term(r, v, r_mag, v_sq, r_dot_v, u, out)
+        return out
+
+    def _1pn(self, r, v, r_mag, v_sq, r_dot_v, u, out):
+        k = u / (c**2 * r_mag)
+        out += k * (4 * u - v_sq) * r
+        out += k * 4 * r_dot_v * v
+
+    def _2pn(self, r, v, r_mag, v_sq, r_dot_v, u, out):
+        k = u / (c**4 * r_mag)
+        out += k * u * (-8 * v_sq - 12 * u) * r
+        out += k * 4 * (v_sq - 3 * u) * r_dot_v * v
+
+    def _radiation_reaction(self, r, v, r_mag, v_sq, r_dot_v, u, out):
+        k = self._rad / r_mag**4
+        out += k * v
+        out += k * 1.5 * r_dot_v / r_mag * r
+
+    def _spin_effects(self, r, v, r_mag, v_sq, r_dot_v, u, out):
+        out += np.cross(v, self._spin) / r_mag**3
 
-    # Radiation reaction correction
-    a_rad_reaction = np.zeros(3)
-    if radiation:
-        a_rad_reaction = compute_radiation_reaction(r, v, r_mag, m1, m2)
 
-    # Spin effects (simplified)
-    a_spin = np.zeros(3)
-    if spins is not None:
-        a_spin = compute_spin_effects(r, v, r_mag, spins)
-
-    return a_newton + a_pn + a_rad_reaction + a_spin
+def compute_acceleration(r, v, m1, m2, pn_order=1, radiation=False, spins=None):
+    if pn_order < 1 and not radiation and spins is None:
+        # Newtonian only; building a ForceModel would cost more than the call
+        r = np.asarray(r, dtype=float)
+        r_mag = _col(np.sqrt(_dot(r, r)))
+        u = _col(G * (m1 + m2)) / r_mag
+        return np.multiply(-u / r_mag**2, r)
+    return ForceModel(m1, m2, pn_order, radiation, spins)(r, v)
 
 
 def compute_1pn_correction(r, v, r_mag, v_mag, m1, m2):
+    gm = _col(G * (m1 + m2))
+    r_mag = _col(r_mag)
+    v_mag = _col(v_mag)
     return (
-        G
-        * (m1 + m2)
+        gm
         / (c**2 * r_mag**2)
-        * ((4 * G * (m1 + m2) / r_mag - v_mag**2) * r + 4 * np.dot(r, v) * v)
+        * ((4 * gm / r_mag - v_mag**2) * r + 4 * _col(_dot(r, v)) * v)
     )
 
 
 def compute_2pn_correction(r, v, r_mag, v_mag, m1, m2):
+    gm = _col(G * (m1 + m2))
+    r_mag = _col(r_mag)
+    v_mag = _col(v_mag)
     return (
-        G
-        * (m1 + m2)
+        gm
         / (c**4 * r_mag**2)
         * (
-            ((2 * G * (m1 + m2) / r_mag) * (2 * v_mag**2 - 9 * G * (m1 + m2) / r_mag))
-            * r
-            + (v_mag**2 - 3 * G * (m1 + m2) / r_mag) * 4 * np.dot(r, v) * v
-            - (3 * G * (m1 + m2) / r_mag)
-            * (4 * v_mag**2 - 2 * G * (m1 + m2) / r_mag)
-            * r
+            ((2 * gm / r_mag) * (2 * v_mag**2 - 9 * gm / r_mag)) * r
+            + (v_mag**2 - 3 * gm / r_mag) * 4 * _col(_dot(r, v)) * v
+            - (3 * gm / r_mag) * (4 * v_mag**2 - 2 * gm / r_mag) * r
         )
     )
 
 
 def compute_radiation_reaction(r, v, r_mag, m1, m2):
-    v_dot_r = np.dot(v, r)
+    r_mag = _col(r_mag)
+    v_dot_r = _col(_dot(v, r))
     return (
         -32
         / 5
-        * (G**3 * m1 * m2 * (m1 + m2))
+        * _col(G**3 * m1 * m2 * (m1 + m2))
         / (c**5 * r_mag**4)
         * (v + 3 / 2 * v_dot_r / r_mag * r)
     )
@@ -71,6 +153,7 @@ def compute_radiation_reaction(r, v, r_mag, m1, m2):
 
 def compute_spin_effects(r, v, r_mag, spins):
     s1, s2 = spins
+    r_mag = _col(r_mag)
     return (G / c**2) * (
         2 * np.cross(v, s1) / r_mag**3 + 2 * np.cross(v, s2) / r_mag**3
     )
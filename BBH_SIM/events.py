@@ -0,0 +1,177 @@
+# events.py
+
+import types
+
+import numpy as np
+
+from .dynamics import G, c
+
+
+class Event:
+    """
+    Event triggered when `function(t, r, v)` changes sign during a step.
+
+    `r` and `v` are the separation vector r2 - r1 and its time derivative. The
+    time of the sign change is located by root-finding on the interpolated
+    trajectory inside the step. A terminal event stops the integration there;
+    a non-terminal one is only recorded.
+
+    Parameters:
+    - function (callable): Function `function(t, r, v)` returning a float.
+    - terminal (bool): Whether to stop the integration (default: True).
+    - direction (int): Only trigger on decreasing (-1) or increasing (+1) values,
+      or on both (0) (default: 0).
+    - name (str): Name used in the event log (default: the function name).
+    """
+
+    # Locate the event time inside the step; otherwise the event is placed at
+    # the start of the step
+    locate = True
+
+    def __init__(self, function, terminal=True, direction=0, name=None):
+        self.function = function
+        self.terminal = terminal
+        self.direction = direction
+        self.name = getattr(function, "__name__", "event") if name is None else name
+
+    def __call__(self, t, r, v):
+        return self.function(t, r, v)
+
+    def _identity(self):
+        # Description of the event for cache keys. Values without a stable repr,
+        # such as objects captured in a closure, only cause cache misses.
+        identity = {
+            "type": type(self).__qualname__,
+            "name": self.name,
+            "terminal": self.terminal,
+            "direction": self.direction,
+            "locate": self.locate,
+        }
+        function = self.function
+        code = getattr(function, "__code__", None)
+        if code is None:
+            identity["function"] = repr(function)
+            return identity
+        identity["function"] = f"{function.__module__}.{function.__qualname__}"
+        identity["code"] = code.co_code.hex()
+        identity["constants"] = [
+            const.co_code.hex() if isinstance(const, types.CodeType) else repr(const)
+            for const in code.co_consts
+        ]
+        identity["closure"] = [
+            repr(cell.cell_contents) for cell in function.__closure__ or ()
+        ]
+        identity["defaults"] = repr(function.__defaults__)
+        return identity
+
+    def triggered(self, g0, g1):
+        """
+        Whether the values `g0` and `g1` at the ends of a step trigger the event.
+        """
+        if self.direction <= 0 and g0 > 0 >= g1:
+            return True
+        return self.direction >= 0 and g0 < 0 <= g1
+
+
+def separation_event(r_min, terminal=True, name="separation"):
+    """
+    Event triggered when the separation falls below `r_min`.
+    """
+    return Event(
+        lambda t, r, v: np.sqrt(np.dot(r, r)) - r_min,
+        terminal=terminal,
+        direction=-1,
+        name=name,
+    )
+
+
+def merger_event(m1, m2, multiple=2.0, terminal=True):
+    """
+    Event triggered when the separation falls below `multiple` times the
+    total-mass radius G (m1 + m2) / c^2 (default: the Schwarzschild radius).
+    """
+    return separation_event(multiple * G * (m1 + m2) / c**2, terminal, "merger")
+
+
+def isco_event(m1, m2, terminal=True):
+    """
+    Event triggered when the separation falls below the innermost stable circular
+    orbit of the total mass, 6 G (m1 + m2) / c^2.
+    """
+    return separation_event(6 * G * (m1 + m2) / c**2, terminal, "isco")
+
+
+class NonFiniteEvent(Event):
+    """
+    Terminal event triggered when the state stops being finite.
+
+    The event is placed at the start of the step, the last finite state.
+    """
+
+    locate = False
+
+    def __init__(self):
+        super().__init__(self._finite, terminal=True, direction=-1, name="nonfinite")
+
+    @staticmethod
+    def _finite(t, r, v):
+        return 1.0 if np.all(np.isfinite(r)) and np.all(np.isfinite(v)) else -1.0
+
+
+def locate_root(function, t0, t1, g0, g1, xtol=None, max_iter=100):
+    """
+    Locate a sign change of `function` between `t0` and `t1` (Illinois method).
+
+    Parameters:
+    - function (callable): Function of the time.
+    - t0, t1 (float): Bracket of the root.
+    - g0, g1 (float): Values of `function` at `t0` and `t1`; `g0` is nonzero
+      and `g1` is zero or of the opposite sign.
+    - xtol (float): Tolerance on the time (default: None, 4 ulp of the bracket).
+    - max_iter (int): Maximum number of iterations (default: 100).
+
+    Returns:
+    - t (float): Time of the sign change, the end of a bracket of width `xtol`
+      at which `function` has taken its new sign.
+    """
+    if xtol is None:
+        xtol = 4 * np.finfo(float).eps * max(abs(t0), abs(t1))
+    side = 0
+    for _ in range(max_iter):
+        if abs(t1 - t0) <= xtol or g1 == 0:
+            break
+        t = t1 - g1 * (t1 - t0) / (g1 - g0) if g1 != g0 else 0.5 * (t0 + t1)
+        if not t0 < t < t1 and not t1 < t < t0:
+            t = 0.5 * (t0 + t1)
+        g = function(t)
+        # g0 is never zero, so zero counts as the new sign
+        if (g > 0) != (g0 > 0) or g == 0:
+            t1, g1 = t, g
+            if side == -1:
+                g0 *= 0.5
+            side = -1
+        else:
+            t0, g0 = t, g
+            if side == 1:
+                g1 *= 0.5
+            side = 1
+    return t1
+
+
+def peters_time(m1, m2, a, e=0.0):
+    """
+    Coalescence time of a binary by gravitational radiation (Peters 1964).
+
+    Uses the circular-orbit result, scaled by (1 - e^2)^(7/2) for eccentric
+    orbits, which is accurate at low eccentricity.
+
+    Parameters:
+    - m1, m2 (float): Masses of the black holes.
+    - a (float): Semi-major axis (for a circular orbit, the separation).
+    - e (float): Eccentricity (default: 0.0).
+
+    Returns:
+    - t (float): Time to coalescence.
+    """
+    t_circular = 5 / 256 * c**5 * a**4 / (G**3 * m1 * m2 * (m1 + m2))
+    return t_circular * (1 - e**2) ** 3.5
@@ -0,0 +1,224 @@
+# hybrid.py
+
+import numpy as np
+
+from .dynamics import G, c
+from .events import peters_time
+from .simulation import BBHSimulation
+
+
+def _decay_rate(m1, m2):
+    # d(a^4)/dt = -4 * beta for a circular orbit (Peters 1964)
+    return 64 / 5 * G**3 * m1 * m2 * (m1 + m2) / c**5
+
+
+def peters_separation(m1, m2, a0, t):
+    """
+    Separation of a circular binary after orbit-averaged gravitational-wave decay.
+
+    Parameters:
+    - m1, m2 (float): Masses of the black holes.
+    - a0 (float): Initial separation.
+    - t (float or numpy.ndarray): Time elapsed since the separation was `a0`.
+
+    Returns:
+    - a (float or numpy.ndarray): Separation, zero after coalescence.
+    """
+    a4 = a0**4 - 4 * _decay_rate(m1, m2) * np.asarray(t, dtype=float)
+    return np.maximum(a4, 0.0) ** 0.25
+
+
+def peters_phase(m1, m2, a0, t, phase=0.0):
+    """
+    Orbital phase of a circular binary decaying as `peters_separation`.
+
+    The Keplerian angular frequency sqrt(G (m1 + m2) / a^3) is integrated in
+    closed form along the decay.
+
+    Parameters:
+    - m1, m2 (float): Masses of the black holes.
+    - a0 (float): Initial separation.
+    - t (float or numpy.ndarray): Time elapsed since the separation was `a0`.
+    - phase (float): Initial phase in radians (default: 0.0).
+
+    Returns:
+    - phi (float or numpy.ndarray): Orbital phase in radians.
+    """
+    a = peters_separation(m1, m2, a0, t)
+    k = 2 * np.sqrt(G * (m1 + m2)) / (5 * _decay_rate(m1, m2))
+    return phase + k * (a0**2.5 - a**2.5)
+
+
+def orbit_state(m1, m2, a, phi):
+    """
+    Separation vector and relative velocity of a quasi-circular orbit in the x-y
+    plane, including the radial velocity of the gravitational-wave decay.
+
+    Parameters:
+    - m1, m2 (float): Masses of the black holes.
+    - a (float or numpy.ndarray): Separation.
+    - phi (float or numpy.ndarray): Orbital phase in radians.
+
+    Returns:
+    - r, v (numpy.ndarray): Separation r2 - r1 and its time derivative, shape
+      (3,) or (len(a), 3).
+    """
+    a = np.asarray(a, dtype=float)
+    phi = np.asarray(phi, dtype=float)
+    omega = np.sqrt(G * (m1 + m2) / a**3)
+    a_dot = -_decay_rate(m1, m2) / a**3
+    radial = np.stack((np.cos(phi), np.sin(phi), np.zeros_like(phi)), axis=-1)
+    tangential = np.stack((-np.sin(phi), np.cos(phi), np.zeros_like(phi)), axis=-1)
+    r = a[..., np.newaxis] * radial
+    v = (a_dot[..., np.newaxis] * radial) + (a * omega)[..., np.newaxis] * tangential
+    return r, v
+
+
+class HybridSimulation:
+    """
+    Circular inspiral evolved orbit-averaged until a handover point, then
+    integrated directly by `BBHSimulation` for the final orbits.
+
+    Up to the handover, the separation and phase follow the leading-order
+    orbit-averaged evolution (`peters_separation`, `peters_phase`), evaluated in
+    closed form at the output times, so the early inspiral costs nothing per
+    orbit. The handover happens when the separation reaches
+    `handover_separation` or the gravitational-wave frequency (twice the orbital
+    frequency) reaches `handover_frequency`. The state there seeds a
+    `BBHSimulation`, whose samples hold the state at exactly their time, so the
+    trajectory and the waveforms computed from it are continuous at the seam.
+    The direct integration runs in the `attractive` mode of `BBHSimulation`, so
+    the circular orbit stays bound after the handover.
+
+    The orbit lies in the x-y plane with the centre of mass at the origin, where
+    `BBHSimulation` keeps it.
+
+    Parameters:
+    - m1, m2 (float): Masses of the black holes.
+    - separation (float): Initial separation.
+    - t_start (float): Start time.
+    - t_end (float or str): End time, or `'peters'` for the coalescence time.
+    - dt (float): Output interval of the direct integration, and its step size.
+    - handover_separation (float): Separation at which to hand over.
+    - handover_frequency (float): Gravitational-wave frequency at which to hand
+      over, used when `handover_separation` is None.
+    - phase (float): Initial orbital phase in radians (default: 0.0).
+    - early_dt (float): Output interval of the orbit-averaged part (default: dt).
+    - **kwargs: Further `BBHSimulation` options for the direct integration, e.g.
+      `pn_order`, `radiation`, `integrator` or `events`.
+    """
+
+    def __init__(
+        self,
+        m1,
+        m2,
+        separation,
+        t_start,
+        t_end,
+        dt,
+        handover_separation=None,
+        handover_frequency=None,
+        phase=0.0,
+        early_dt=None,
+        **kwargs,
+    ):
+        if handover_separation is None:
+            if handover_frequency is None:
+                raise ValueError(
+                    "Either handover_separation or handover_frequency is required."
+                )
+            omega = np.pi * handover_frequency
+            handover_separation = (G * (m1 + m2) / omega**2) ** (1 / 3)
+        if "output_times" in kwargs or "record_every" in kwargs:
+            raise ValueError(
+                "The output grid of a hybrid run is set by dt and early_dt."
+            )
+        if isinstance(t_end, str):
+            if t_end != "peters":
+                raise ValueError(f"Invalid t_end: {t_end}. Use a number or 'peters'.")
+            t_end = t_start + peters_time(m1, m2, separation)
+
+        self.m1 = m1
+        self.m2 = m2
+        self.separation = separation
+        self.t_start = t_start
+        self.t_end = t_end
+        self.dt = dt
+        self.early_dt = dt if early_dt is None else early_dt
+        self.phase = phase
+        self.handover_separation = handover_separation
+        self.options = kwargs
+
+        # Time at which the orbit-averaged separation reaches the handover
+        a4 = max(separation**4 - handover_separation**4, 0.0)
+        self.t_handover = t_start + a4 / (4 * _decay_rate(m1, m2))
+
+        self.simulation = None
+        self.t_array = []
+        self.r1_array = []
+        self.r2_array = []
+        self.r1_array_2d = []
+        self.r2_array_2d = []
+        self.v1_array = None
+        self.v2_array = None
+        self.n_early = 0
+
+    def orbit(self, t):
+        """
+        Orbit-averaged separation vector and relative velocity at times `t`.
+        """
+        elapsed = np.asarray(t, dtype=float) - self.t_start
+        a = peters_separation(self.m1, self.m2, self.separation, elapsed)
+        phi = peters_phase(self.m1, self.m2, self.separation, elapsed, self.phase)
+        return orbit_state(self.m1, self.m2, a, phi)
+
+    def _bodies(self, r, v):
+        # Positions and velocities of the bodies about the centre of mass
+        share1 = self.m2 / (self.m1 + self.m2)
+        share2 = self.m1 / (self.m1 + self.m2)
+        return -share1 * r, share2 * r, -share1 * v, share2 * v
+
+    def run(self, velocities=False, chunk_size=4096):
+        """
+        Evolve the early inspiral and integrate the rest of the run.
+
+        Parameters:
+        - velocities (bool): Also store `v1_array` and `v2_array` (default: False).
+        - chunk_size (int): Chunk size of the direct integration (default: 4096).
+        """
+        t_early = np.arange(self.t_start, self.t_end + self.early_dt, self.early_dt)
+        t_early = t_early[t_early < self.t_handover]
+        self.n_early = len(t_early)
+
+        parts = [(t_early, *self._bodies(*self.orbit(t_early)))]
+        if self.t_handover <= self.t_end:
+            r1, r2, v1, v2 = self._bodies(*self.orbit(self.t_handover))
+            output_times = np.arange(self.t_handover, self.t_end + self.dt, self.dt)
+            options = dict(self.options, attractive=True)
+            self.simulation = BBHSimulation(
+                self.m1,
+                self.m2,
+                r1,
+                r2,
+                v1,
+                v2,
+                self.t_handover,
+                self.t_end,
+                self.dt,
+                output_times=output_times,
+                **options,
+            )
+            self.simulation.run(chunk_size=chunk_size, velocities=True)
+            sim = self.simulation
+            parts.append(
+                (sim.t_array, sim.r1_array, sim.r2_array, sim.v1_array, sim.v2_array)
+            )
+
+        t, r1, r2, v1, v2 = (np.concatenate(arrays) for arrays in zip(*parts))
+        self.t_array = t
+        self.r1_array = r1
+        self.r2_array = r2
+        self.r1_array_2d = r1[:, :2]
+        self.r2_array_2d = r2[:, :2]
+        if velocities:
+            self.v1_array, self.v2_array = v1, v2
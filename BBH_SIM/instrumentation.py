@@ -0,0 +1,144 @@
+# instrumentation.py
+
+import time
+
+
+class RunStats:
+    """
+    Performance counters of a simulation run.
+
+    The step counters, timings and memory figures are always collected, at a cost
+    of a few operations per chunk. Per-term call counts and times of the force
+    model are only collected when the run is instrumented.
+
+    Attributes:
+    - t (float): Time reached by the integration.
+    - n_steps (int): Accepted integration steps.
+    - n_rejected (int): Rejected steps of the adaptive integrator.
+    - n_evaluations (int): Evaluations of the force model.
+    - n_samples, n_chunks (int): Samples and chunks produced.
+    - integration_time (float): Wall-clock seconds spent integrating.
+    - output_time (float): Wall-clock seconds spent writing chunks to the output
+      buffers or store in `run()`.
+    - buffer_memory (int): Bytes of the in-memory output buffers of `run()`; 0
+      when writing to a store or to memory-mapped buffers.
+    - chunk_memory (int): Peak bytes of one chunk, i.e. the integrated states
+      and the output arrays computed from them.
+    - term_calls, term_time (dict): Calls and cumulative seconds per force term,
+      including `'newtonian'`, when instrumented.
+
+    `steps_per_second` and `peak_memory`, the sum of `buffer_memory` and
+    `chunk_memory`, are derived from them.
+    """
+
+    def __init__(self):
+        self.t = None
+        self.n_steps = 0
+        self.n_rejected = 0
+        self.n_evaluations = 0
+        self.n_samples = 0
+        self.n_chunks = 0
+        self.integration_time = 0.0
+        self.output_time = 0.0
+        self.buffer_memory = 0
+        self.chunk_memory = 0
+        self.term_calls = {}
+        self.term_time = {}
+
+    @property
+    def steps_per_second(self):
+        """
+        Accepted steps per second of integration time.
+        """
+        if self.integration_time == 0:
+            return 0.0
+        return self.n_steps / self.integration_time
+
+    @property
+    def peak_memory(self):
+        """
+        Peak bytes held by the output buffers and the largest chunk.
+        """
+        return self.buffer_memory + self.chunk_memory
+
+    def as_dict(self):
+        """
+        Return the counters as a JSON-serializable dictionary.
+        """
+        return {
+            "t": self.t,
+            "n_steps": self.n_steps,
+            "n_rejected": self.n_rejected,
+            "n_evaluations": self.n_evaluations,
+            "n_samples": self.n_samples,
+            "n_chunks": self.n_chunks,
+            "integration_time": self.integration_time,
+            "output_time": self.output_time,
+            "steps_per_second": self.steps_per_second,
+            "peak_memory": self.peak_memory,
+            "term_calls": dict(self.term_calls),
+            "term_time": dict(self.term_time),
+        }
+
+    def __repr__(self):
+        return (
+            f"RunStats(n_steps={self.n_steps}, n_rejected={self.n_rejected}, "
+            f"steps_per_second={self.steps_per_second:.1f}, "
+            f"peak_memory={self.peak_memory})"
+        )
+
+
+class _Timed:
+    # Wrap a function to count its calls and accumulate its run time
+    def __init__(self, function, name, stats):
+        self.function = function
+        self.name = name
+        self.stats = stats
+        stats.term_calls.setdefault(name, 0)
+        stats.term_time.setdefault(name, 0.0)
+
+    def __call__(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        result = self.function(*args, **kwargs)
+        self.stats.term_time[self.name] += time.perf_counter() - t0
+        self.stats.term_calls[self.name] += 1
+        return result
+
+
+class InstrumentedForceModel:
+    """
+    Force model wrapper recording the calls and time spent in every term.
+
+    The time of the Newtonian term is the total time of a call minus the time
+    spent in the corrections.
+
+    Parameters:
+    - force (ForceModel): Force model to instrument; its `terms` are replaced
+      by timed wrappers.
+    - stats (RunStats): Counters to update.
+    """
+
+    def __init__(self, force, stats):
+        self.force = force
+        self.stats = stats
+        force.terms = [
+            _Timed(term, term.__name__.lstrip("_"), stats) for term in force.terms
+        ]
+        for name in ("total", "newtonian"):
+            stats.term_calls.setdefault(name, 0)
+            stats.term_time.setdefault(name, 0.0)
+
+    def _corrections(self):
+        return sum(self.stats.term_time[term.name] for term in self.force.terms)
+
+    def __call__(self, r, v, out=None):
+        stats = self.stats
+        before = self._corrections()
+        t0 = time.perf_counter()
+        result = self.force(r, v, out=out)
+        elapsed = time.perf_counter() - t0
+        stats.term_time["total"] += elapsed
+        stats.term_time["newtonian"] += elapsed - (self._corrections() - before)
+        stats.term_calls["total"] += 1
+        stats.term_calls["newtonian"] += 1
+        return result
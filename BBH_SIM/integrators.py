@@ -0,0 +1,318 @@
+# integrators.py
+
+import numpy as np
+
+# Dormand-Prince 5(4) tableau
+_C = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1])
+_A = [
+    [],
+    [1 / 5],
+    [3 / 40, 9 / 40],
+    [44 / 45, -56 / 15, 32 / 9],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+]
+_B = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84])
+# Difference between the 5th and embedded 4th order weights (7 stages, FSAL)
+_E = np.array(
+    [-71 / 57600, 0, 71 / 16695, -71 / 1920, 17253 / 339200, -22 / 525, 1 / 40]
+)
+# Coefficients of the 4th order continuous extension (Shampine)
+_P = np.array(
+    [
+        [
+            1,
+            -8048581381 / 2820520608,
+            8663915743 / 2820520608,
+            -12715105075 / 11282082432,
+        ],
+        [0, 0, 0, 0],
+        [
+            0,
+            131558114200 / 32700410799,
+            -68118460800 / 10900136933,
+            87487479700 / 32700410799,
+        ],
+        [
+            0,
+            -1754552775 / 470086768,
+            14199869525 / 1410260304,
+            -10690763975 / 1880347072,
+        ],
+        [
+            0,
+            127303824393 / 49829197408,
+            -318862633887 / 49829197408,
+            701980252875 / 199316789632,
+        ],
+        [0, -282668133 / 205662961, 2019193451 / 616988883, -1453857185 / 822651844],
+        [0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423],
+    ]
+)
+
+_SAFETY = 0.9
+_MIN_FACTOR = 0.2
+_MAX_FACTOR = 10.0
+
+
+class DormandPrince:
+    """
+    Adaptive Dormand-Prince 5(4) integrator for y' = f(t, y).
+
+    The step size is controlled so that the RMS of the embedded error estimate,
+    scaled by `atol + rtol * |y|`, stays below one. Rejected steps are retried
+    with a smaller step. A `RuntimeError` is raised when the error estimate is
+    not finite, or when the step size falls below `h_min` or below what still
+    advances `t` in floating point. After each accepted step, `dense(t)`
+    evaluates a 4th order interpolant anywhere inside that step.
+
+    Parameters:
+    - f (callable): Right-hand side `f(t, y)` returning an array shaped like `y`.
+    - t0 (float): Initial time.
+    - y0 (numpy.ndarray): Initial state.
+    - h0 (float): Initial step size.
+    - rtol (float): Relative tolerance (default: 1e-6).
+    - atol (float or numpy.ndarray): Absolute tolerance (default: 1e-9).
+    - h_min (float): Smallest allowed step size (default: 0.0).
+    - h_max (float): Largest allowed step size (default: inf).
+    """
+
+    def __init__(self, f, t0, y0, h0, rtol=1e-6, atol=1e-9, h_min=0.0, h_max=np.inf):
+        self.f = f
+        self.t = t0
+        self.y = np.array(y0, dtype=float)
+        self.h = min(abs(h0), h_max)
+        self.rtol = rtol
+        self.atol = atol
+        self.h_min = h_min
+        self.h_max = h_max
+
+        self.f_last = f(t0, self.y)
+        self.n_accepted = 0
+        self.n_rejected = 0
+        self.n_evaluations = 1
+
+        self._t_old = None
+        self._y_old = None
+        self._K = None
+        self._h_step = None
+
+    def step(self, t_bound=np.inf):
+        """
+        Take one accepted step, without stepping past `t_bound`.
+        """
+        t, y = self.t, self.y
+        K = np.empty((7,) + y.shape)
+        K[0] = self.f_last
+
+        h = self.h
+        # Below this, t + h no longer advances t by a usable amount
+        h_floor = 10 * np.finfo(float).eps * max(abs(t), np.finfo(float).tiny)
+        while True:
+            if h < self.h_min:
+                raise RuntimeError(
+                    f"Step size {h} fell below h_min={self.h_min} at t={t}."
+                )
+            if h < h_floor:
+                raise RuntimeError(f"Step size {h} underflowed at t={t}.")
+            h_step = min(h, t_bound - t)
+            for s in range(1, 6):
+                dy = np.tensordot(_A[s], K[:s], axes=1) * h_step
+                K[s] = self.f(t + _C[s] * h_step, y + dy)
+            y_new = y + h_step * np.tensordot(_B, K[:6], axes=1)
+            K[6] = self.f(t + h_step, y_new)
+            self.n_evaluations += 6
+
+            scale = self.atol + self.rtol * np.maximum(np.abs(y), np.abs(y_new))
+            err = np.sqrt(np.mean((h_step * np.tensordot(_E, K, axes=1) / scale) ** 2))
+            if not np.isfinite(err):
+                raise RuntimeError(
+                    f"Non-finite error estimate at t={t}; the state or its "
+                    "derivative is not finite."
+                )
+            if err <= 1:
+                factor = _MAX_FACTOR if err == 0 else _SAFETY * err**-0.2
+                self.h = min(h * min(_MAX_FACTOR, factor), self.h_max)
+                break
+            self.n_rejected += 1
+            h *= max(_MIN_FACTOR, _SAFETY * err**-0.2)
+
+        self._t_old, self._y_old, self._K = t, y, K
+        self._h_step = h_step
+        self.t = t + h_step
+        self.y = y_new
+        self.f_last = K[6]
+        self.n_accepted += 1
+
+    def get_state(self):
+        """
+        Return the full integrator state, e.g. for checkpointing.
+        """
+        state = {
+            "t": self.t,
+            "y": self.y,
+            "h": self.h,
+            "f_last": self.f_last,
+            "n_accepted": self.n_accepted,
+            "n_rejected": self.n_rejected,
+            "n_evaluations": self.n_evaluations,
+        }
+        if self._K is not None:
+            state.update(
+                t_old=self._t_old, y_old=self._y_old, K=self._K, h_step=self._h_step
+            )
+        return state
+
+    def set_state(self, state):
+        """
+        Restore a state returned by `get_state`.
+        """
+        self.t = state["t"]
+        self.y = np.array(state["y"], dtype=float)
+        self.h = state["h"]
+        self.f_last = np.array(state["f_last"], dtype=float)
+        self.n_accepted = state["n_accepted"]
+        self.n_rejected = state["n_rejected"]
+        self.n_evaluations = state["n_evaluations"]
+        self._t_old = state.get("t_old")
+        self._y_old = state.get("y_old")
+        self._K = state.get("K")
+        self._h_step = state.get("h_step")
+
+    def dense(self, t):
+        """
+        Evaluate the continuous extension of the last accepted step at `t`.
+        """
+        if self._K is None:
+            return self.y.copy()
+        x = (t - self._t_old) / self._h_step
+        p = np.cumprod(np.full(4, x))
+        Q = np.tensordot(_P @ p, self._K, axes=1)
+        return self._y_old + self._h_step * Q
+
+
+# Fixed-step integrators advance the positions and velocities of both bodies,
+# arrays of shape (2, dim), by one step: `stepper(accel, r, v, dt) -> (r, v)`,
+# where `accel(r, v)` returns the accelerations of both bodies.
+INTEGRATORS = {}
+
+
+def register_integrator(name, stepper):
+    """
+    Register a fixed-step integrator under `name`.
+
+    Parameters:
+    - name (str): Name used to select the integrator in `BBHSimulation`.
+    - stepper (callable): Function `stepper(accel, r, v, dt)` returning the
+      positions and velocities after one step of size `dt`.
+    """
+    INTEGRATORS[name] = stepper
+
+
+def get_integrator(name):
+    """
+    Return the fixed-step integrator registered under `name`.
+    """
+    try:
+        return INTEGRATORS[name]
+    except KeyError:
+        raise ValueError(
+            f"Invalid integrator: {name}. Supported integrators are "
+            f"{sorted(INTEGRATORS)} and 'dopri5'."
+        ) from None
+
+
+def euler_step(accel, r, v, dt):
+    """
+    First-order semi-implicit Euler step (kick, then drift).
+    """
+    v = v + accel(r, v) * dt
+    r = r + v * dt
+    return r, v
+
+
+def velocity_verlet_step(accel, r, v, dt):
+    """
+    Second-order velocity-Verlet (kick-drift-kick leapfrog) step.
+
+    Velocity-dependent forces are evaluated with the velocity after the first
+    half kick, so the scheme is only symplectic for conservative forces.
+    """
+    v_half = v + 0.5 * dt * accel(r, v)
+    r = r + dt * v_half
+    v = v_half + 0.5 * dt * accel(r, v_half)
+    return r, v
+
+
+def rk4_step(accel, r, v, dt):
+    """
+    Classic fourth-order Runge-Kutta step.
+    """
+    k1r, k1v = v, accel(r, v)
+    k2r = v + 0.5 * dt * k1v
+    k2v = accel(r + 0.5 * dt * k1r, k2r)
+    k3r = v + 0.5 * dt * k2v
+    k3v = accel(r + 0.5 * dt * k2r, k3r)
+    k4r = v + dt * k3v
+    k4v = accel(r + dt * k3r, k4r)
+    r = r + dt / 6 * (k1r + 2 * k2r + 2 * k3r + k4r)
+    v = v + dt / 6 * (k1v + 2 * k2v + 2 * k3v + k4v)
+    return r, v
+
+
+def _composition(weights):
+    # Symmetric composition of velocity-Verlet substeps (Yoshida 1990)
+    def step(accel, r, v, dt):
+        for w in weights:
+            r, v = velocity_verlet_step(accel, r, v, w * dt)
+        return r, v
+
+    return step
+
+
+_Y4_W1 = 1 / (2 - 2 ** (1 / 3))
+_Y4_W0 = 1 - 2 * _Y4_W1
+_Y6_W = (-1.17767998417887, 0.235573213359357, 0.784513610477560)
+_Y6_W0 = 1 - 2 * sum(_Y6_W)
+
+yoshida4_step = _composition((_Y4_W1, _Y4_W0, _Y4_W1))
+yoshida4_step.__doc__ = "Fourth-order Yoshida symplectic step."
+yoshida6_step = _composition(_Y6_W[::-1] + (_Y6_W0,) + _Y6_W)
+yoshida6_step.__doc__ = "Sixth-order Yoshida symplectic step (solution A)."
+
+register_integrator("euler", euler_step)
+register_integrator("verlet", velocity_verlet_step)
+register_integrator("rk4", rk4_step)
+register_integrator("yoshida4", yoshida4_step)
+register_integrator("yoshida6", yoshida6_step)
+
+
+def hermite_interpolate(t0, r0, v0, t1, r1, v1, t):
+    """
+    Cubic Hermite interpolation of a trajectory between two steps.
+
+    Parameters:
+    - t0, t1 (float): Times of the two steps.
+    - r0, r1 (numpy.ndarray): Positions at `t0` and `t1`.
+    - v0, v1 (numpy.ndarray): Velocities at `t0` and `t1`.
+    - t (float): Time to interpolate at, between `t0` and `t1`.
+
+    Returns:
+    - r, v (numpy.ndarray): Interpolated position and velocity at `t`.
+    """
+    h = t1 - t0
+    s = (t - t0) / h
+    s2 = s * s
+    s3 = s2 * s
+    r = (
+        (2 * s3 - 3 * s2 + 1) * r0
+        + (s3 - 2 * s2 + s) * h * v0
+        + (3 * s2 - 2 * s3) * r1
+        + (s3 - s2) * h * v1
+    )
+    v = (
+        (6 * s2 - 6 * s) / h * (r0 - r1)
+        + (3 * s2 - 4 * s + 1) * v0
+        + (3 * s2 - 2 * s) * v1
+    )
+    return r, v
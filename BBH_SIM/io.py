@@ -0,0 +1,110 @@
+# io.py
+
+import json
+import os
+
+import numpy as np
+
+FORMATS = ("npy", "npz", "txt")
+METADATA_FILE = "metadata.json"
+
+
+def _json_default(obj):
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def infer_format(path, format=None):
+    """
+    Determine the storage format of `path`.
+
+    An explicit `format` wins. Otherwise a `.npz` extension selects the `npz`
+    format, a `.npy` extension or an existing directory the `npy` directory
+    format, and anything else, including a path without an extension, the
+    legacy `txt` format.
+    """
+    if format is not None:
+        if format not in FORMATS:
+            raise ValueError(
+                f"Invalid format: {format}. Supported formats are {FORMATS}."
+            )
+        return format
+    path = os.fspath(path)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npz":
+        return "npz"
+    if ext == ".npy" or os.path.isdir(path):
+        return "npy"
+    return "txt"
+
+
+def save_arrays(path, arrays, metadata=None, format=None):
+    """
+    Save named arrays and JSON metadata in a binary format.
+
+    Saving to an existing `npy` directory replaces its contents; arrays of an
+    earlier save that are not in `arrays` are removed.
+
+    Parameters:
+    - path (str): Directory (`npy` format) or file (`npz` format) to write.
+    - arrays (dict): Mapping from name to array.
+    - metadata (dict): JSON-serializable run information (default: None).
+    - format (str): `'npy'` or `'npz'` (default: None, inferred from `path`).
+    """
+    format = infer_format(path, format)
+    metadata = json.dumps(metadata or {}, default=_json_default)
+    if format == "npz":
+        np.savez(path, __metadata__=np.array(metadata), **arrays)
+    elif format == "npy":
+        os.makedirs(path, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(path, name + ".npy"), array)
+        # load_arrays reads every .npy file of the directory
+        stale = {name for name in os.listdir(path) if name.endswith(".npy")}
+        for name in stale - {name + ".npy" for name in arrays}:
+            os.remove(os.path.join(path, name))
+        with open(os.path.join(path, METADATA_FILE), "w") as f:
+            f.write(metadata)
+    else:
+        raise ValueError("save_arrays only writes the 'npy' and 'npz' formats.")
+
+
+def load_arrays(path, mmap=False, format=None):
+    """
+    Load arrays and metadata written by `save_arrays`.
+
+    Parameters:
+    - path (str): Directory or file to read. Like `np.savez`, `.npz` is appended
+      to `npz` paths without it.
+    - mmap (bool): Memory-map the arrays instead of reading them (default: False).
+      Only supported by the `npy` format.
+    - format (str): `'npy'` or `'npz'` (default: None, inferred from `path`).
+
+    Returns:
+    - arrays (dict): Mapping from name to array.
+    - metadata (dict): Run information stored alongside the arrays.
+    """
+    format = infer_format(path, format)
+    if format == "npz":
+        if mmap:
+            raise ValueError("The 'npz' format cannot be memory-mapped; use 'npy'.")
+        path = os.fspath(path)
+        if not path.endswith(".npz"):
+            # np.savez appends the extension to paths without it
+            path += ".npz"
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+        metadata = json.loads(str(arrays.pop("__metadata__")))
+    elif format == "npy":
+        mmap_mode = "r" if mmap else None
+        arrays = {
+            name[:-4]: np.load(os.path.join(path, name), mmap_mode=mmap_mode)
+            for name in sorted(os.listdir(path))
+            if name.endswith(".npy")
+        }
+        with open(os.path.join(path, METADATA_FILE)) as f:
+            metadata = json.load(f)
+    else:
+        raise ValueError("load_arrays only reads the 'npy' and 'npz' formats.")
+    return arrays, metadata
@@ -0,0 +1,154 @@
+# search.py
+
+import numpy as np
+
+
+class TemplateBank:
+    """
+    Bank of waveform templates for frequency-domain matched filtering.
+
+    All templates are zero-padded to the length of the data segment and
+    transformed with a single batched `numpy.fft.rfft` call. The spectra are
+    kept on the bank, together with the PSD-weighted spectra and normalizations
+    of the last PSD used, so filtering many data segments only transforms the
+    data.
+
+    Parameters:
+    - templates (list): Template time series sampled at `dt` and starting at
+      t = 0, e.g. `h_plus` arrays or `(h_plus, h_cross)` tuples returned by
+      `generate_waveform`, of which the plus polarization is used.
+    - dt (float): Sampling interval of the templates and the data.
+    - n_samples (int): Length of the data segments to filter (default: None,
+      the length of the longest template).
+    """
+
+    def __init__(self, templates, dt, n_samples=None):
+        templates = [
+            np.asarray(h[0] if isinstance(h, tuple) else h, dtype=float)
+            for h in templates
+        ]
+        longest = max(len(h) for h in templates)
+        n_samples = longest if n_samples is None else n_samples
+        if longest > n_samples:
+            raise ValueError(
+                f"Templates of {longest} samples do not fit in {n_samples} samples."
+            )
+
+        padded = np.zeros((len(templates), n_samples))
+        for row, h in zip(padded, templates):
+            row[: len(h)] = h
+
+        self.dt = dt
+        self.n_samples = n_samples
+        self.frequencies = np.fft.rfftfreq(n_samples, dt)
+        self.spectra = np.fft.rfft(padded, axis=-1) * dt
+        self._psd = None
+        self._weighted = None
+        self._sigma = None
+
+    def __len__(self):
+        return len(self.spectra)
+
+    def _psd_array(self, psd):
+        if callable(psd):
+            return np.asarray(psd(self.frequencies), dtype=float)
+        psd = np.asarray(psd, dtype=float)
+        if psd.shape != self.frequencies.shape:
+            raise ValueError(
+                f"The PSD must have {len(self.frequencies)} frequency bins, "
+                f"got {psd.shape}."
+            )
+        return psd
+
+    def _whiten(self, psd, f_low):
+        # Cache the conjugate template spectra divided by the PSD
+        psd = self._psd_array(psd)
+        if self._psd is not None and (
+            self._psd[1] == f_low and np.array_equal(self._psd[0], psd)
+        ):
+            return self._weighted, self._sigma
+
+        inverse = np.zeros_like(psd)
+        band = (self.frequencies >= f_low) & (psd > 0) & np.isfinite(psd)
+        inverse[band] = 1.0 / psd[band]
+        df = self.frequencies[1] - self.frequencies[0]
+
+        self._weighted = np.conj(self.spectra) * inverse
+        self._sigma = np.sqrt(
+            4 * df * np.einsum("kf,kf->k", self.spectra, self._weighted).real
+        )
+        self._psd = (psd, f_low)
+        return self._weighted, self._sigma
+
+    def sigma(self, psd, f_low=0.0):
+        """
+        Return the norm of each template, sqrt(<h|h>), for the given PSD.
+
+        Parameters:
+        - psd (numpy.ndarray or callable): One-sided noise PSD at `frequencies`,
+          or a function of the frequency returning it.
+        - f_low (float): Frequencies below `f_low` are ignored (default: 0.0).
+        """
+        return self._whiten(psd, f_low)[1]
+
+    def filter(self, data, psd, f_low=0.0, batch_size=256, return_complex=False):
+        """
+        Compute the SNR time series of every template against a data segment.
+
+        Sample j of a time series is the SNR of the template starting at sample
+        j of the data (cyclically), maximized over the phase of the template.
+
+        Parameters:
+        - data (numpy.ndarray): Data segment of `n_samples` samples.
+        - psd (numpy.ndarray or callable): One-sided noise PSD at `frequencies`,
+          or a function of the frequency returning it.
+        - f_low (float): Frequencies below `f_low` are ignored (default: 0.0).
+        - batch_size (int): Number of templates filtered per inverse FFT, bounding
+          the memory used (default: 256).
+        - return_complex (bool): Return the complex SNR instead of its modulus
+          (default: False).
+
+        Returns:
+        - snr (numpy.ndarray): SNR time series, shape (len(bank), n_samples).
+        """
+        data = np.asarray(data, dtype=float)
+        if data.shape != (self.n_samples,):
+            raise ValueError(
+                f"Data must have shape ({self.n_samples},), got {data.shape}."
+            )
+        weighted, sigma = self._whiten(psd, f_low)
+        data_spectrum = np.fft.rfft(data) * self.dt
+        df = self.frequencies[1] - self.frequencies[0]
+        n_bins = len(self.frequencies)
+
+        snr = np.empty((len(self), self.n_samples), dtype=complex)
+        # Only positive frequencies contribute, which maximizes over the phase
+        integrand = np.zeros((min(batch_size, len(self)), self.n_samples), complex)
+        for start in range(0, len(self), batch_size):
+            stop = min(start + batch_size, len(self))
+            block = integrand[: stop - start]
+            np.multiply(weighted[start:stop], data_spectrum, out=block[:, :n_bins])
+            snr[start:stop] = np.fft.ifft(block, axis=-1)
+
+        norm = np.where(sigma > 0, sigma, np.inf)
+        snr *= (4 * df * self.n_samples / norm)[:, np.newaxis]
+        return snr if return_complex else np.abs(snr)
+
+
+def matched_filter(templates, data, psd, dt, f_low=0.0):
+    """
+    Compute the SNR time series of each template against a data segment.
+
+    Parameters:
+    - templates (list): Template time series, see `TemplateBank`.
+    - data (numpy.ndarray): Data segment sampled at `dt`.
+    - psd (numpy.ndarray or callable): One-sided noise PSD at the frequencies
+      `numpy.fft.rfftfreq(len(data), dt)`, or a function of the frequency.
+    - dt (float): Sampling interval.
+    - f_low (float): Frequencies below `f_low` are ignored (default: 0.0).
+
+    Returns:
+    - snr (numpy.ndarray): SNR time series, shape (len(templates), len(data)).
+    """
+    bank = TemplateBank(templates, dt, len(data))
+    return bank.filter(data, psd, f_low)
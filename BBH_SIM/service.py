@@ -0,0 +1,389 @@
+# service.py
+
+import argparse
+import asyncio
+import json
+import os
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import __version__
+from .cache import hash_inputs
+from .io import _json_default
+from .simulation import BBHSimulation
+from .waveform import generate_waveform
+
+_INIT_KEYS = ("r1_init", "r2_init", "v1_init", "v2_init", "spin1", "spin2")
+
+# Every message is a frame: an 8-byte big-endian length followed by the payload.
+# A response is a JSON header frame followed by one raw frame per listed array.
+_LENGTH = struct.Struct(">Q")
+# Arrays are written in pieces of this many bytes, waiting for the socket buffer
+# to drain in between
+_STREAM_BYTES = 1 << 20
+
+
+def _run_simulation(params, waveform):
+    # Executed in a worker process
+    kwargs = dict(params)
+    for key in _INIT_KEYS:
+        if kwargs.get(key) is not None:
+            kwargs[key] = np.array(kwargs[key], dtype=float)
+    simulation = BBHSimulation(**kwargs)
+    simulation.run()
+
+    arrays = {"t": simulation.t_array, "r1": simulation.r1_array}
+    arrays["r2"] = simulation.r2_array
+    if waveform:
+        arrays["h_plus"], arrays["h_cross"] = generate_waveform(
+            simulation.t_array,
+            simulation.r1_array,
+            simulation.r2_array,
+            simulation.m1,
+            simulation.m2,
+        )
+    metadata = simulation._metadata()
+    metadata["step_stats"] = simulation.step_stats
+    metadata["termination"] = simulation.termination
+    return arrays, metadata
+
+
+async def _read_frame(reader):
+    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    return await reader.readexactly(length)
+
+
+async def _write_message(writer, header, arrays=None):
+    arrays = {
+        name: np.ascontiguousarray(array) for name, array in (arrays or {}).items()
+    }
+    header = dict(header)
+    header["arrays"] = [
+        {"name": name, "dtype": array.dtype.str, "shape": array.shape}
+        for name, array in arrays.items()
+    ]
+    payload = json.dumps(header, default=_json_default).encode()
+    writer.write(_LENGTH.pack(len(payload)) + payload)
+    for array in arrays.values():
+        data = memoryview(array).cast("B")
+        writer.write(_LENGTH.pack(len(data)))
+        for start in range(0, len(data), _STREAM_BYTES):
+            stop = start + _STREAM_BYTES
+            writer.write(data[start:stop])
+            await writer.drain()
+    await writer.drain()
+
+
+async def _read_message(reader):
+    header = json.loads(await _read_frame(reader))
+    arrays = {}
+    for spec in header.pop("arrays"):
+        data = await _read_frame(reader)
+        arrays[spec["name"]] = np.frombuffer(data, dtype=spec["dtype"]).reshape(
+            spec["shape"]
+        )
+    return header, arrays
+
+
+class SimulationService:
+    """
+    Local asyncio server running `BBHSimulation` requests in a process pool.
+
+    At most `max_workers` simulations run at once; further requests wait in a
+    queue. Identical requests arriving while one is queued or running share its
+    result instead of running again. With a `cache`, completed results are also
+    kept in a `ResultCache` and served from it.
+
+    The server listens on a TCP port of `host` or on a Unix socket. Clients send
+    framed JSON requests and receive the trajectory and waveform as raw arrays,
+    see `ServiceClient`. Requests can also be made in-process with `simulate()`.
+
+    Parameters:
+    - max_workers (int): Number of worker processes (default: None, the number
+      of CPUs).
+    - cache (ResultCache): Cache of completed results (default: None).
+    - latency_window (int): Number of recent requests kept for the latency
+      metrics (default: 1000).
+    """
+
+    def __init__(self, max_workers=None, cache=None, latency_window=1000):
+        self.max_workers = max_workers
+        self.cache = cache
+        self.address = None
+        self.requests = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.failed = 0
+        self._queued = 0
+        self._running = 0
+        self._latencies = deque(maxlen=latency_window)
+        self._in_flight = {}
+        self._executor = None
+        self._slots = None
+        self._server = None
+        self._writers = set()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def _ensure_pool(self):
+        if self._executor is None:
+            max_workers = self.max_workers or os.cpu_count() or 1
+            self._executor = ProcessPoolExecutor(max_workers)
+            self._slots = asyncio.Semaphore(max_workers)
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        """
+        Start listening on `host:port`, or on the Unix socket `path`.
+
+        Returns:
+        - address: `(host, port)` with the bound port, or `path`.
+        """
+        self._ensure_pool()
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path)
+            self.address = path
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+            self.address = self._server.sockets[0].getsockname()[:2]
+        return self.address
+
+    async def stop(self):
+        """
+        Close the server and its connections and shut the worker pool down.
+        """
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+
+    @property
+    def metrics(self):
+        """
+        Request counters, queue depth and latency statistics in seconds.
+        """
+        latencies = np.array(self._latencies)
+        latency = {"count": len(latencies)}
+        if len(latencies):
+            latency.update(
+                mean=float(latencies.mean()),
+                p50=float(np.percentile(latencies, 50)),
+                p95=float(np.percentile(latencies, 95)),
+                max=float(latencies.max()),
+            )
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "completed": self.completed,
+            "failed": self.failed,
+            "queue_depth": self._queued,
+            "running": self._running,
+            "latency": latency,
+        }
+
+    async def simulate(self, params, waveform=True):
+        """
+        Run a simulation, sharing the result of an identical in-flight request.
+
+        Parameters:
+        - params (dict): `BBHSimulation` arguments, JSON-serializable.
+        - waveform (bool): Also compute `h_plus` and `h_cross` (default: True).
+
+        Returns:
+        - arrays (dict): `t`, `r1`, `r2` and the waveform arrays.
+        - metadata (dict): Run settings, `step_stats` and `termination`.
+        """
+        t0 = time.perf_counter()
+        self.requests += 1
+        key = hash_inputs("simulate", __version__, params, waveform)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._dispatch(key, params, waveform))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        try:
+            # A cancelled caller must not cancel the run shared with others
+            return await asyncio.shield(task)
+        finally:
+            self._latencies.append(time.perf_counter() - t0)
+
+    async def _dispatch(self, key, params, waveform):
+        if self.cache is not None:
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry
+
+        self._ensure_pool()
+        self._queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+        self._running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            entry = await loop.run_in_executor(
+                self._executor, _run_simulation, params, waveform
+            )
+            self.completed += 1
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._running -= 1
+            self._slots.release()
+
+        if self.cache is not None:
+            entry = self.cache.put(key, *entry)
+        return entry
+
+    async def _handle(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    request = json.loads(await _read_frame(reader))
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                op = request.get("op")
+                if op == "metrics":
+                    await _write_message(writer, {"status": "ok", **self.metrics})
+                elif op == "simulate":
+                    try:
+                        arrays, metadata = await self.simulate(
+                            request["params"], request.get("waveform", True)
+                        )
+                    except Exception as error:
+                        header = {"status": "error", "error": repr(error)}
+                        await _write_message(writer, header)
+                    else:
+                        header = {"status": "ok", "metadata": metadata}
+                        await _write_message(writer, header, arrays)
+                else:
+                    header = {"status": "error", "error": f"Unknown op: {op!r}."}
+                    await _write_message(writer, header)
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+class ServiceClient:
+    """
+    Client of a `SimulationService`, holding one connection.
+
+    Requests on one client are sent one at a time; use several clients for
+    concurrent requests.
+
+    Parameters:
+    - host (str): Host of the service (default: 127.0.0.1).
+    - port (int): TCP port of the service.
+    - path (str): Unix socket of the service, used instead of `host` and `port`.
+    """
+
+    def __init__(self, host="127.0.0.1", port=None, path=None):
+        self.host = host
+        self.port = port
+        self.path = path
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def connect(self):
+        if self.path is not None:
+            self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+        else:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = None
+
+    async def _request(self, request):
+        async with self._lock:
+            if self._writer is None:
+                await self.connect()
+            payload = json.dumps(request, default=_json_default).encode()
+            self._writer.write(_LENGTH.pack(len(payload)) + payload)
+            await self._writer.drain()
+            header, arrays = await _read_message(self._reader)
+        if header.pop("status") != "ok":
+            raise RuntimeError(f"Simulation service error: {header['error']}")
+        return header, arrays
+
+    async def simulate(self, params, waveform=True):
+        """
+        Run a simulation on the service.
+
+        Returns:
+        - arrays (dict): Read-only arrays `t`, `r1`, `r2` and, with `waveform`,
+          `h_plus` and `h_cross`.
+        - metadata (dict): Run settings, `step_stats` and `termination`.
+        """
+        request = {"op": "simulate", "params": params, "waveform": waveform}
+        header, arrays = await self._request(request)
+        return arrays, header["metadata"]
+
+    async def metrics(self):
+        """
+        Return the metrics of the service, see `SimulationService.metrics`.
+        """
+        header, _ = await self._request({"op": "metrics"})
+        return header
+
+
+async def serve(host="127.0.0.1", port=8765, path=None, max_workers=None, cache=None):
+    """
+    Run a `SimulationService` until cancelled.
+    """
+    async with SimulationService(max_workers, cache) as service:
+        address = await service.start(host, port, path)
+        print(f"Serving simulations on {address}", flush=True)
+        await service._server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m BBH_SIM.service", description="Serve BBH_SIM simulations."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--path", help="Unix socket to listen on instead of a port")
+    parser.add_argument("--workers", type=int, help="number of worker processes")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.path, args.workers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
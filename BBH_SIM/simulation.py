@@ -1,5 +1,46 @@
+import os
+import time
+
 import numpy as np
-from .dynamics import compute_acceleration
+
+from . import __version__
+from .cache import hash_inputs
+from .dynamics import (
+    G,
+    c,
+    ForceModel,
+    compute_acceleration,
+    compute_1pn_correction,
+    compute_2pn_correction,
+    compute_radiation_reaction,
+    compute_spin_effects,
+)
+from .events import Event, locate_root, peters_time
+from .instrumentation import InstrumentedForceModel, RunStats
+from .integrators import DormandPrince, get_integrator, hermite_interpolate
+from .io import infer_format, load_arrays, save_arrays
+
+# Constructor arguments stored with saved runs
+_SETTINGS = (
+    "m1",
+    "m2",
+    "t_start",
+    "t_end",
+    "dt",
+    "pn_order",
+    "radiation",
+    "spin",
+    "spin1",
+    "spin2",
+    "integrator",
+    "rtol",
+    "atol",
+    "dt_min",
+    "dt_max",
+    "reduced",
+    "record_every",
+    "attractive",
+)
 
 
 class BBHSimulation:
@@ -19,7 +60,23 @@ class BBHSimulation:
         spin=False,
         spin1=None,
         spin2=None,
+        integrator="euler",
+        rtol=1e-6,
+        atol=1e-9,
+        dt_min=0.0,
+        dt_max=np.inf,
+        output_times=None,
+        reduced=False,
+        record_every=1,
+        events=None,
+        attractive=False,
     ):
+        if isinstance(t_end, str):
+            if t_end != "peters":
+                raise ValueError(f"Invalid t_end: {t_end}. Use a number or 'peters'.")
+            separation = np.linalg.norm(np.subtract(r2_init, r1_init))
+            t_end = t_start + peters_time(m1, m2, separation)
+
         self.m1 = m1
         self.m2 = m2
         self.r1 = r1_init
@@ -34,60 +91,1017 @@ class BBHSimulation:
         self.spin = spin
         self.spin1 = spin1
         self.spin2 = spin2
+        self.integrator = integrator
+        self.rtol = rtol
+        self.atol = atol
+        self.dt_min = dt_min
+        self.dt_max = dt_max
+        self.reduced = reduced
+        self.record_every = record_every
+        self.attractive = attractive
+        self.events = [
+            event if isinstance(event, Event) else Event(event)
+            for event in (events or ())
+        ]
 
-        self.t_array = np.arange(t_start, t_end + dt, dt)
+        if integrator != "dopri5":
+            get_integrator(integrator)
+        if record_every < 1:
+            raise ValueError(f"record_every must be at least 1, got {record_every}.")
+        if output_times is not None and record_every != 1:
+            raise ValueError("record_every and output_times cannot be combined.")
+
+        # Integration steps on the fixed grid; t_array is the output grid
+        self.n_steps = len(np.arange(t_start, t_end + dt, dt))
+        if output_times is None:
+            self.output_times = None
+            self.t_array = np.arange(t_start, t_end + dt, dt)[::record_every]
+        else:
+            self.output_times = np.asarray(output_times, dtype=float)
+            if np.any(np.diff(self.output_times) < 0) or np.any(
+                self.output_times < t_start
+            ):
+                raise ValueError(
+                    "output_times must be sorted and not earlier than t_start."
+                )
+            self.t_array = self.output_times
+        self.step_stats = {}
         self.r1_array = []
         self.r2_array = []
         self.r1_array_2d = []
         self.r2_array_2d = []
+        self.v1_array = None
+        self.v2_array = None
+        self.store = None
+        self.event_log = []
+        self.termination = None
 
-    def run(self):
-        for _t in self.t_array:
-            r = self.r2 - self.r1
-            v = self.v2 - self.v1
+        # Integration state, set up when a run starts
+        self._force = None
+        self._pending = False
+        self._n_samples = 0
+        self._n_evaluations = 0
+        self._g = None
+        self._on_step = None
+        self.stats = RunStats()
+
+    def run(
+        self,
+        out=None,
+        dtype=float,
+        chunk_size=4096,
+        velocities=False,
+        store=None,
+        checkpoint=None,
+        checkpoint_interval=60.0,
+        cache=None,
+        instrument=False,
+        on_step=None,
+        on_chunk=None,
+    ):
+        """
+        Integrate the binary over `t_array`.
+
+        Positions are written into preallocated (len(t_array), 3) buffers, and
+        `r1_array_2d`/`r2_array_2d` are views of their first two components.
+
+        Parameters:
+        - out (tuple): Optional `(r1_out, r2_out)` buffers to write the positions
+          into, e.g. memory-mapped arrays, followed by `(v1_out, v2_out)` when
+          `velocities` is True (default: None).
+        - dtype (numpy.dtype): Data type of the buffers allocated when `out` is
+          None (default: float).
+        - chunk_size (int): Number of samples integrated between writes into the
+          output buffers (default: 4096).
+        - velocities (bool): Also store `v1_array` and `v2_array` (default: False).
+        - store (TrajectoryStore): Write the trajectory to this on-disk store as
+          it is integrated instead of into memory (default: None). The store is
+          kept as `self.store`, and the in-memory arrays are left untouched.
+        - checkpoint (str): Path of a checkpoint file written between chunks, at
+          most every `checkpoint_interval` seconds, and at the end (default: None).
+        - checkpoint_interval (float): Minimum wall-clock time in seconds between
+          checkpoints (default: 60.0).
+        - cache (ResultCache): Return the arrays of an identical earlier run from
+          this cache instead of integrating, and store new results in it
+          (default: None).
+        - instrument, on_step, on_chunk: Instrumentation options, see
+          `iter_run`. The counters are kept in `self.stats`.
+        """
+        if cache is not None:
+            if out is not None or store is not None or self._pending:
+                raise ValueError("cache cannot be combined with out, store or resume.")
+            key = self._cache_key(dtype, velocities)
+            entry = cache.get(key)
+            if entry is None:
+                self.run(dtype=dtype, chunk_size=chunk_size, velocities=velocities)
+                metadata = {
+                    "step_stats": self.step_stats,
+                    "termination": self.termination,
+                    "event_log": self.event_log,
+                }
+                entry = cache.put(key, self._cache_arrays(), metadata)
+            self._load_cached(*entry)
+            return
+
+        chunks = self.iter_run(chunk_size, instrument, on_step, on_chunk)
+        # A resumed or extended run continues after the samples already produced
+        start = self._n_samples if self._pending else 0
+
+        if store is not None:
+            store.metadata.update(self._metadata())
+            store.truncate(start)
+            buffers = []
+        else:
+            shape = (len(self.t_array), np.size(self.r1))
+            n_buffers = 4 if velocities else 2
+            if out is None:
+                buffers = [np.empty(shape, dtype=dtype) for _ in range(n_buffers)]
+                for buffer in buffers:
+                    buffer[:start] = np.nan
+            else:
+                buffers = list(out)
+                if len(buffers) != n_buffers:
+                    raise ValueError(
+                        f"Expected {n_buffers} output buffers, got {len(out)}."
+                    )
+                for buffer in buffers:
+                    if buffer.shape != shape:
+                        raise ValueError(
+                            f"Output buffers must have shape {shape}, "
+                            f"got {buffer.shape}."
+                        )
+
+        last_checkpoint = time.monotonic()
+        for t, *chunk in chunks:
+            t0 = time.perf_counter()
+            stop = start + len(t)
+            if store is not None:
+                blocks = dict(zip(("r1", "r2", "v1", "v2"), chunk))
+                store.append(t, **{name: blocks[name] for name in store.fields})
+            for buffer, block in zip(buffers, chunk):
+                buffer[start:stop] = block
+            start = stop
+            self.stats.output_time += time.perf_counter() - t0
+
+            if (
+                checkpoint is not None
+                and time.monotonic() - last_checkpoint >= checkpoint_interval
+            ):
+                self._flush(buffers, store)
+                self.checkpoint(checkpoint)
+                last_checkpoint = time.monotonic()
+
+        if checkpoint is not None:
+            self._flush(buffers, store)
+            self.checkpoint(checkpoint)
+
+        if store is not None:
+            store.flush()
+            self.store = store
+            return
+
+        if not isinstance(buffers[0], np.memmap):
+            self.stats.buffer_memory = sum(buffer.nbytes for buffer in buffers)
+        if len(buffers[0]) > len(self.t_array):
+            # A terminal event left the end of the buffers unused
+            buffers = [buffer[: len(self.t_array)] for buffer in buffers]
+        r1_array, r2_array = buffers[:2]
+        if velocities:
+            self.v1_array, self.v2_array = buffers[2:]
+        self.r1_array = r1_array
+        self.r2_array = r2_array
+        # For 2D input positions the views below cover the whole buffer
+        self.r1_array_2d = r1_array[:, :2]
+        self.r2_array_2d = r2_array[:, :2]
+
+    def _cache_key(self, dtype, velocities):
+        # Hash of everything that determines the result of run()
+        return hash_inputs(
+            "BBHSimulation.run",
+            self._metadata(),
+            np.asarray(self.r1),
+            np.asarray(self.r2),
+            np.asarray(self.v1),
+            np.asarray(self.v2),
+            self.output_times,
+            np.dtype(dtype).str,
+            velocities,
+            [event._identity() for event in self.events],
+        )
+
+    def _cache_arrays(self):
+        arrays = {
+            "r1_array": self.r1_array,
+            "r2_array": self.r2_array,
+            "r1": self.r1,
+            "r2": self.r2,
+            "v1": self.v1,
+            "v2": self.v2,
+        }
+        if self.v1_array is not None:
+            arrays["v1_array"] = self.v1_array
+            arrays["v2_array"] = self.v2_array
+        return arrays
+
+    def _load_cached(self, arrays, metadata):
+        self.r1_array = arrays["r1_array"]
+        self.r2_array = arrays["r2_array"]
+        self.r1_array_2d = self.r1_array[:, :2]
+        self.r2_array_2d = self.r2_array[:, :2]
+        self.v1_array = arrays.get("v1_array")
+        self.v2_array = arrays.get("v2_array")
+        # Final state, as after an integration
+        self.r1 = np.array(arrays["r1"])
+        self.r2 = np.array(arrays["r2"])
+        self.v1 = np.array(arrays["v1"])
+        self.v2 = np.array(arrays["v2"])
+        self.step_stats = dict(metadata["step_stats"])
+        # Event records read from disk hold lists instead of arrays
+        self.event_log = [
+            dict(record, r=np.array(record["r"]), v=np.array(record["v"]))
+            for record in metadata["event_log"]
+        ]
+        self.termination = None
+        if metadata["termination"] is not None:
+            self.termination = self.event_log[-1]
+            # A terminal event shortened the run
+            self.t_array = self.t_array[: len(self.r1_array)]
+            if self.output_times is not None:
+                self.output_times = self.t_array
+
+    @staticmethod
+    def _flush(buffers, store):
+        for buffer in buffers:
+            if isinstance(buffer, np.memmap):
+                buffer.flush()
+        if store is not None:
+            store.flush()
+
+    def iter_run(self, chunk_size=65536, instrument=False, on_step=None, on_chunk=None):
+        """
+        Integrate the binary over `t_array`, yielding the trajectory in chunks.
+
+        Only the chunk being filled is held in memory, so arbitrarily long runs
+        can be streamed into waveform generation, disk writers or online analysis.
+        The final state is stored on the simulation once the generator is
+        exhausted.
+
+        Step counts, timings and memory use are collected in `self.stats`.
+
+        Parameters:
+        - chunk_size (int): Number of samples per chunk (default: 65536).
+        - instrument (bool): Also time every term of the force model, at some
+          cost per evaluation (default: False).
+        - on_step (callable): Called as `on_step(stats)` after every accepted
+          step, with `stats.t` and `stats.n_steps` up to date (default: None).
+        - on_chunk (callable): Called as `on_chunk(stats, chunk)` for every chunk
+          before it is yielded (default: None).
+
+        Yields:
+        - chunk (tuple): `(t, r1, r2, v1, v2)` arrays of up to `chunk_size` samples;
+          `t` has shape (k,) and the others (k, 3).
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1, got {chunk_size}.")
+
+        if self._pending:
+            self._pending = False
+        else:
+            self._begin()
+        if instrument and not isinstance(self._force, InstrumentedForceModel):
+            self._force = InstrumentedForceModel(self._force, self.stats)
+        self._on_step = on_step
+
+        if self.integrator == "dopri5":
+            samples = self._adaptive_samples()
+        else:
+            samples = self._fixed_samples()
+        if self.integrator == "dopri5" or self.output_times is not None:
+            # Samples hold the state at their time
+            offset = -self.t_start
+        else:
+            # Samples hold the state after the step taken from their time
+            offset = self.dt - self.t_start
+
+        n_samples = len(self.t_array)
+        state_shape = np.shape(self._r)
+        stats = self.stats
+        while self._n_samples < n_samples and self.termination is None:
+            t0 = time.perf_counter()
+            start = self._n_samples
+            k = min(chunk_size, n_samples - start)
+            r = np.empty((k,) + state_shape)
+            v = np.empty((k,) + state_shape)
+            for j in range(k):
+                sample = next(samples, None)
+                if sample is None:
+                    # Stopped by a terminal event
+                    r, v = r[:j], v[:j]
+                    break
+                r[j], v[j] = sample
+            stop = start + len(r)
+            self._n_samples = stop
+            if not len(r):
+                stats.integration_time += time.perf_counter() - t0
+                continue
+
+            t = self.t_array[start:stop]
+            chunk = (t,) + self._bodies(r, v, t + offset)
+            stats.integration_time += time.perf_counter() - t0
+            stats.n_chunks += 1
+            stats.n_samples = stop
+            stats.t = t[-1]
+            # The integrated states and the chunk are alive at the same time
+            chunk_memory = r.nbytes + v.nbytes + sum(a.nbytes for a in chunk)
+            stats.chunk_memory = max(stats.chunk_memory, chunk_memory)
+            if on_chunk is not None:
+                on_chunk(stats, chunk)
+            yield chunk
+
+        if self.termination is not None:
+            # Trim the output grid to the samples before the event
+            self.t_array = self.t_array[: self._n_samples]
+            if self.output_times is not None:
+                self.output_times = self.t_array
+        self._finish()
+
+    def _spins(self):
+        return (self.spin1, self.spin2) if self.spin else None
+
+    def _acceleration(self, r, v):
+        # r and v hold both bodies, shape (2, dim)
+        a = np.empty(r.shape)
+        self._force(r[1] - r[0], v[1] - v[0], out=a[0])
+        np.negative(a[0], out=a[1])
+        self._n_evaluations += 1
+        return a
+
+    def _relative_acceleration(self, r, v):
+        # r and v are the separation r2 - r1 and its time derivative
+        a = self._force(r, v)
+        a *= -2
+        self._n_evaluations += 1
+        return a
+
+    def _attractive_acceleration(self, r, v):
+        # The force model is the relative acceleration, shared between the bodies
+        # in inverse proportion to their masses
+        a = np.empty(r.shape)
+        self._force(r[1] - r[0], v[1] - v[0], out=a[1])
+        np.multiply(a[1], -self._share[0], out=a[0])
+        a[1] *= self._share[1]
+        self._n_evaluations += 1
+        return a
+
+    def _attractive_relative_acceleration(self, r, v):
+        a = self._force(r, v)
+        self._n_evaluations += 1
+        return a
+
+    def _prepare(self):
+        self._force = ForceModel(
+            self.m1, self.m2, self.pn_order, self.radiation, self._spins()
+        )
+        # Fractions of r2 - r1 from the centre back to body 1 and on to body 2
+        if self.attractive:
+            total = self.m1 + self.m2
+            self._share = (self.m2 / total, self.m1 / total)
+        else:
+            self._share = (0.5, 0.5)
+        if self.reduced:
+            self._accel = (
+                self._attractive_relative_acceleration
+                if self.attractive
+                else self._relative_acceleration
+            )
+        else:
+            self._accel = (
+                self._attractive_acceleration if self.attractive else self._acceleration
+            )
+        if self.integrator != "dopri5":
+            self._stepper = get_integrator(self.integrator)
+
+    def _begin(self):
+        """
+        Set up the integration state from the current positions and velocities.
+        """
+        self._prepare()
+        # Centre of the two bodies: their midpoint, or their centre of mass in the
+        # attractive mode. It moves uniformly, so the reduced mode only integrates
+        # r2 - r1.
+        w1, w2 = self._share
+        self._centre = w2 * self.r1 + w1 * self.r2
+        self._centre_velocity = w2 * self.v1 + w1 * self.v2
+        if self.reduced:
+            self._r = self.r2 - self.r1
+            self._v = self.v2 - self.v1
+        else:
+            self._r = np.stack((self.r1, self.r2))
+            self._v = np.stack((self.v1, self.v2))
+        self._prev = None
+        self._solver = None
+        self._n_steps = 0
+        self._n_samples = 0
+        self._n_evaluations = 0
+        self._g = None
+        self._terminal_state = None
+        self.stats = RunStats()
+        self.event_log = []
+        self.termination = None
+
+    def _bodies(self, r, v, elapsed):
+        """
+        Split integrated states (one per row) into the positions and velocities
+        of both bodies, rebuilding them from the centre in the reduced mode.
+        """
+        if not self.reduced:
+            return r[..., 0, :], r[..., 1, :], v[..., 0, :], v[..., 1, :]
+        centre = self._centre + np.multiply.outer(elapsed, self._centre_velocity)
+        w1, w2 = self._share
+        return (
+            centre - w1 * r,
+            centre + w2 * r,
+            self._centre_velocity - w1 * v,
+            self._centre_velocity + w2 * v,
+        )
+
+    def _relative(self, r, v):
+        # Separation vector and relative velocity of an integrated state
+        if self.reduced:
+            return r, v
+        return r[1] - r[0], v[1] - v[0]
+
+    def _check_events(self, t0, y0, t1, y1, interpolate):
+        """
+        Evaluate the events after a step from `(t0, y0)` to `(t1, y1)`.
+
+        Triggered events are recorded in `event_log`, and the earliest terminal
+        one is stored in `termination` with the integrated state at its time.
+        """
+        if self._g is None:
+            self._g = [event(t0, *self._relative(*y0)) for event in self.events]
+        g_new = [event(t1, *self._relative(*y1)) for event in self.events]
+
+        hits = []
+        for event, g0, g1 in zip(self.events, self._g, g_new):
+            if not event.triggered(g0, g1):
+                continue
+            if event.locate:
+
+                def g(t, event=event):
+                    return event(t, *self._relative(*interpolate(t)))
+
+                t = locate_root(g, t0, t1, g0, g1)
+                state = interpolate(t)
+            else:
+                t, state = t0, y0
+            hits.append((t, event, state))
+        self._g = g_new
+
+        for t, event, (r, v) in sorted(hits, key=lambda hit: hit[0]):
+            r_rel, v_rel = self._relative(r, v)
+            record = {
+                "name": event.name,
+                "t": t,
+                "r": np.array(r_rel),
+                "v": np.array(v_rel),
+                "terminal": event.terminal,
+            }
+            self.event_log.append(record)
+            if event.terminal:
+                self.termination = record
+                self._terminal_state = (t, np.array(r), np.array(v))
+                break
+
+    def _step(self):
+        if self.termination is not None:
+            return
+        r0, v0 = self._r, self._v
+        self._r, self._v = self._stepper(self._accel, r0, v0, self.dt)
+        self._n_steps += 1
+        if self._on_step is not None:
+            self.stats.t = self.t_start + self._n_steps * self.dt
+            self.stats.n_steps = self._n_steps
+            self._on_step(self.stats)
+        if self.events:
+            t1 = self.t_start + self._n_steps * self.dt
+            t0 = t1 - self.dt
+            r1, v1 = self._r, self._v
+
+            def interpolate(t):
+                return hermite_interpolate(t0, r0, v0, t1, r1, v1, t)
+
+            self._check_events(t0, (r0, v0), t1, (r1, v1), interpolate)
+
+    def _fixed_samples(self):
+        if self.output_times is None:
+            for j in range(self._n_samples, len(self.t_array)):
+                # Sample j holds the state after step j * record_every
+                while self._n_steps <= j * self.record_every:
+                    self._step()
+                    if self.termination is not None:
+                        return
+                yield self._r, self._v
+        else:
+            # Step until each output time is bracketed, then interpolate
+            t_step = self.t_start + self._n_steps * self.dt
+            start = self._n_samples
+            for t in self.t_array[start:]:
+                while t_step < t and self.termination is None:
+                    self._prev = (self._r, self._v, t_step)
+                    self._step()
+                    t_step = self.t_start + self._n_steps * self.dt
+                if self.termination is not None and t > self.termination["t"]:
+                    return
+                if t == t_step:
+                    yield self._r, self._v
+                else:
+                    r_prev, v_prev, t_prev = self._prev
+                    yield hermite_interpolate(
+                        t_prev, r_prev, v_prev, t_step, self._r, self._v, t
+                    )
+
+    def _derivative(self, _t, y):
+        # y holds the integrated positions and velocities
+        return np.stack((y[1], self._accel(y[0], y[1])))
+
+    def _adaptive_step(self):
+        solver = self._solver
+        solver.step()
+        if self._on_step is not None:
+            self.stats.t = solver.t
+            self.stats.n_steps = solver.n_accepted
+            self.stats.n_rejected = solver.n_rejected
+            self._on_step(self.stats)
+        if self.events:
+            y0 = solver._y_old
+            self._check_events(
+                solver._t_old, (y0[0], y0[1]), solver.t, solver.y, solver.dense
+            )
+
+    def _adaptive_samples(self):
+        if self._solver is None:
+            self._solver = DormandPrince(
+                self._derivative,
+                self.t_start,
+                np.stack((self._r, self._v)),
+                self.dt,
+                rtol=self.rtol,
+                atol=self.atol,
+                h_min=self.dt_min,
+                h_max=self.dt_max,
+            )
+        solver = self._solver
+        start = self._n_samples
+        for t in self.t_array[start:]:
+            while solver.t < t and self.termination is None:
+                self._adaptive_step()
+            if self.termination is not None and t > self.termination["t"]:
+                return
+            y = solver.dense(t)
+            yield y[0], y[1]
+
+    def _finish(self):
+        """
+        Store the final state on the simulation and collect the step statistics.
+        """
+        if self.termination is not None:
+            t_event, r, v = self._terminal_state
+            elapsed = t_event - self.t_start
+            solver = self._solver
+            n_accepted = self._n_steps if solver is None else solver.n_accepted
+            n_rejected = 0 if solver is None else solver.n_rejected
+        elif self.integrator == "dopri5":
+            t_last = self.t_array[-1]
+            y = self._solver.dense(t_last)
+            r, v, elapsed = y[0], y[1], t_last - self.t_start
+            n_accepted = self._solver.n_accepted
+            n_rejected = self._solver.n_rejected
+        else:
+            if self.output_times is None:
+                # Take the steps after the last recorded sample
+                while self._n_steps < self.n_steps:
+                    self._step()
+            r, v, elapsed = self._r, self._v, self._n_steps * self.dt
+            n_accepted = self._n_steps
+            n_rejected = 0
+
+        self.r1[...], self.r2[...], self.v1[...], self.v2[...] = self._bodies(
+            r.copy(), v.copy(), elapsed
+        )
+        self.step_stats = {
+            "n_accepted": n_accepted,
+            "n_rejected": n_rejected,
+            "n_evaluations": self._n_evaluations,
+        }
+        self.stats.n_steps = n_accepted
+        self.stats.n_rejected = n_rejected
+        self.stats.n_evaluations = self._n_evaluations
+
+    def checkpoint(self, filename):
+        """
+        Write the full integrator state to a compact `.npz` checkpoint file.
+
+        The checkpoint holds the settings, the integrated state, the step-size
+        controller of the adaptive integrator and the number of samples produced,
+        so that `BBHSimulation.resume` continues exactly where the run stopped.
 
-            spins = (self.spin1, self.spin2) if self.spin else None
+        Parameters:
+        - filename (str): Path of the checkpoint file.
+        """
+        arrays = {
+            "r1": self.r1,
+            "r2": self.r2,
+            "v1": self.v1,
+            "v2": self.v2,
+            "r": self._r,
+            "v": self._v,
+            "centre": self._centre,
+            "centre_velocity": self._centre_velocity,
+        }
+        if self.output_times is not None:
+            arrays["output_times"] = self.output_times
+        metadata = self._metadata()
+        metadata["n_steps_taken"] = self._n_steps
+        metadata["n_samples"] = self._n_samples
+        metadata["n_evaluations"] = self._n_evaluations
+        if self.termination is not None:
+            metadata["termination"] = {
+                "name": self.termination["name"],
+                "t": self.termination["t"],
+            }
+            _, arrays["terminal_r"], arrays["terminal_v"] = self._terminal_state
+        if self._prev is not None:
+            arrays["r_prev"], arrays["v_prev"], metadata["t_prev"] = self._prev
+        if self._solver is not None:
+            state = self._solver.get_state()
+            for name, value in state.items():
+                if isinstance(value, np.ndarray):
+                    arrays["solver_" + name] = value
+                else:
+                    metadata["solver_" + name] = value
 
-            a1 = compute_acceleration(
-                r, v, self.m1, self.m2, self.pn_order, self.radiation, spins
+        # Write to a temporary file first so a kill never leaves a broken checkpoint
+        tmp_filename = os.fspath(filename) + ".tmp.npz"
+        save_arrays(tmp_filename, arrays, metadata, format="npz")
+        os.replace(tmp_filename, filename)
+
+    @classmethod
+    def resume(cls, filename, events=None):
+        """
+        Rebuild a simulation from a checkpoint written by `checkpoint`.
+
+        Calling `run()` (with the same `out` buffers or `store` as the interrupted
+        run) or `iter_run()` on the result continues the integration after the
+        last checkpointed sample; the output matches an uninterrupted run.
+
+        Parameters:
+        - filename (str): Path of the checkpoint file.
+        - events (list): Events of the interrupted run, which are not stored in
+          the checkpoint (default: None).
+
+        Returns:
+        - simulation (BBHSimulation): The restored simulation.
+        """
+        arrays, metadata = load_arrays(filename, format="npz")
+        settings = {
+            name: np.array(value) if isinstance(value, list) else value
+            for name, value in metadata.items()
+            if name in _SETTINGS
+        }
+        simulation = cls(
+            r1_init=arrays["r1"],
+            r2_init=arrays["r2"],
+            v1_init=arrays["v1"],
+            v2_init=arrays["v2"],
+            output_times=arrays.get("output_times"),
+            events=events,
+            **settings,
+        )
+        simulation._prepare()
+        simulation._r = arrays["r"]
+        simulation._v = arrays["v"]
+        simulation._centre = arrays["centre"]
+        simulation._centre_velocity = arrays["centre_velocity"]
+        simulation._prev = None
+        if "t_prev" in metadata:
+            simulation._prev = (arrays["r_prev"], arrays["v_prev"], metadata["t_prev"])
+        simulation._solver = None
+        if simulation.integrator == "dopri5" and "solver_t" in metadata:
+            state = {
+                name.replace("solver_", "", 1): value
+                for name, value in list(arrays.items()) + list(metadata.items())
+                if name.startswith("solver_")
+            }
+            simulation._solver = DormandPrince(
+                simulation._derivative,
+                state["t"],
+                state["y"],
+                state["h"],
+                rtol=simulation.rtol,
+                atol=simulation.atol,
+                h_min=simulation.dt_min,
+                h_max=simulation.dt_max,
             )
-            a2 = -compute_acceleration(
-                r, v, self.m1, self.m2, self.pn_order, self.radiation, spins
+            simulation._solver.set_state(state)
+        simulation._n_steps = metadata["n_steps_taken"]
+        simulation._n_samples = metadata["n_samples"]
+        simulation._n_evaluations = metadata["n_evaluations"]
+        if "termination" in metadata:
+            # The run already ended at a terminal event
+            t_event = metadata["termination"]["t"]
+            simulation.termination = metadata["termination"]
+            simulation._terminal_state = (
+                t_event,
+                arrays["terminal_r"],
+                arrays["terminal_v"],
+            )
+            simulation.t_array = simulation.t_array[: simulation._n_samples]
+        simulation._pending = True
+        return simulation
+
+    def extend(self, t_end, output_times=None, chunk_size=4096):
+        """
+        Continue a finished run to a later `t_end`.
+
+        The integration continues from the final integrator state and the new
+        samples are appended to the existing arrays (or to `self.store` if the
+        run was written to a store), matching one uninterrupted run to `t_end`.
+
+        Parameters:
+        - t_end (float): New end time of the simulation.
+        - output_times (numpy.ndarray): Additional output times, required when
+          the run was started with `output_times` (default: None).
+        - chunk_size (int): Number of samples integrated between writes
+          (default: 4096).
+        """
+        if self._n_samples != len(self.t_array) or self._force is None:
+            raise RuntimeError("extend() requires a completed run.")
+        if self.termination is not None:
+            raise RuntimeError(
+                f"The run was stopped by the {self.termination['name']} event."
+            )
+        if t_end < self.t_end:
+            raise ValueError(f"t_end must not be earlier than {self.t_end}.")
+
+        n_old = len(self.t_array)
+        if self.output_times is None:
+            if output_times is not None:
+                raise ValueError("output_times requires a run started with them.")
+            self.n_steps = len(np.arange(self.t_start, t_end + self.dt, self.dt))
+            self.t_array = np.arange(self.t_start, t_end + self.dt, self.dt)[
+                :: self.record_every
+            ]
+        else:
+            output_times = np.asarray(output_times, dtype=float)
+            if np.any(np.diff(output_times) < 0) or np.any(
+                output_times <= self.t_array[-1]
+            ):
+                raise ValueError(
+                    "output_times must be sorted and later than the last output time."
+                )
+            self.output_times = np.concatenate((self.output_times, output_times))
+            self.t_array = self.output_times
+        self.t_end = t_end
+        self._pending = True
+
+        if self.store is not None:
+            self.run(store=self.store, chunk_size=chunk_size)
+            return
+        if len(self.r1_array) != n_old:
+            # Resumed from a checkpoint without the earlier samples in memory
+            self.run(chunk_size=chunk_size)
+            return
+
+        old = [self.r1_array, self.r2_array]
+        if self.v1_array is not None:
+            old += [self.v1_array, self.v2_array]
+        buffers = []
+        for array in old:
+            buffer = np.empty((len(self.t_array),) + array.shape[1:], dtype=array.dtype)
+            buffer[:n_old] = array
+            buffers.append(buffer)
+        self.run(
+            out=buffers,
+            chunk_size=chunk_size,
+            velocities=self.v1_array is not None,
+        )
+
+    def _metadata(self):
+        metadata = {name: getattr(self, name) for name in _SETTINGS}
+        metadata["version"] = __version__
+        return metadata
+
+    def save_data(self, filename, format=None, waveform=None):
+        """
+        Save the simulation results.
+
+        The binary formats store `t_array`, the positions, the velocities (if the
+        run stored them), the optional waveform and the run settings. The legacy
+        `txt` format only stores the positions.
+
+        Parameters:
+        - filename (str): Output path. A `.npz` extension selects the `npz`
+          format, a `.npy` extension or an existing directory the `npy` format
+          (a directory of `.npy` files plus a JSON metadata file), and any other
+          path the `txt` format.
+        - format (str): `'npy'`, `'npz'` or `'txt'` to override the extension.
+        - waveform (tuple): Optional `(h_plus, h_cross)` to store with the run.
+        """
+        if infer_format(filename, format) == "txt":
+            data = np.column_stack(
+                (self.r1_array, self.r2_array, self.r1_array_2d, self.r2_array_2d)
             )
+            np.savetxt(filename, data)
+            return
+
+        arrays = {"t": self.t_array, "r1": self.r1_array, "r2": self.r2_array}
+        if self.v1_array is not None:
+            arrays["v1"] = self.v1_array
+            arrays["v2"] = self.v2_array
+        if waveform is not None:
+            arrays["h_plus"], arrays["h_cross"] = waveform
+        save_arrays(filename, arrays, self._metadata(), format)
+
+    def load_data(self, filename, mmap=False, format=None):
+        """
+        Load simulation results written by `save_data`.
+
+        Parameters:
+        - filename (str): Path written by `save_data`.
+        - mmap (bool): Memory-map the arrays instead of reading them, so large
+          runs open instantly (default: False). Requires the `npy` format.
+        - format (str): `'npy'`, `'npz'` or `'txt'` to override the extension.
+
+        Returns:
+        - waveform (tuple): `(h_plus, h_cross)` if stored with the run, else None.
+        """
+        if infer_format(filename, format) == "txt":
+            data = np.loadtxt(filename)
+            self.r1_array = data[:, :3]
+            self.r2_array = data[:, 3:6]
+            self.r1_array_2d = data[:, 6:8]
+            self.r2_array_2d = data[:, 8:]
+            return None
+
+        arrays, metadata = load_arrays(filename, mmap=mmap, format=format)
+        for name in _SETTINGS:
+            if name in metadata:
+                value = metadata[name]
+                setattr(
+                    self, name, np.array(value) if isinstance(value, list) else value
+                )
+        self.t_array = arrays["t"]
+        self.r1_array = arrays["r1"]
+        self.r2_array = arrays["r2"]
+        self.r1_array_2d = self.r1_array[:, :2]
+        self.r2_array_2d = self.r2_array[:, :2]
+        self.v1_array = arrays.get("v1")
+        self.v2_array = arrays.get("v2")
+        if "h_plus" in arrays:
+            return arrays["h_plus"], arrays["h_cross"]
+        return None
+
+
+def _ensemble_acceleration(r, v, m1, m2, pn_order, radiation, spins):
+    """
+    Relative acceleration for a stack of binaries whose PN order and radiation
+    reaction settings may differ per binary.
+    """
+    r_mag = np.linalg.norm(r, axis=-1)
+    v_mag = np.linalg.norm(v, axis=-1)
+
+    a = compute_acceleration(r, v, m1, m2, pn_order=0)
+    for order, term in ((1, compute_1pn_correction), (2, compute_2pn_correction)):
+        mask = pn_order >= order
+        if np.any(mask):
+            a += mask[:, np.newaxis] * term(r, v, r_mag, v_mag, m1, m2)
+    if np.any(radiation):
+        a += radiation[:, np.newaxis] * compute_radiation_reaction(r, v, r_mag, m1, m2)
+    if spins is not None:
+        a += compute_spin_effects(r, v, r_mag, spins)
+    return a
+
+
+class BBHEnsemble:
+    """
+    Integrate many independent binaries in lockstep.
+
+    All systems share the time grid of `BBHSimulation` and the same update rule,
+    but are held in contiguous (N, 2, 3) position and velocity arrays and advanced
+    with one vectorized step per time step. Binaries whose separation drops below
+    `r_min` (default: the sum of the Schwarzschild radii), grows beyond `r_max`, or
+    becomes non-finite are masked out; their remaining samples are NaN.
+
+    Parameters:
+    - m1, m2 (numpy.ndarray): Masses of the black holes, shape (N,).
+    - r1_init, r2_init (numpy.ndarray): Initial positions, shape (N, 3).
+    - v1_init, v2_init (numpy.ndarray): Initial velocities, shape (N, 3).
+    - t_start, t_end, dt (float): Time grid shared by every binary.
+    - pn_order (int or numpy.ndarray): Post-Newtonian order, scalar or shape (N,).
+    - radiation (bool or numpy.ndarray): Radiation reaction flag, scalar or shape (N,).
+    - spin (bool): Whether to include spin effects.
+    - spin1, spin2 (numpy.ndarray): Spin vectors, shape (N, 3).
+    - r_min (float or numpy.ndarray): Merger separation (default: None).
+    - r_max (float or numpy.ndarray): Maximum valid separation (default: None).
+    """
+
+    def __init__(
+        self,
+        m1,
+        m2,
+        r1_init,
+        r2_init,
+        v1_init,
+        v2_init,
+        t_start,
+        t_end,
+        dt,
+        pn_order=0,
+        radiation=False,
+        spin=False,
+        spin1=None,
+        spin2=None,
+        r_min=None,
+        r_max=None,
+    ):
+        self.m1 = np.asarray(m1, dtype=float)
+        self.m2 = np.asarray(m2, dtype=float)
+        n = self.m1.shape[0]
+
+        self.r = np.empty((n, 2, 3))
+        self.v = np.empty((n, 2, 3))
+        self.r[:, 0] = r1_init
+        self.r[:, 1] = r2_init
+        self.v[:, 0] = v1_init
+        self.v[:, 1] = v2_init
+
+        self.t_start = t_start
+        self.t_end = t_end
+        self.dt = dt
+        self.pn_order = np.broadcast_to(pn_order, (n,))
+        self.radiation = np.broadcast_to(np.asarray(radiation, dtype=bool), (n,))
+        self.spin = spin
+        self.spin1 = None if spin1 is None else np.broadcast_to(spin1, (n, 3))
+        self.spin2 = None if spin2 is None else np.broadcast_to(spin2, (n, 3))
+
+        if r_min is None:
+            r_min = 2 * G * (self.m1 + self.m2) / c**2
+        self.r_min = np.broadcast_to(r_min, (n,))
+        self.r_max = np.broadcast_to(np.inf if r_max is None else r_max, (n,))
+
+        self.t_array = np.arange(t_start, t_end + dt, dt)
+        self.active = np.ones(n, dtype=bool)
+        self.t_stop = np.full(n, np.nan)
+        self.r1_array = None
+        self.r2_array = None
+
+    def __len__(self):
+        return self.m1.shape[0]
+
+    def _acceleration(self, idx):
+        r = self.r[idx, 1] - self.r[idx, 0]
+        v = self.v[idx, 1] - self.v[idx, 0]
+        spins = (self.spin1[idx], self.spin2[idx]) if self.spin else None
+        return _ensemble_acceleration(
+            r,
+            v,
+            self.m1[idx],
+            self.m2[idx],
+            self.pn_order[idx],
+            self.radiation[idx],
+            spins,
+        )
+
+    def run(self):
+        n_steps = len(self.t_array)
+        self.r1_array = np.full((len(self), n_steps, 3), np.nan)
+        self.r2_array = np.full((len(self), n_steps, 3), np.nan)
+
+        # Use a plain slice while every binary is alive so no fancy-index copies
+        # are made on the common path.
+        idx = slice(None)
+        for i, t in enumerate(self.t_array):
+            a = self._acceleration(idx)
 
             # Update velocities
-            self.v1 += a1 * self.dt
-            self.v2 += a2 * self.dt
+            self.v[idx, 0] += a * self.dt
+            self.v[idx, 1] -= a * self.dt
 
             # Update positions
-            self.r1 += self.v1 * self.dt
-            self.r2 += self.v2 * self.dt
+            self.r[idx] += self.v[idx] * self.dt
 
             # Store positions
-            self.r1_array.append(self.r1.copy())
-            self.r2_array.append(self.r2.copy())
-
-            if self.r1.size == 3:  # Check if the input positions are 3D
-                self.r1_array_2d.append(self.r1[:2].copy())
-                self.r2_array_2d.append(self.r2[:2].copy())
-            else:  # If the input positions are 2D, directly store them
-                self.r1_array_2d.append(self.r1.copy())
-                self.r2_array_2d.append(self.r2.copy())
-
-        self.r1_array = np.array(self.r1_array)
-        self.r2_array = np.array(self.r2_array)
-        self.r1_array_2d = np.array(self.r1_array_2d)
-        self.r2_array_2d = np.array(self.r2_array_2d)
-
-    def save_data(self, filename):
-        data = np.column_stack(
-            (self.r1_array, self.r2_array, self.r1_array_2d, self.r2_array_2d)
-        )
-        np.savetxt(filename, data)
-
-    def load_data(self, filename):
-        data = np.loadtxt(filename)
-        self.r1_array = data[:, :3]
-        self.r2_array = data[:, 3:6]
-        self.r1_array_2d = data[:, 6:8]
-        self.r2_array_2d = data[:, 8:]
+            self.r1_array[idx, i] = self.r[idx, 0]
+            self.r2_array[idx, i] = self.r[idx, 1]
+
+            sep = np.linalg.norm(self.r[:, 1] - self.r[:, 0], axis=-1)
+            stopped = self.active & (
+                ~np.isfinite(sep) | (sep < self.r_min) | (sep > self.r_max)
+            )
+            if np.any(stopped):
+                self.active &= ~stopped
+                self.t_stop[stopped] = t
+                if not np.any(self.active):
+                    break
+                idx = np.flatnonzero(self.active)
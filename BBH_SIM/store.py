@@ -0,0 +1,224 @@
+# store.py
+
+import json
+import os
+
+import numpy as np
+
+from .io import _json_default
+
+INDEX_FILE = "index.json"
+DEFAULT_FIELDS = ("r1", "r2", "v1", "v2")
+
+
+class TrajectoryStore:
+    """
+    Append-only on-disk trajectory store for runs larger than memory.
+
+    The store is a directory of fixed-size chunks, each a `numpy.memmap` of
+    records holding a time `t` and one vector per field, plus an `index.json`
+    file listing the number of samples and the time range of every chunk.
+    Readers only map the chunks overlapping the requested time window.
+
+    Opening an existing directory reopens its store for reading and appending;
+    the remaining arguments are then taken from its index.
+
+    Parameters:
+    - path (str): Directory of the store.
+    - fields (tuple): Names of the vector fields (default: r1, r2, v1, v2).
+    - dim (int): Number of components of each vector (default: 3).
+    - chunk_size (int): Number of samples per chunk file (default: 1000000).
+    - metadata (dict): JSON-serializable run information (default: None).
+    """
+
+    def __init__(
+        self, path, fields=DEFAULT_FIELDS, dim=3, chunk_size=1000000, metadata=None
+    ):
+        self.path = os.fspath(path)
+        index_path = os.path.join(self.path, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                index = json.load(f)
+            self.fields = tuple(index["fields"])
+            self.dim = index["dim"]
+            self.chunk_size = index["chunk_size"]
+            self.metadata = index["metadata"]
+            self.chunks = index["chunks"]
+        else:
+            os.makedirs(self.path, exist_ok=True)
+            self.fields = tuple(fields)
+            self.dim = dim
+            self.chunk_size = chunk_size
+            self.metadata = dict(metadata or {})
+            self.chunks = []
+            self._write_index()
+
+        self.dtype = np.dtype(
+            [("t", float)] + [(name, float, (self.dim,)) for name in self.fields]
+        )
+        self._writer = None
+
+    def __len__(self):
+        return sum(chunk["n"] for chunk in self.chunks)
+
+    @property
+    def t_range(self):
+        """
+        First and last time stored, or None for an empty store.
+        """
+        if not self.chunks:
+            return None
+        return self.chunks[0]["t_start"], self.chunks[-1]["t_end"]
+
+    def _write_index(self):
+        index = {
+            "fields": list(self.fields),
+            "dim": self.dim,
+            "chunk_size": self.chunk_size,
+            "metadata": self.metadata,
+            "chunks": self.chunks,
+        }
+        tmp_path = os.path.join(self.path, INDEX_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, default=_json_default)
+        os.replace(tmp_path, os.path.join(self.path, INDEX_FILE))
+
+    def _map(self, i, mode="r"):
+        filename = os.path.join(self.path, self.chunks[i]["file"])
+        return np.memmap(
+            filename, dtype=self.dtype, mode=mode, shape=(self.chunk_size,)
+        )
+
+    def append(self, t, **arrays):
+        """
+        Append samples to the end of the store.
+
+        Parameters:
+        - t (numpy.ndarray): Times of the samples, shape (k,), after the last
+          stored time.
+        - **arrays (numpy.ndarray): One (k, dim) array per field of the store.
+        """
+        t = np.atleast_1d(t)
+        missing = set(self.fields) - set(arrays)
+        if missing:
+            raise ValueError(f"Missing fields: {sorted(missing)}.")
+
+        pos = 0
+        while pos < len(t):
+            if not self.chunks or self.chunks[-1]["n"] == self.chunk_size:
+                if self._writer is not None:
+                    self._writer[1].flush()
+                i = len(self.chunks)
+                self.chunks.append(
+                    {
+                        "file": f"chunk_{i:06d}.dat",
+                        "n": 0,
+                        "t_start": None,
+                        "t_end": None,
+                    }
+                )
+                self._writer = (i, self._map(i, mode="w+"))
+            elif self._writer is None or self._writer[0] != len(self.chunks) - 1:
+                self._writer = (
+                    len(self.chunks) - 1,
+                    self._map(len(self.chunks) - 1, "r+"),
+                )
+
+            chunk = self.chunks[-1]
+            records = self._writer[1]
+            k = min(len(t) - pos, self.chunk_size - chunk["n"])
+            start = chunk["n"]
+            stop = start + k
+            block = slice(pos, pos + k)
+            records["t"][start:stop] = t[block]
+            for name in self.fields:
+                records[name][start:stop] = arrays[name][block]
+
+            if start == 0:
+                chunk["t_start"] = float(t[pos])
+            chunk["t_end"] = float(t[pos + k - 1])
+            chunk["n"] = stop
+            pos += k
+
+        self._write_index()
+
+    def truncate(self, n):
+        """
+        Drop all samples after the first `n`.
+        """
+        if n > len(self):
+            raise ValueError(f"Cannot truncate a store of {len(self)} samples to {n}.")
+        if n == len(self):
+            return
+        if self._writer is not None:
+            self._writer[1].flush()
+            self._writer = None
+
+        kept = []
+        remaining = n
+        for i, chunk in enumerate(self.chunks):
+            if remaining == 0:
+                os.remove(os.path.join(self.path, chunk["file"]))
+                continue
+            if chunk["n"] > remaining:
+                chunk["n"] = remaining
+                chunk["t_end"] = float(self._map(i)["t"][remaining - 1])
+            remaining -= chunk["n"]
+            kept.append(chunk)
+        self.chunks = kept
+        self._write_index()
+
+    def flush(self):
+        """
+        Write pending chunk data and the index to disk.
+        """
+        if self._writer is not None:
+            self._writer[1].flush()
+        self._write_index()
+
+    def iter_chunks(self, t_min=-np.inf, t_max=np.inf, fields=None):
+        """
+        Lazily iterate over the stored samples with `t_min <= t <= t_max`.
+
+        Yields:
+        - block (dict): Memory-mapped arrays `t` and one per field for the part
+          of a chunk inside the window.
+        """
+        fields = self.fields if fields is None else fields
+        for i, chunk in enumerate(self.chunks):
+            if chunk["n"] == 0 or chunk["t_end"] < t_min or chunk["t_start"] > t_max:
+                continue
+            records = self._map(i)[: chunk["n"]]
+            t = records["t"]
+            start = np.searchsorted(t, t_min, side="left")
+            stop = np.searchsorted(t, t_max, side="right")
+            if start < stop:
+                block = {"t": t[start:stop]}
+                for name in fields:
+                    block[name] = records[name][start:stop]
+                yield block
+
+    def window(self, t_min=-np.inf, t_max=np.inf, fields=None):
+        """
+        Read the samples with `t_min <= t <= t_max` into memory.
+
+        Returns:
+        - data (dict): Arrays `t` and one per field.
+        """
+        fields = self.fields if fields is None else fields
+        blocks = list(self.iter_chunks(t_min, t_max, fields))
+        if not blocks:
+            data = {"t": np.empty(0)}
+            data.update({name: np.empty((0, self.dim)) for name in fields})
+            return data
+        return {
+            name: np.concatenate([block[name] for block in blocks])
+            for name in ("t",) + tuple(fields)
+        }
+
+    def read(self, name):
+        """
+        Read a whole field (or `'t'`) into memory.
+        """
+        fields = () if name == "t" else (name,)
+        return self.window(fields=fields)[name]
@@ -0,0 +1,398 @@
+# surrogate.py
+
+import numpy as np
+
+from .io import load_arrays, save_arrays
+from .simulation import BBHSimulation
+from .waveform import generate_waveform
+
+_INIT_KEYS = ("r1_init", "r2_init", "v1_init", "v2_init", "spin1", "spin2")
+DEFAULT_NAMES = ("m1", "m2", "spin1", "spin2")
+# Number of distances between evaluation points and training points computed at
+# once by `Surrogate.evaluate`
+_BLOCK_SIZE = 1 << 22
+
+
+def simulate_waveforms(params, waveform=None):
+    """
+    Run a `BBHSimulation` for every parameter set and compute its waveform.
+
+    Parameters:
+    - params (list): `BBHSimulation` keyword arguments, one dictionary per run,
+      all sharing the same time grid.
+    - waveform (callable): Waveform model `waveform(t, r1, r2, m1, m2)` returning
+      `(h_plus, h_cross)` (default: `generate_waveform`).
+
+    Returns:
+    - t (numpy.ndarray): Common time grid.
+    - h_plus, h_cross (numpy.ndarray): Polarizations, shape (len(params), len(t)).
+    """
+    waveform = generate_waveform if waveform is None else waveform
+    t = None
+    h_plus, h_cross = [], []
+    for p in params:
+        kwargs = dict(p)
+        for key in _INIT_KEYS:
+            if kwargs.get(key) is not None:
+                kwargs[key] = np.array(kwargs[key], dtype=float)
+        simulation = BBHSimulation(**kwargs)
+        simulation.run()
+        if t is None:
+            t = simulation.t_array
+        elif not np.array_equal(simulation.t_array, t):
+            raise ValueError("All runs of a training set must share the time grid.")
+        hp, hc = waveform(
+            simulation.t_array,
+            simulation.r1_array,
+            simulation.r2_array,
+            simulation.m1,
+            simulation.m2,
+        )
+        h_plus.append(hp)
+        h_cross.append(hc)
+    return t, np.array(h_plus), np.array(h_cross)
+
+
+def _greedy_basis(h, tolerance, max_basis):
+    # Orthonormal basis built from the worst-represented training waveform
+    residual = h / np.linalg.norm(h, axis=1, keepdims=True)
+    basis = []
+    while len(basis) < max_basis:
+        errors = np.einsum("ij,ij->i", residual, residual.conj()).real
+        worst = np.argmax(errors)
+        if errors[worst] <= tolerance:
+            break
+        vector = residual[worst] / np.sqrt(errors[worst])
+        basis.append(vector)
+        residual -= np.outer(residual @ vector.conj(), vector)
+    return np.array(basis)
+
+
+def _svd_basis(h, tolerance, max_basis):
+    # Leading right singular vectors keeping all but `tolerance` of the energy
+    h = h / np.linalg.norm(h, axis=1, keepdims=True)
+    _, s, vh = np.linalg.svd(h, full_matrices=False)
+    energy = np.cumsum(s[::-1] ** 2)[::-1] / np.sum(s**2)
+    # energy[k] is the fraction of the energy outside the first k vectors
+    n_basis = np.count_nonzero(energy > tolerance)
+    return vh[: max(1, min(n_basis, max_basis))]
+
+
+def _polyharmonic(x, centres):
+    # Cubic radial basis function of the distances between the rows of x and centres
+    d = np.sqrt(np.maximum(_sq_distances(x, centres), 0.0))
+    return d**3
+
+
+def _sq_distances(x, centres):
+    return (
+        np.sum(x**2, axis=1)[:, np.newaxis]
+        - 2 * x @ centres.T
+        + np.sum(centres**2, axis=1)[np.newaxis, :]
+    )
+
+
+class Surrogate:
+    """
+    Reduced-order model of the waveforms of a family of simulations.
+
+    The training waveforms h = h_plus - i h_cross are aligned in time and phase,
+    projected onto a reduced orthonormal basis, and the projection coefficients
+    are interpolated across parameter space with cubic radial basis functions
+    plus a linear polynomial. Evaluating the model costs one small matrix
+    product per parameter point instead of a simulation.
+
+    Build models with `Surrogate.fit` or `build_surrogate`, and reload saved ones
+    with `Surrogate.load`.
+
+    Attributes:
+    - t (numpy.ndarray): Time grid of the waveforms, relative to the alignment
+      time.
+    - names (tuple): Names of the parameters of the model.
+    - basis (numpy.ndarray): Reduced basis, shape (n_basis, len(t)).
+    - validation (dict): Relative errors against held-out simulations, see
+      `validate` (default: None).
+    """
+
+    def __init__(self, t, names, widths, basis, centres, weights, offset, scale, mask):
+        self.t = t
+        self.names = tuple(names)
+        self.widths = tuple(widths)
+        self.basis = basis
+        self.centres = centres
+        self.weights = weights
+        self.offset = offset
+        self.scale = scale
+        self.mask = mask
+        self.align = "start"
+        self.reference = 0
+        self.validation = None
+
+    def __len__(self):
+        return len(self.basis)
+
+    @staticmethod
+    def _align(t, h_plus, h_cross, align, first=None):
+        """
+        Shift complex waveforms to a common reference time and zero phase there.
+
+        The reference time is sample `first` of the returned grid (default: the
+        earliest reference sample of the waveforms).
+        """
+        h = np.asarray(h_plus) - 1j * np.asarray(h_cross)
+        if align == "start":
+            reference = np.zeros(len(h), dtype=int)
+        elif align == "peak":
+            reference = np.argmax(np.abs(h), axis=1)
+        else:
+            raise ValueError(f"Invalid align: {align}. Use 'start' or 'peak'.")
+
+        first = reference.min() if first is None else first
+        grid = t - t[first]
+        if align == "peak":
+            # Resample each waveform so its peak is at grid time zero
+            for row, i in zip(h, reference):
+                if i != first:
+                    shifted = grid + t[i]
+                    row[:] = np.interp(shifted, t, row.real) + 1j * np.interp(
+                        shifted, t, row.imag
+                    )
+        h *= np.exp(-1j * np.angle(h[:, first]))[:, np.newaxis]
+        return grid, h, first
+
+    def _points(self, params):
+        """
+        Parameter points as rows of a float array, and whether a single point was
+        given.
+        """
+        if isinstance(params, dict):
+            columns = []
+            single = True
+            for name, width in zip(self.names, self.widths):
+                value = np.asarray(params[name], dtype=float)
+                single &= value.ndim == (0 if width == 1 else 1)
+                columns.append(value.reshape(-1, width))
+            n_points = max(len(column) for column in columns)
+            columns = [np.broadcast_to(c, (n_points, c.shape[1])) for c in columns]
+            return np.hstack(columns), single
+        if isinstance(params, (list, tuple)) and params and isinstance(params[0], dict):
+            points = [self._points(p)[0][0] for p in params]
+            return np.array(points), False
+        points = np.asarray(params, dtype=float)
+        return np.atleast_2d(points), points.ndim == 1
+
+    @classmethod
+    def fit(
+        cls,
+        t,
+        h_plus,
+        h_cross,
+        params,
+        names=None,
+        tolerance=1e-10,
+        method="svd",
+        max_basis=None,
+        align="peak",
+    ):
+        """
+        Build a surrogate from training waveforms.
+
+        Parameters:
+        - t (numpy.ndarray): Common time grid of the waveforms.
+        - h_plus, h_cross (numpy.ndarray): Training polarizations, one row per
+          parameter set.
+        - params (list): Parameter dictionaries of the training waveforms, e.g.
+          the `BBHSimulation` arguments.
+        - names (tuple): Parameters of the model, scalars or vectors (default:
+          those of m1, m2, spin1 and spin2 found in the first dictionary).
+        - tolerance (float): Fraction of the squared norm of the normalized
+          training waveforms that may be left out of the basis, per waveform
+          for the greedy method and on average for the SVD (default: 1e-10).
+        - method (str): `'svd'` or `'greedy'` reduced basis (default: `'svd'`).
+        - max_basis (int): Maximum size of the basis (default: None).
+        - align (str): Align the waveforms at the first sample (`'start'`) or at
+          their peak amplitude (`'peak'`) (default: `'peak'`).
+
+        Returns:
+        - surrogate (Surrogate): The fitted model.
+        """
+        if names is None:
+            names = [name for name in DEFAULT_NAMES if params[0].get(name) is not None]
+        widths = [np.size(params[0][name]) for name in names]
+        grid, h, first = cls._align(np.asarray(t, dtype=float), h_plus, h_cross, align)
+
+        max_basis = len(h) if max_basis is None else max_basis
+        if method == "svd":
+            basis = _svd_basis(h, tolerance, max_basis)
+        elif method == "greedy":
+            basis = _greedy_basis(h, tolerance, max_basis)
+        else:
+            raise ValueError(f"Invalid method: {method}. Use 'svd' or 'greedy'.")
+        coefficients = h @ basis.conj().T
+
+        surrogate = cls(grid, names, widths, basis, None, None, None, None, None)
+        points, _ = surrogate._points(list(params))
+        # Parameters that do not vary are left out of the interpolation
+        low, high = points.min(axis=0), points.max(axis=0)
+        mask = high > low
+        offset = low[mask]
+        scale = (high - low)[mask]
+        x = (points[:, mask] - offset) / scale
+
+        n, d = x.shape
+        poly = np.hstack((np.ones((n, 1)), x))
+        system = np.zeros((n + d + 1, n + d + 1))
+        system[:n, :n] = _polyharmonic(x, x)
+        system[:n, n:] = poly
+        system[n:, :n] = poly.T
+        rhs = np.zeros((n + d + 1, len(basis)), dtype=complex)
+        rhs[:n] = coefficients
+        weights = np.linalg.lstsq(system, rhs, rcond=None)[0]
+
+        surrogate.centres = x
+        surrogate.weights = weights
+        surrogate.offset = offset
+        surrogate.scale = scale
+        surrogate.mask = mask
+        surrogate.align = align
+        surrogate.reference = int(first)
+        return surrogate
+
+    def _coefficients(self, points):
+        # Interpolated basis coefficients, shape (n_points, len(self))
+        x = (points[:, self.mask] - self.offset) / self.scale
+        n = len(self.centres)
+        linear = n + 1
+        out = np.empty((len(x), len(self.basis)), dtype=complex)
+        block = max(1, _BLOCK_SIZE // n)
+        for start in range(0, len(x), block):
+            stop = start + block
+            xb = x[start:stop]
+            out[start:stop] = _polyharmonic(xb, self.centres) @ self.weights[:n]
+            out[start:stop] += self.weights[n] + xb @ self.weights[linear:]
+        return out
+
+    def evaluate(self, params):
+        """
+        Evaluate the waveform at one or many parameter points.
+
+        Parameters:
+        - params (dict or list or numpy.ndarray): A dictionary of parameter values,
+          each a scalar (vector for spins) or an array with one entry per point;
+          a list of such dictionaries; or parameter points as rows of an array,
+          with the vector parameters flattened in the order of `names`.
+
+        Returns:
+        - h_plus, h_cross (numpy.ndarray): Polarizations on `t`, shape (len(t),)
+          for a single point or (n_points, len(t)).
+        """
+        points, single = self._points(params)
+        h = self._coefficients(points) @ self.basis
+        if single:
+            h = h[0]
+        return h.real, -h.imag
+
+    def validate(self, params, h_plus, h_cross, t=None):
+        """
+        Estimate the error of the model against held-out waveforms.
+
+        The waveforms are aligned like the training set and compared with
+        `evaluate`; the results are stored in `self.validation`.
+
+        Parameters:
+        - params (list): Parameter dictionaries of the held-out waveforms.
+        - h_plus, h_cross (numpy.ndarray): Held-out polarizations, one row each.
+        - t (numpy.ndarray): Their time grid (default: the training grid).
+
+        Returns:
+        - errors (numpy.ndarray): Relative L2 error ||h_model - h|| / ||h|| per
+          waveform.
+        """
+        t = self.t if t is None else np.asarray(t, dtype=float)
+        _, h, _ = self._align(t, h_plus, h_cross, self.align, self.reference)
+        points, _ = self._points(list(params))
+        model = self._coefficients(points) @ self.basis
+        errors = np.linalg.norm(model - h, axis=1) / np.linalg.norm(h, axis=1)
+        self.validation = {
+            "errors": errors,
+            "max": float(errors.max()),
+            "mean": float(errors.mean()),
+        }
+        return errors
+
+    def save(self, filename, format="npz"):
+        """
+        Save the model to an `npz` file or `npy` directory.
+
+        Parameters:
+        - filename (str): Path to write; `.npz` is appended to `npz` paths
+          without it.
+        - format (str): `'npz'` or `'npy'` (default: npz).
+        """
+        arrays = {
+            "t": self.t,
+            "basis": self.basis,
+            "centres": self.centres,
+            "weights": self.weights,
+            "offset": self.offset,
+            "scale": self.scale,
+            "mask": self.mask,
+        }
+        metadata = {
+            "names": self.names,
+            "widths": self.widths,
+            "align": self.align,
+            "reference": self.reference,
+            "validation": self.validation,
+        }
+        save_arrays(filename, arrays, metadata, format)
+
+    @classmethod
+    def load(cls, filename, format="npz"):
+        """
+        Load a model written by `save` with the same `format`.
+        """
+        arrays, metadata = load_arrays(filename, format=format)
+        surrogate = cls(
+            arrays["t"],
+            metadata["names"],
+            metadata["widths"],
+            arrays["basis"],
+            arrays["centres"],
+            arrays["weights"],
+            arrays["offset"],
+            arrays["scale"],
+            arrays["mask"],
+        )
+        surrogate.align = metadata["align"]
+        surrogate.reference = metadata["reference"]
+        validation = metadata["validation"]
+        if validation is not None:
+            validation["errors"] = np.array(validation["errors"])
+        surrogate.validation = validation
+        return surrogate
+
+
+def build_surrogate(params, validation=None, waveform=None, **kwargs):
+    """
+    Simulate a training set and fit a `Surrogate` to it.
+
+    Parameters:
+    - params (list): `BBHSimulation` arguments of the training runs, sharing the
+      same time grid.
+    - validation (list): Arguments of held-out runs used to estimate the error of
+      the model (default: None).
+    - waveform (callable): Waveform model, see `simulate_waveforms` (default:
+      `generate_waveform`).
+    - **kwargs: Options of `Surrogate.fit`.
+
+    Returns:
+    - surrogate (Surrogate): The fitted model, with `validation` set when
+      held-out runs are given.
+    """
+    t, h_plus, h_cross = simulate_waveforms(params, waveform)
+    surrogate = Surrogate.fit(t, h_plus, h_cross, params, **kwargs)
+    if validation:
+        _, h_plus, h_cross = simulate_waveforms(validation, waveform)
+        surrogate.validate(validation, h_plus, h_cross, t)
+    return surrogate
@@ -0,0 +1,194 @@
+# sweep.py
+
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .simulation import BBHSimulation
+from .waveform import generate_waveform
+
+_INIT_KEYS = ("r1_init", "r2_init", "v1_init", "v2_init")
+
+# Output blocks shared between the parent and the workers, with the trailing
+# shape of one sample. Every task writes into its own row range of each block.
+_BLOCKS = (
+    ("t", ()),
+    ("r1", (3,)),
+    ("r2", (3,)),
+    ("h_plus", ()),
+    ("h_cross", ()),
+)
+
+
+def parameter_grid(grid):
+    """
+    Expand a dictionary of parameter options into a list of parameter sets.
+
+    Parameters:
+    - grid (dict): Mapping from a `BBHSimulation` argument name to a list of values.
+
+    Returns:
+    - params (list): One dictionary per point of the Cartesian product of the values.
+    """
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def _simulation(p):
+    kwargs = dict(p)
+    for key in _INIT_KEYS:
+        kwargs[key] = np.array(kwargs[key], dtype=float)
+    return BBHSimulation(**kwargs)
+
+
+def _n_samples(p):
+    # Output grid before the run; terminal events can only shorten it
+    return len(_simulation(p).t_array)
+
+
+def _attach(names, total):
+    shms = {key: shared_memory.SharedMemory(name=names[key]) for key, _ in _BLOCKS}
+    arrays = {
+        key: np.ndarray((total,) + shape, dtype=float, buffer=shms[key].buf)
+        for key, shape in _BLOCKS
+    }
+    return shms, arrays
+
+
+def _run_chunk(names, total, chunk, waveform):
+    shms, out = _attach(names, total)
+    timings = []
+    try:
+        for index, start, p in chunk:
+            t0 = time.perf_counter()
+            simulation = _simulation(p)
+            simulation.run()
+
+            n = len(simulation.t_array)
+            stop = start + n
+            out["t"][start:stop] = simulation.t_array
+            out["r1"][start:stop] = simulation.r1_array
+            out["r2"][start:stop] = simulation.r2_array
+            if waveform:
+                h_plus, h_cross = generate_waveform(
+                    simulation.t_array,
+                    simulation.r1_array,
+                    simulation.r2_array,
+                    simulation.m1,
+                    simulation.m2,
+                )
+                out["h_plus"][start:stop] = h_plus
+                out["h_cross"][start:stop] = h_cross
+            timings.append((index, n, time.perf_counter() - t0))
+    finally:
+        del out
+        for shm in shms.values():
+            shm.close()
+    return timings
+
+
+class SweepResult:
+    """
+    Results of a parameter sweep.
+
+    Trajectories and waveforms of all tasks are stored back to back in single
+    arrays; the per-task lists hold views into them.
+
+    Attributes:
+    - params (list): Parameter set of each task.
+    - n_samples (numpy.ndarray): Number of samples of each task, fewer than its
+      output grid when a terminal event ended the run.
+    - t_arrays (list): Time array of each task.
+    - r1_arrays, r2_arrays (list): Position arrays of each task, shape (len(t), 3).
+    - h_plus, h_cross (list): Waveform polarizations of each task (None if disabled).
+    - timings (numpy.ndarray): Wall-clock time spent on each task in seconds.
+    - elapsed (float): Wall-clock time of the whole sweep in seconds.
+    """
+
+    def __init__(self, params, offsets, n_samples, data, timings, elapsed, waveform):
+        self.params = params
+        self.n_samples = n_samples
+        bounds = list(zip(offsets[:-1], offsets[:-1] + n_samples))
+        self.t_arrays = [data["t"][a:b] for a, b in bounds]
+        self.r1_arrays = [data["r1"][a:b] for a, b in bounds]
+        self.r2_arrays = [data["r2"][a:b] for a, b in bounds]
+        self.h_plus = [data["h_plus"][a:b] for a, b in bounds] if waveform else None
+        self.h_cross = [data["h_cross"][a:b] for a, b in bounds] if waveform else None
+        self.timings = timings
+        self.elapsed = elapsed
+
+    def __len__(self):
+        return len(self.params)
+
+
+def sweep(params, max_workers=None, chunksize=1, waveform=True, progress=None):
+    """
+    Run many `BBHSimulation` configurations over a process pool.
+
+    Workers write trajectories and waveforms directly into shared memory blocks,
+    so only task indices and timings are sent back to the parent process.
+
+    Parameters:
+    - params (list or dict): List of `BBHSimulation` keyword argument dictionaries,
+      or a dictionary of option lists expanded with `parameter_grid`.
+    - max_workers (int): Number of worker processes (default: None, one per CPU).
+    - chunksize (int): Number of tasks submitted to a worker at once (default: 1).
+    - waveform (bool): Whether to also generate the waveforms (default: True).
+    - progress (callable): Called as `progress(n_done, n_total)` after each chunk.
+
+    Returns:
+    - result (SweepResult): Trajectories, waveforms and timings of every task.
+    """
+    if isinstance(params, dict):
+        params = parameter_grid(params)
+    params = list(params)
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be at least 1, got {chunksize}.")
+
+    offsets = np.concatenate(([0], np.cumsum([_n_samples(p) for p in params])))
+    total = int(offsets[-1])
+    tasks = [(i, int(offsets[i]), p) for i, p in enumerate(params)]
+    chunks = []
+    for task in tasks:
+        if not chunks or len(chunks[-1]) == chunksize:
+            chunks.append([])
+        chunks[-1].append(task)
+
+    shms = {}
+    try:
+        for key, shape in _BLOCKS:
+            nbytes = max(total * int(np.prod(shape, dtype=int)), 1) * 8
+            shms[key] = shared_memory.SharedMemory(create=True, size=nbytes)
+        names = {key: shm.name for key, shm in shms.items()}
+
+        timings = np.zeros(len(params))
+        n_samples = np.zeros(len(params), dtype=int)
+        t0 = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_run_chunk, names, total, chunk, waveform)
+                for chunk in chunks
+            ]
+            n_done = 0
+            for future in as_completed(futures):
+                for index, n, elapsed in future.result():
+                    n_samples[index] = n
+                    timings[index] = elapsed
+                    n_done += 1
+                if progress is not None:
+                    progress(n_done, len(params))
+        elapsed = time.perf_counter() - t0
+
+        data = {
+            key: np.ndarray((total,) + shape, dtype=float, buffer=shms[key].buf).copy()
+            for key, shape in _BLOCKS
+        }
+    finally:
+        for shm in shms.values():
+            shm.close()
+            shm.unlink()
+
+    return SweepResult(params, offsets, n_samples, data, timings, elapsed, waveform)
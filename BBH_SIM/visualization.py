@@ -1,17 +1,99 @@
+import math
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from .io import infer_format, load_arrays
+from .store import TrajectoryStore
+from .waveform import generate_waveform
 
+# Default number of samples plotted; larger inputs are downsampled
+MAX_POINTS = 20000
+# Rows read from (possibly memory-mapped) inputs at a time while downsampling
+_BLOCK_ROWS = 1 << 20
 
-def plot_orbits_2d(r1_array, r2_array, show=True, save_path=None):
+
+def _downsample_indices(arrays, max_points):
+    """
+    Indices of the samples kept when plotting at most about `max_points` points.
+
+    The samples are split into buckets, and the minimum and maximum of every
+    column of `arrays` in each bucket are kept, together with the first and last
+    sample, so envelopes and orbit extents are preserved exactly. The arrays are
+    read block by block, so memory-mapped inputs are never loaded in full.
+
+    Returns:
+    - idx (numpy.ndarray): Sorted indices, or None if no downsampling is needed.
+    """
+    n = len(arrays[0])
+    if max_points is None or n <= max_points:
+        return None
+    n_columns = sum(int(np.prod(np.shape(a)[1:], dtype=int)) for a in arrays)
+    n_buckets = max(1, max_points // (2 * n_columns))
+    size = math.ceil(n / n_buckets)
+    block = max(1, _BLOCK_ROWS // size) * size
+
+    idx = [np.array([0, n - 1])]
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        data = np.column_stack(
+            [np.asarray(a[start:stop]).reshape(stop - start, -1) for a in arrays]
+        )
+        full = (stop - start) // size * size
+        offsets = start + np.arange(0, full, size)[:, np.newaxis]
+        buckets = data[:full].reshape(-1, size, n_columns)
+        rest = data[full:]
+        for extremum in (np.argmin, np.argmax):
+            idx.append((extremum(buckets, axis=1) + offsets).ravel())
+            if len(rest):
+                idx.append(extremum(rest, axis=0) + start + full)
+    return np.unique(np.concatenate(idx))
+
+
+def _positions(r1_array, r2_array, max_points=None):
+    # The plotting functions accept a TrajectoryStore in place of r1_array
+    if isinstance(r1_array, TrajectoryStore):
+        store = r1_array
+        if max_points is None or len(store) <= max_points:
+            return store.read("r1"), store.read("r2")
+        # Downsample chunk by chunk, with a share of the points for each
+        r1_blocks, r2_blocks = [], []
+        for block in store.iter_chunks(fields=("r1", "r2")):
+            share = max(1, max_points * len(block["t"]) // len(store))
+            idx = _downsample_indices((block["r1"], block["r2"]), share)
+            idx = slice(None) if idx is None else idx
+            r1_blocks.append(np.asarray(block["r1"][idx]))
+            r2_blocks.append(np.asarray(block["r2"][idx]))
+        return np.concatenate(r1_blocks), np.concatenate(r2_blocks)
+
+    idx = _downsample_indices((r1_array, r2_array), max_points)
+    if idx is None:
+        return r1_array, r2_array
+    return r1_array[idx], r2_array[idx]
+
+
+def plot_orbits_2d(
+    r1_array, r2_array=None, show=True, save_path=None, max_points=MAX_POINTS
+):
     """
     Plot the 2D orbits of the binary black holes.
+
+    Inputs longer than `max_points` samples are downsampled, keeping the extreme
+    positions of every bucket of samples, and drawn without markers. Pass
+    `max_points=None` to plot every sample.
     """
+    n_samples = len(r1_array)
+    r1_array, r2_array = _positions(r1_array, r2_array, max_points)
+    markers = len(r1_array) == n_samples
     fig, ax = plt.subplots()
     ax.plot(
         r1_array[:, 0],
         r1_array[:, 1],
-        "o-",
+        "o-" if markers else "-",
         color="blue",
         markersize=5,
         label="Black Hole 1",
@@ -19,7 +101,7 @@ def plot_orbits_2d(r1_array, r2_array, show=True, save_path=None):
     ax.plot(
         r2_array[:, 0],
         r2_array[:, 1],
-        "^-",
+        "^-" if markers else "-",
         color="orange",
         markersize=5,
         label="Black Hole 2",
@@ -34,68 +116,330 @@ def plot_orbits_2d(r1_array, r2_array, show=True, save_path=None):
         plt.show()
 
 
-def animate_trajectories_2d(r1_array, r2_array, save_path=None):
+def _frame_indices(n_samples, frame_stride=1, max_frames=None):
     """
-    Animate the 2D trajectories of the binary black holes.
+    Number of samples shown in each frame, always ending with all of them.
     """
-    fig, ax = plt.subplots()
-    (line1,) = ax.plot([], [], "o-", color="blue", markersize=5, label="Black Hole 1")
-    (line2,) = ax.plot([], [], "^-", color="orange", markersize=5, label="Black Hole 2")
-    ax.set_xlim(
-        min(np.min(r1_array[:, 0]), np.min(r2_array[:, 0])),
-        max(np.max(r1_array[:, 0]), np.max(r2_array[:, 0])),
-    )
-    ax.set_ylim(
-        min(np.min(r1_array[:, 1]), np.min(r2_array[:, 1])),
-        max(np.max(r1_array[:, 1]), np.max(r2_array[:, 1])),
+    if max_frames is not None:
+        frame_stride = max(frame_stride, math.ceil(n_samples / max_frames))
+    frames = np.arange(frame_stride, n_samples + frame_stride, frame_stride)
+    frames[-1] = n_samples
+    return frames
+
+
+def _limits(r1_array, r2_array, axis):
+    return (
+        min(np.min(r1_array[:, axis]), np.min(r2_array[:, axis])),
+        max(np.max(r1_array[:, axis]), np.max(r2_array[:, axis])),
     )
+
+
+def _setup_animation(fig, r1_array, r2_array, dim):
+    # Static artists (limits, labels, legend) are created once per figure
+    if dim == 3:
+        ax = fig.add_subplot(111, projection="3d")
+        (line1,) = ax.plot(
+            [], [], [], "o-", color="blue", markersize=5, label="Black Hole 1"
+        )
+        (line2,) = ax.plot(
+            [], [], [], "^-", color="orange", markersize=5, label="Black Hole 2"
+        )
+        ax.set_zlim(*_limits(r1_array, r2_array, 2))
+        ax.set_zlabel("Z Coordinate")
+    else:
+        ax = fig.add_subplot(111)
+        (line1,) = ax.plot(
+            [], [], "o-", color="blue", markersize=5, label="Black Hole 1"
+        )
+        (line2,) = ax.plot(
+            [], [], "^-", color="orange", markersize=5, label="Black Hole 2"
+        )
+    ax.set_xlim(*_limits(r1_array, r2_array, 0))
+    ax.set_ylim(*_limits(r1_array, r2_array, 1))
     ax.set_xlabel("X Coordinate")
     ax.set_ylabel("Y Coordinate")
     ax.legend()
+    return line1, line2
 
-    def init():
-        line1.set_data([], [])
-        line2.set_data([], [])
-        return (
-            line1,
-            line2,
+
+def _update_lines(lines, r1_array, r2_array, frame, trail, dim):
+    # Only the last `trail` samples are drawn, so every frame costs the same
+    start = 0 if trail is None else max(0, frame - trail)
+    for line, r in zip(lines, (r1_array, r2_array)):
+        line.set_data(r[start:frame, 0], r[start:frame, 1])
+        if dim == 3:
+            line.set_3d_properties(r[start:frame, 2])
+    return lines
+
+
+# State of the frame-rendering worker processes, set up once per worker
+_RENDERER = {}
+
+
+def _init_renderer(r1_array, r2_array, trail, dim, figsize, dpi):
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    lines = _setup_animation(fig, r1_array, r2_array, dim)
+    _RENDERER.update(
+        fig=fig, lines=lines, r1=r1_array, r2=r2_array, trail=trail, dim=dim
+    )
+
+
+def _render_frames(frames):
+    fig = _RENDERER["fig"]
+    images = []
+    for frame in frames:
+        _update_lines(
+            _RENDERER["lines"],
+            _RENDERER["r1"],
+            _RENDERER["r2"],
+            frame,
+            _RENDERER["trail"],
+            _RENDERER["dim"],
         )
+        fig.canvas.draw()
+        images.append(bytes(fig.canvas.buffer_rgba()))
+    return images
 
-    def update(frame):
-        line1.set_data(r1_array[:frame, 0], r1_array[:frame, 1])
-        line2.set_data(r2_array[:frame, 0], r2_array[:frame, 1])
-        return (
-            line1,
-            line2,
+
+def _default_writer():
+    # The animation machinery is only imported when an animation is made
+    from matplotlib import animation
+
+    return "ffmpeg" if animation.writers.is_available("ffmpeg") else "pillow"
+
+
+class _GifWriter:
+    """
+    Looping GIF written one frame at a time, so frames are not kept in memory.
+    Like `Image.save`, frames after the first only store the region that
+    changed, each with its own adaptive palette.
+    """
+
+    def __init__(self, path, fps):
+        self.path = path
+        self.duration = int(round(1000 / fps))
+        self._file = None
+        self._previous = None
+
+    def write(self, image):
+        from PIL import GifImagePlugin, Image, ImageChops
+
+        image = image.convert("RGB")
+        if self._file is None:
+            self._file = open(self.path, "wb")
+            info = {"loop": 0, "duration": self.duration}
+            first = image.convert("P", palette=Image.ADAPTIVE)
+            header, _ = GifImagePlugin.getheader(first, info=info)
+            self._file.write(b"".join(header))
+            bbox = (0, 0) + image.size
+        else:
+            # An unchanged frame still takes its place with a single pixel
+            bbox = ImageChops.difference(self._previous, image).getbbox()
+            bbox = bbox or (0, 0, 1, 1)
+        frame = image.crop(bbox).convert("P", palette=Image.ADAPTIVE)
+        data = GifImagePlugin.getdata(
+            frame, bbox[:2], duration=self.duration, include_color_table=True
         )
+        self._file.write(b"".join(data))
+        self._previous = image
+
+    def close(self):
+        if self._file is not None:
+            self._file.write(b";")  # GIF trailer
+            self._file.close()
+            self._file = None
+            self._previous = None
+
+
+def _export_parallel(
+    save_path, r1_array, r2_array, frames, trail, dim, fps, writer, workers, dpi
+):
+    """
+    Render frames in a process pool and stream them, in order, to the writer.
+    """
+    figsize = tuple(plt.rcParams["figure.figsize"])
+    dpi = plt.rcParams["figure.dpi"] if dpi is None else dpi
+    # Agg truncates fractional canvas sizes; ask it rather than rounding here
+    width, height = FigureCanvasAgg(Figure(figsize=figsize, dpi=dpi)).get_width_height()
+    writer = _default_writer() if writer is None else writer
+    if writer not in ("ffmpeg", "pillow"):
+        raise ValueError(f"Invalid writer: {writer}. Supported are 'ffmpeg', 'pillow'.")
+
+    if writer == "ffmpeg":
+        command = [
+            plt.rcParams["animation.ffmpeg_path"],
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgba",
+            "-s",
+            f"{width}x{height}",
+            "-r",
+            str(fps),
+            "-i",
+            "-",
+        ]
+        if not str(save_path).lower().endswith(".gif"):
+            command += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p"]
+        process = subprocess.Popen(command + [str(save_path)], stdin=subprocess.PIPE)
+    else:
+        from PIL import Image
+
+        gif = _GifWriter(save_path, fps)
+
+    n_chunks = min(len(frames), 4 * (workers or 1))
+    chunks = np.array_split(frames, n_chunks)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_renderer,
+            initargs=(r1_array, r2_array, trail, dim, figsize, dpi),
+        ) as executor:
+            for rendered in executor.map(_render_frames, chunks):
+                for rgba in rendered:
+                    if writer == "ffmpeg":
+                        process.stdin.write(rgba)
+                    else:
+                        gif.write(
+                            Image.frombuffer(
+                                "RGBA", (width, height), rgba, "raw", "RGBA", 0, 1
+                            )
+                        )
+    finally:
+        if writer == "ffmpeg":
+            process.stdin.close()
+            process.wait()
+        else:
+            gif.close()
+
+
+def _animate(
+    r1_array,
+    r2_array,
+    dim,
+    save_path,
+    frame_stride,
+    max_frames,
+    trail,
+    fps,
+    writer,
+    workers,
+    dpi,
+):
+    r1_array, r2_array = _positions(r1_array, r2_array)
+    frames = _frame_indices(len(r1_array), frame_stride, max_frames)
+
+    if save_path and workers is not None:
+        _export_parallel(
+            save_path, r1_array, r2_array, frames, trail, dim, fps, writer, workers, dpi
+        )
+        return None
+
+    from matplotlib.animation import FuncAnimation
+
+    fig = plt.figure()
+    lines = _setup_animation(fig, r1_array, r2_array, dim)
+
+    def init():
+        return _update_lines(lines, r1_array, r2_array, 0, None, dim)
+
+    def update(frame):
+        return _update_lines(lines, r1_array, r2_array, frame, trail, dim)
 
     ani = FuncAnimation(
-        fig, update, frames=len(r1_array), init_func=init, blit=True, repeat=False
+        fig, update, frames=frames, init_func=init, blit=True, repeat=False
     )
 
     if save_path:
-        ani.save(save_path, writer="imagemagick", fps=30)
+        writer = _default_writer() if writer is None else writer
+        ani.save(save_path, writer=writer, fps=fps, dpi=dpi)
     else:
         plt.show()
 
     return ani
 
 
+def animate_trajectories_2d(
+    r1_array,
+    r2_array=None,
+    save_path=None,
+    frame_stride=1,
+    max_frames=None,
+    trail=None,
+    fps=30,
+    writer=None,
+    workers=None,
+    dpi=None,
+):
+    """
+    Animate the 2D trajectories of the binary black holes.
+
+    Parameters:
+    - r1_array (numpy.ndarray or TrajectoryStore): Array of position vectors of the
+      first black hole, or a trajectory store holding both trajectories.
+    - r2_array (numpy.ndarray): Array of position vectors of the second black hole.
+    - save_path (str): Path to save the animation (default: None, show it).
+    - frame_stride (int): Number of samples advanced per frame (default: 1).
+    - max_frames (int): Upper bound on the number of frames, raising
+      `frame_stride` if needed (default: None).
+    - trail (int): Number of most recent samples drawn in each frame
+      (default: None, the whole trajectory so far).
+    - fps (int): Frames per second of the saved animation (default: 30).
+    - writer (str): Matplotlib movie writer (default: 'ffmpeg' if available,
+      else 'pillow'); 'ffmpeg' or 'pillow' when `workers` is set.
+    - workers (int): Render the frames of a saved animation in this many worker
+      processes and stream them to the writer (default: None, render serially).
+    - dpi (float): Resolution of the saved frames (default: None, from rcParams).
+
+    Returns:
+    - ani (FuncAnimation): The animation, or None for a parallel export.
+    """
+    return _animate(
+        r1_array,
+        r2_array,
+        2,
+        save_path,
+        frame_stride,
+        max_frames,
+        trail,
+        fps,
+        writer,
+        workers,
+        dpi,
+    )
+
+
 def plot_orbits_3d(
-    r1_array, r2_array, fig=None, ax=None, show=True, save_path=None, **kwargs
+    r1_array,
+    r2_array=None,
+    fig=None,
+    ax=None,
+    show=True,
+    save_path=None,
+    max_points=MAX_POINTS,
+    **kwargs,
 ):
     """
     Plot the 3D orbits of the binary black holes.
 
     Parameters:
-    - r1_array (numpy.ndarray): Array of position vectors of the first black hole.
+    - r1_array (numpy.ndarray or TrajectoryStore): Array of position vectors of the
+      first black hole, or a trajectory store holding both trajectories.
     - r2_array (numpy.ndarray): Array of position vectors of the second black hole.
     - fig (matplotlib.figure.Figure): Figure object to use for plotting (default: None).
     - ax (matplotlib.axes.Axes): Axes object to use for plotting (default: None).
     - show (bool): Whether to display the plot (default: True).
     - save_path (str): Path to save the plot (default: None).
+    - max_points (int): Inputs with more samples are downsampled, keeping the
+      extreme positions of every bucket of samples (default: MAX_POINTS). Pass
+      None to plot every sample.
     - **kwargs: Additional keyword arguments to pass to the plotting function.
     """
+    r1_array, r2_array = _positions(r1_array, r2_array, max_points)
     if fig is None and ax is None:
         fig = plt.figure()
         ax = fig.add_subplot(111, projection="3d")
@@ -118,80 +462,75 @@ def plot_orbits_3d(
         plt.show()
 
 
-def animate_trajectories_3d(r1_array, r2_array, save_path=None):
+def animate_trajectories_3d(
+    r1_array,
+    r2_array=None,
+    save_path=None,
+    frame_stride=1,
+    max_frames=None,
+    trail=None,
+    fps=30,
+    writer=None,
+    workers=None,
+    dpi=None,
+):
     """
     Animate the 3D trajectories of the binary black holes.
-    """
-    fig = plt.figure()
-    ax = fig.add_subplot(111, projection="3d")
-
-    (line1,) = ax.plot(
-        [], [], [], "o-", color="blue", markersize=5, label="Black Hole 1"
-    )
-    (line2,) = ax.plot(
-        [], [], [], "^-", color="orange", markersize=5, label="Black Hole 2"
-    )
 
-    ax.set_xlim(
-        min(np.min(r1_array[:, 0]), np.min(r2_array[:, 0])),
-        max(np.max(r1_array[:, 0]), np.max(r2_array[:, 0])),
-    )
-    ax.set_ylim(
-        min(np.min(r1_array[:, 1]), np.min(r2_array[:, 1])),
-        max(np.max(r1_array[:, 1]), np.max(r2_array[:, 1])),
-    )
-    ax.set_zlim(
-        min(np.min(r1_array[:, 2]), np.min(r2_array[:, 2])),
-        max(np.max(r1_array[:, 2]), np.max(r2_array[:, 2])),
-    )
-
-    ax.set_xlabel("X Coordinate")
-    ax.set_ylabel("Y Coordinate")
-    ax.set_zlabel("Z Coordinate")
-    ax.legend()
-
-    def init():
-        line1.set_data([], [])
-        line1.set_3d_properties([])
-        line2.set_data([], [])
-        line2.set_3d_properties([])
-        return line1, line2
-
-    def update(frame):
-        line1.set_data(r1_array[:frame, 0], r1_array[:frame, 1])
-        line1.set_3d_properties(r1_array[:frame, 2])
-        line2.set_data(r2_array[:frame, 0], r2_array[:frame, 1])
-        line2.set_3d_properties(r2_array[:frame, 2])
-        return line1, line2
-
-    ani = FuncAnimation(
-        fig, update, frames=len(r1_array), init_func=init, blit=True, repeat=False
+    Takes the same parameters as `animate_trajectories_2d`.
+    """
+    return _animate(
+        r1_array,
+        r2_array,
+        3,
+        save_path,
+        frame_stride,
+        max_frames,
+        trail,
+        fps,
+        writer,
+        workers,
+        dpi,
     )
 
-    if save_path:
-        ani.save(save_path, writer="imagemagick", fps=30)
-    else:
-        plt.show()
-
-    return ani
-
 
 def plot_waveform(
-    t_array, h_plus, h_cross, fig=None, ax=None, show=True, save_path=None, **kwargs
+    t_array,
+    h_plus=None,
+    h_cross=None,
+    fig=None,
+    ax=None,
+    show=True,
+    save_path=None,
+    max_points=MAX_POINTS,
+    **kwargs,
 ):
     """
     Plot the gravitational waveform.
 
     Parameters:
-    - t_array (numpy.ndarray): Array of time values.
+    - t_array (numpy.ndarray or TrajectoryStore): Array of time values, or a
+      trajectory store whose waveform is generated when `h_plus` is None.
     - h_plus (numpy.ndarray): Plus polarization of the gravitational waveform.
     - h_cross (numpy.ndarray): Cross polarization of the gravitational waveform.
     - fig (matplotlib.figure.Figure): Figure object to use for plotting (default: None).
     - ax (matplotlib.axes.Axes): Axes object to use for plotting (default: None).
     - show (bool): Whether to display the plot (default: True).
     - save_path (str): Path to save the plot (default: None).
+    - max_points (int): Inputs with more samples are downsampled, keeping the
+      minimum and maximum strain of every bucket of samples, so the envelope is
+      unchanged (default: MAX_POINTS). Pass None to plot every sample.
     - **kwargs: Additional keyword arguments to pass to the plotting function.
     """
+    if isinstance(t_array, TrajectoryStore):
+        if h_plus is None:
+            h_plus, h_cross = generate_waveform(t_array)
+        t_array = t_array.read("t")
+
+    idx = _downsample_indices((h_plus, h_cross), max_points)
+    if idx is not None:
+        t_array, h_plus, h_cross = t_array[idx], h_plus[idx], h_cross[idx]
+
     if fig is None and ax is None:
         fig, ax = plt.subplots()
 
@@ -207,25 +546,45 @@ def plot_waveform(
         plt.show()
 
 
-def plot_from_file(file_path, plot_type="orbits", **kwargs):
+def plot_from_file(file_path, plot_type="orbits", format=None, **kwargs):
     """
     Plot the simulation data from a file.
 
+    Text files hold the columns `t, r1 (3), r2 (3), h_plus, h_cross`. Binary
+    files written by `BBHSimulation.save_data` are memory-mapped where possible;
+    if they hold no waveform, it is generated from the stored masses.
+
     Parameters:
     - file_path (str): Path to the simulation data file.
     - plot_type (str): Type of plot to generate ('orbits' or 'waveform').
+    - format (str): File format ('npy', 'npz' or 'txt'), inferred from the path by default.
     - **kwargs: Additional keyword arguments to pass to the respective plotting function.
     """
-    data = np.loadtxt(file_path)
-    t_array = data[:, 0]
-    r1_array = data[:, 1:4]
-    r2_array = data[:, 4:7]
+    format = infer_format(file_path, format)
+    if format == "txt":
+        data = np.loadtxt(file_path)
+        t_array = data[:, 0]
+        r1_array = data[:, 1:4]
+        r2_array = data[:, 4:7]
+    else:
+        arrays, metadata = load_arrays(file_path, mmap=format == "npy", format=format)
+        t_array = arrays["t"]
+        r1_array = arrays["r1"]
+        r2_array = arrays["r2"]
 
     if plot_type == "orbits":
         plot_orbits_3d(r1_array, r2_array, **kwargs)
     elif plot_type == "waveform":
-        h_plus = data[:, 7]
-        h_cross = data[:, 8]
+        if format == "txt":
+            h_plus = data[:, 7]
+            h_cross = data[:, 8]
+        elif "h_plus" in arrays:
+            h_plus = arrays["h_plus"]
+            h_cross = arrays["h_cross"]
+        else:
+            h_plus, h_cross = generate_waveform(
+                t_array, r1_array, r2_array, metadata["m1"], metadata["m2"]
+            )
         plot_waveform(t_array, h_plus, h_cross, **kwargs)
     else:
         raise ValueError(
@@ -2,25 +2,172 @@
 
 import numpy as np
 
+from .dynamics import G, c
+from .store import TrajectoryStore
 
-def generate_waveform(t_array, r1_array, r2_array, m1, m2):
+
+def generate_waveform(t_array, r1_array=None, r2_array=None, m1=None, m2=None):
     """
     Generate the gravitational waveform from the binary black hole trajectory.
 
     Parameters:
-    - t_array (numpy.ndarray): Array of time values.
+    - t_array (numpy.ndarray or TrajectoryStore): Array of time values, or an
+      on-disk trajectory store, which is then read chunk by chunk in place of
+      the position arrays.
     - r1_array (numpy.ndarray): Array of position vectors of the first black hole.
     - r2_array (numpy.ndarray): Array of position vectors of the second black hole.
-    - m1 (float): Mass of the first black hole.
-    - m2 (float): Mass of the second black hole.
+      Leading axes in front of the time axis hold e.g. the binaries of an ensemble.
+    - m1 (float or numpy.ndarray): Mass of the first black hole, one per binary for
+      ensembles (default for a store: from its metadata).
+    - m2 (float or numpy.ndarray): Mass of the second black hole, one per binary for
+      ensembles (default for a store: from its metadata).
 
     Returns:
-    - h_plus (numpy.ndarray): Plus polarization of the gravitational waveform.
-    - h_cross (numpy.ndarray): Cross polarization of the gravitational waveform.
+    - h_plus (numpy.ndarray): Plus polarization of the gravitational waveform,
+      shape (..., len(t_array)).
+    - h_cross (numpy.ndarray): Cross polarization of the gravitational waveform,
+      shape (..., len(t_array)).
+    """
+    if isinstance(t_array, TrajectoryStore):
+        store = t_array
+        m1 = store.metadata["m1"] if m1 is None else m1
+        m2 = store.metadata["m2"] if m2 is None else m2
+        blocks = [
+            generate_waveform(block["t"], block["r1"], block["r2"], m1, m2)
+            for block in store.iter_chunks(fields=("r1", "r2"))
+        ]
+        if not blocks:
+            return np.empty(0), np.empty(0)
+        h_plus, h_cross = zip(*blocks)
+        return np.concatenate(h_plus), np.concatenate(h_cross)
+
+    r_mag = np.linalg.norm(np.subtract(r2_array, r1_array), axis=-1)
+    mu = _per_sample(m1 * m2 / (m1 + m2), r_mag.ndim)  # Reduced mass
+    return 2 * mu / r_mag, mu / r_mag
+
+
+def _per_sample(x, ndim):
+    # Broadcast per-binary masses of an ensemble over the time axis
+    x = np.asarray(x, dtype=float)
+    return x.reshape(x.shape + (1,) * (ndim - x.ndim))
+
+
+def _with_halo(blocks, halo=2):
+    # Regroup consecutive blocks so that finite differences see `halo` samples on
+    # both sides of every sample they return, as over the whole stream. Yields
+    # (buffer, start, stop) with the samples of buffer[start:stop] to return.
+    buffer = None
+    done = 0
+    for block in blocks:
+        if buffer is None:
+            buffer = {name: np.asarray(array) for name, array in block.items()}
+        else:
+            buffer = {
+                name: np.concatenate((buffer[name], block[name])) for name in buffer
+            }
+        ready = len(buffer["t"]) - halo
+        if ready > done:
+            yield buffer, done, ready
+            cut = max(ready - halo, 0)
+            buffer = {name: array[cut:] for name, array in buffer.items()}
+            done = ready - cut
+    if buffer is not None and len(buffer["t"]) > done:
+        yield buffer, done, len(buffer["t"])
+
+
+def quadrupole_waveform(
+    t_array,
+    r1_array=None,
+    r2_array=None,
+    m1=None,
+    m2=None,
+    v1_array=None,
+    v2_array=None,
+    a1_array=None,
+    a2_array=None,
+    inclination=0.0,
+    distance=1.0,
+):
     """
-    r_array = r2_array - r1_array
-    h_plus = np.array([compute_h_plus(r, m1, m2) for r in r_array])
-    h_cross = np.array([compute_h_cross(r, m1, m2) for r in r_array])
+    Compute the waveform with the quadrupole formula, for all samples at once.
+
+    The second time derivative of the mass quadrupole of the relative orbit,
+    mu * (2 v v + a r + r a), is projected onto the plus and cross polarizations
+    seen by an observer at `distance` whose line of sight is inclined by
+    `inclination` from the z axis towards the x axis.
+
+    Velocities and accelerations are taken from the arrays supplied, e.g. the
+    velocities stored by `run(velocities=True)`, and otherwise estimated from
+    the trajectory by finite differences along the time axis.
+
+    Parameters:
+    - t_array (numpy.ndarray or TrajectoryStore): Array of time values, or an
+      on-disk trajectory store, which is then read chunk by chunk. The finite
+      differences reach across chunk boundaries, so the result is the same as
+      for the whole trajectory in memory.
+    - r1_array, r2_array (numpy.ndarray): Positions of the black holes, shape
+      (..., len(t_array), 3); leading axes hold e.g. the binaries of an ensemble.
+    - m1, m2 (float or numpy.ndarray): Masses of the black holes, one per binary
+      for ensembles (default for a store: from its metadata).
+    - v1_array, v2_array (numpy.ndarray): Velocities of the black holes
+      (default: None, finite differences of the positions).
+    - a1_array, a2_array (numpy.ndarray): Accelerations of the black holes
+      (default: None, finite differences of the velocities).
+    - inclination (float): Inclination of the line of sight in radians (default: 0.0).
+    - distance (float): Distance to the observer (default: 1.0).
+
+    Returns:
+    - h_plus (numpy.ndarray): Plus polarization, shape (..., len(t_array)).
+    - h_cross (numpy.ndarray): Cross polarization, shape (..., len(t_array)).
+    """
+    if isinstance(t_array, TrajectoryStore):
+        store = t_array
+        m1 = store.metadata["m1"] if m1 is None else m1
+        m2 = store.metadata["m2"] if m2 is None else m2
+        fields = [name for name in ("r1", "r2", "v1", "v2") if name in store.fields]
+        # Finite differences need the neighbouring samples of the adjacent chunks
+        h_plus, h_cross = [], []
+        for block, start, stop in _with_halo(store.iter_chunks(fields=fields)):
+            h = quadrupole_waveform(
+                block["t"],
+                block["r1"],
+                block["r2"],
+                m1,
+                m2,
+                block.get("v1"),
+                block.get("v2"),
+                inclination=inclination,
+                distance=distance,
+            )
+            h_plus.append(h[0][start:stop])
+            h_cross.append(h[1][start:stop])
+        if not h_plus:
+            return np.empty(0), np.empty(0)
+        return np.concatenate(h_plus), np.concatenate(h_cross)
+
+    # Relative orbit; the centre of mass does not radiate at quadrupole order
+    r = np.subtract(r2_array, r1_array)
+    if v1_array is None or v2_array is None:
+        v = np.gradient(r, t_array, axis=-2)
+    else:
+        v = np.subtract(v2_array, v1_array)
+    if a1_array is None or a2_array is None:
+        a = np.gradient(v, t_array, axis=-2)
+    else:
+        a = np.subtract(a2_array, a1_array)
+
+    # Polarization basis perpendicular to the line of sight
+    p = np.array([np.cos(inclination), 0.0, -np.sin(inclination)])
+    q = np.array([0.0, 1.0, 0.0])
+    r_p, r_q = r @ p, r @ q
+    v_p, v_q = v @ p, v @ q
+    a_p, a_q = a @ p, a @ q
+
+    mu = _per_sample(m1 * m2 / (m1 + m2), r_p.ndim)  # Reduced mass
+    scale = G / (c**4 * distance) * mu
+    # h_+ = G / (c^4 D) (I''_pp - I''_qq), h_x = 2 G / (c^4 D) I''_pq
+    h_plus = 2 * scale * (v_p * v_p + a_p * r_p - v_q * v_q - a_q * r_q)
+    h_cross = 2 * scale * (2 * v_p * v_q + a_p * r_q + r_p * a_q)
     return h_plus, h_cross
 
 
@@ -0,0 +1,5 @@
+"""
+Offline benchmark suite for BBH_SIM.
+
+Run `python -m benchmarks --help` for the command line interface.
+"""
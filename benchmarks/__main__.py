@@ -0,0 +1,54 @@
+# __main__.py
+
+import argparse
+import sys
+
+from .runner import compare, load_results, run_benchmarks, save_results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Run the BBH_SIM benchmarks."
+    )
+    parser.add_argument(
+        "-k", "--pattern", default="", help="substring or glob of the case ids to run"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="first value of each parameter only"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="slowdown ratio counted as a regression (default: 1.25)",
+    )
+    args = parser.parse_args(argv)
+
+    def progress(case_id, timing):
+        print(f"{case_id:<90} {timing['median'] * 1e3:12.4f} ms", flush=True)
+
+    results = run_benchmarks(
+        args.pattern, args.quick, args.repeat, args.min_time, progress
+    )
+    if args.output:
+        save_results(args.output, results)
+
+    if args.compare:
+        rows = compare(results, load_results(args.compare), args.threshold)
+        regressions = [row for row in rows if row[4]]
+        print()
+        for case_id, base, new, ratio, regressed in rows:
+            flag = "REGRESSION" if regressed else ""
+            print(f"{case_id:<90} {ratio:6.2f}x {flag}")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold}x.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+# cases.py
+
+import os
+import tempfile
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from BBH_SIM.dynamics import compute_acceleration, ForceModel
+from BBH_SIM.simulation import BBHSimulation, BBHEnsemble
+from BBH_SIM.surrogate import build_surrogate
+from BBH_SIM.visualization import (
+    animate_trajectories_2d,
+    plot_orbits_3d,
+    plot_waveform,
+)
+from BBH_SIM.waveform import generate_waveform, quadrupole_waveform
+from .runner import benchmark
+
+# Scales of the test suite, at which every force term and integrator stays
+# finite over the longest case
+M = 1e10
+DT = 1e-3
+SPIN1 = np.array([0.0, 0.0, 0.5])
+SPIN2 = np.array([0.0, 0.3, 0.2])
+
+
+def _initial_state():
+    return (
+        np.array([0.0, 0.0, 0.0]),
+        np.array([1.0, 0.0, 0.0]),
+        np.array([0.0, 0.1, 0.0]),
+        np.array([0.0, -0.1, 0.0]),
+    )
+
+
+def _simulation(n_steps, **kwargs):
+    return BBHSimulation(M, M, *_initial_state(), 0.0, (n_steps - 1) * DT, DT, **kwargs)
+
+
+def _check_finite(*arrays):
+    # A case whose output overflows would only time NaN arithmetic
+    for array in arrays:
+        if not np.all(np.isfinite(array)):
+            raise RuntimeError("Benchmark case produced non-finite output.")
+
+
+def _trajectory(n_samples):
+    t = np.linspace(0.0, 1.0, n_samples)
+    phase = 2 * np.pi * 20 * t
+    r = 5e5 * np.column_stack((np.cos(phase), np.sin(phase), np.zeros(n_samples)))
+    return t, -r, r
+
+
+@benchmark(
+    "dynamics.compute_acceleration",
+    pn_order=[0, 1, 2],
+    radiation=[False, True],
+    spin=[False, True],
+)
+def acceleration(pn_order, radiation, spin):
+    r1, r2, v1, v2 = _initial_state()
+    spins = (SPIN1, SPIN2) if spin else None
+    _check_finite(
+        compute_acceleration(r2 - r1, v2 - v1, M, M, pn_order, radiation, spins)
+    )
+    return lambda: compute_acceleration(
+        r2 - r1, v2 - v1, M, M, pn_order, radiation, spins
+    )
+
+
+@benchmark(
+    "dynamics.force_model_batched", n_binaries=[1, 1000, 100000], pn_order=[0, 2]
+)
+def force_model_batched(n_binaries, pn_order):
+    rng = np.random.default_rng(0)
+    r = rng.normal(size=(n_binaries, 3)) * 1e6
+    v = rng.normal(size=(n_binaries, 3)) * 1e6
+    force = ForceModel(M, M, pn_order, True, (SPIN1, SPIN2))
+    out = np.empty_like(r)
+    _check_finite(force(r, v, out=out))
+    return lambda: force(r, v, out=out)
+
+
+@benchmark(
+    "simulation.run",
+    n_steps=[1000, 10000],
+    integrator=["euler", "rk4", "dopri5"],
+    pn_order=[0, 2],
+    radiation=[False, True],
+    spin=[False, True],
+)
+def simulation_run(n_steps, integrator, pn_order, radiation, spin):
+    kwargs = dict(
+        integrator=integrator, pn_order=pn_order, radiation=radiation, spin=spin
+    )
+    if spin:
+        kwargs.update(spin1=SPIN1, spin2=SPIN2)
+    simulation = _simulation(n_steps, **kwargs)
+    simulation.run()
+    _check_finite(simulation.r1_array, simulation.r2_array)
+    return lambda: _simulation(n_steps, **kwargs).run()
+
+
+@benchmark("simulation.ensemble", n_binaries=[1, 16, 256], n_steps=[1000])
+def ensemble_run(n_binaries, n_steps):
+    r1, r2, v1, v2 = _initial_state()
+    scale = np.linspace(1.0, 2.0, n_binaries)[:, np.newaxis]
+    masses = np.full(n_binaries, M)
+
+    def run():
+        ensemble = BBHEnsemble(
+            masses, masses, r1 * scale, r2 * scale, v1, v2, 0.0, (n_steps - 1) * DT, DT
+        )
+        ensemble.run()
+        return ensemble
+
+    ensemble = run()
+    _check_finite(ensemble.r1_array, ensemble.r2_array)
+    return run
+
+
+@benchmark("waveform.generate_waveform", n_samples=[10000, 1000000])
+def waveform(n_samples):
+    t, r1, r2 = _trajectory(n_samples)
+    _check_finite(*generate_waveform(t, r1, r2, M, M))
+    return lambda: generate_waveform(t, r1, r2, M, M)
+
+
+@benchmark("waveform.quadrupole_waveform", n_samples=[10000, 1000000])
+def quadrupole(n_samples):
+    t, r1, r2 = _trajectory(n_samples)
+    _check_finite(*quadrupole_waveform(t, r1, r2, M, M, inclination=0.5))
+    return lambda: quadrupole_waveform(t, r1, r2, M, M, inclination=0.5)
+
+
+@benchmark("surrogate.evaluate", n_points=[1, 10000])
+def surrogate(n_points):
+    r1, r2, v1, v2 = _initial_state()
+    masses = np.linspace(0.5, 1.5, 5) * M
+    params = [
+        dict(m1=m1, m2=m2, r1_init=r1, r2_init=r2, v1_init=v1, v2_init=v2)
+        for m1 in masses
+        for m2 in masses
+    ]
+    for p in params:
+        p.update(t_start=0.0, t_end=0.1, dt=DT)
+    model = build_surrogate(params, waveform=quadrupole_waveform)
+    rng = np.random.default_rng(0)
+    points = {
+        "m1": rng.uniform(0.5, 1.5, n_points) * M,
+        "m2": rng.uniform(0.5, 1.5, n_points) * M,
+    }
+    _check_finite(*model.evaluate(points))
+    return lambda: model.evaluate(points)
+
+
+def _saved_simulation(n_steps):
+    simulation = _simulation(n_steps)
+    simulation.run()
+    _check_finite(simulation.r1_array, simulation.r2_array)
+    return simulation
+
+
+@benchmark("io.save_data", fmt=["npy", "npz", "txt"], n_steps=[10000])
+def save_data(fmt, n_steps):
+    simulation = _saved_simulation(n_steps)
+    with tempfile.TemporaryDirectory(prefix="bbh_bench_") as directory:
+        path = os.path.join(
+            directory, "run" + {"npy": "", "npz": ".npz", "txt": ".txt"}[fmt]
+        )
+        yield lambda: simulation.save_data(path, format=fmt)
+
+
+@benchmark("io.load_data", fmt=["npy", "npz", "txt"], n_steps=[10000])
+def load_data(fmt, n_steps):
+    simulation = _saved_simulation(n_steps)
+    with tempfile.TemporaryDirectory(prefix="bbh_bench_") as directory:
+        path = os.path.join(
+            directory, "run" + {"npy": "", "npz": ".npz", "txt": ".txt"}[fmt]
+        )
+        simulation.save_data(path, format=fmt)
+        yield lambda: simulation.load_data(path, format=fmt)
+
+
+@benchmark("visualization.plot", kind=["orbits_3d", "waveform"], n_samples=[100000])
+def plot(kind, n_samples):
+    t, r1, r2 = _trajectory(n_samples)
+
+    def draw():
+        if kind == "orbits_3d":
+            plot_orbits_3d(r1, r2, show=False)
+        else:
+            plot_waveform(t, r1[:, 0], r2[:, 1], show=False)
+        plt.gcf().canvas.draw()
+        plt.close("all")
+
+    return draw
+
+
+@benchmark("visualization.animate", n_samples=[10000], max_frames=[20], trail=[500])
+def animate(n_samples, max_frames, trail):
+    _, r1, r2 = _trajectory(n_samples)
+    with tempfile.TemporaryDirectory(prefix="bbh_bench_") as directory:
+        path = os.path.join(directory, "orbit.gif")
+
+        def render():
+            animate_trajectories_2d(
+                r1,
+                r2,
+                path,
+                max_frames=max_frames,
+                trail=trail,
+                writer="pillow",
+                dpi=40,
+            )
+            plt.close("all")
+
+        yield render
@@ -0,0 +1,190 @@
+# runner.py
+
+import contextlib
+import fnmatch
+import importlib
+import inspect
+import itertools
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from BBH_SIM import __version__
+
+# Registered benchmark cases, in definition order
+CASES = []
+
+
+class Case:
+    """
+    Parameterized benchmark case.
+
+    Parameters:
+    - name (str): Name of the case, e.g. `'simulation.run'`.
+    - setup (callable): Function `setup(**params)` returning the zero-argument
+      callable to time. Work done in `setup` is not timed. A generator function
+      yields the callable instead, and the code after its `yield` runs once the
+      timing is done, e.g. to remove temporary files.
+    - params (dict): Mapping from a parameter name to its list of values.
+    """
+
+    def __init__(self, name, setup, params):
+        self.name = name
+        self.setup = setup
+        self.params = params
+
+    @contextlib.contextmanager
+    def prepare(self, params):
+        """
+        Context manager around the callable to time for `params`.
+        """
+        function = self.setup(**params)
+        if not inspect.isgenerator(function):
+            yield function
+            return
+        generator = function
+        try:
+            yield next(generator)
+        finally:
+            generator.close()
+
+    def variants(self, quick=False):
+        """
+        Yield `(case_id, params)` for every point of the parameter grid, or only
+        the first value of each parameter in quick mode.
+        """
+        keys = list(self.params)
+        values = [v[:1] if quick else v for v in self.params.values()]
+        for combination in itertools.product(*values):
+            params = dict(zip(keys, combination))
+            label = ",".join(f"{k}={v}" for k, v in params.items())
+            yield f"{self.name}[{label}]" if label else self.name, params
+
+
+def benchmark(name, **params):
+    """
+    Register the decorated setup function as a benchmark case.
+    """
+
+    def register(setup):
+        CASES.append(Case(name, setup, params))
+        return setup
+
+    return register
+
+
+def time_callable(function, repeat=5, min_time=0.2):
+    """
+    Time `function` like `timeit`: pick a number of calls per measurement that
+    takes at least `min_time` seconds, then repeat the measurement.
+
+    Returns:
+    - timing (dict): Seconds per call (`min`, `median`, `mean`, `stdev`) and the
+      `number` of calls per measurement and `repeat` count.
+    """
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(1.2 * min_time / elapsed))
+
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - t0) / number)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def machine_info():
+    """
+    Describe the machine and software versions the results were measured with.
+    """
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "bbh_sim": __version__,
+    }
+
+
+def run_benchmarks(pattern="", quick=False, repeat=5, min_time=0.2, progress=None):
+    """
+    Run the registered cases whose id contains `pattern` or matches it as a glob.
+
+    Returns:
+    - results (dict): JSON-serializable results with the machine information.
+    """
+    # Importing the cases module registers them
+    importlib.import_module(__package__ + ".cases")
+
+    results = {}
+    for case in CASES:
+        for case_id, params in case.variants(quick):
+            if pattern not in case_id and not fnmatch.fnmatchcase(case_id, pattern):
+                continue
+            with case.prepare(params) as function:
+                timing = time_callable(function, repeat, min_time)
+            results[case_id] = dict(name=case.name, params=params, **timing)
+            if progress is not None:
+                progress(case_id, timing)
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "machine": machine_info(),
+        "results": results,
+    }
+
+
+def compare(results, baseline, threshold=1.25):
+    """
+    Compare median times against a baseline.
+
+    Parameters:
+    - results, baseline (dict): Outputs of `run_benchmarks`.
+    - threshold (float): Ratio of the medians above which a case counts as a
+      regression (default: 1.25).
+
+    Returns:
+    - rows (list): `(case_id, baseline_median, median, ratio, regressed)` for
+      every case present in both runs.
+    """
+    rows = []
+    for case_id, result in results["results"].items():
+        base = baseline["results"].get(case_id)
+        if base is None:
+            continue
+        ratio = result["median"] / base["median"]
+        rows.append(
+            (case_id, base["median"], result["median"], ratio, ratio > threshold)
+        )
+    return rows
+
+
+def save_results(path, results):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
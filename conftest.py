@@ -0,0 +1,2 @@
+# Loading this file puts the repository root on sys.path, so the tests can import
+# the `benchmarks` package, which is not installed with BBH_SIM.
@@ -8,6 +8,12 @@ def tests(session):
     session.run("pytest")
 
 
+@nox.session
+def benchmarks(session):
+    session.install(".")
+    session.run("python", "-m", "benchmarks", *session.posargs)
+
+
 @nox.session
 def lint(session):
     session.install("flake8", "black")
@@ -6,9 +6,15 @@ setup(
     description="Binary Black Hole Simulation Package",
     author="Mohamed Elashri",
     author_email="bbh@elashri.com",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "tests"]),
     install_requires=[
         "numpy",
         "matplotlib",
+        "tomli; python_version < '3.11'",
     ],
+    entry_points={
+        "console_scripts": [
+            "bbh-sim=BBH_SIM.cli:main",
+        ],
+    },
 )
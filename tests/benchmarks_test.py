@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+import pytest
+from benchmarks.__main__ import main
+from benchmarks.cases import _check_finite
+from benchmarks.runner import compare, run_benchmarks, time_callable
+
+
+def test_time_callable():
+    timing = time_callable(lambda: sum(range(100)), repeat=3, min_time=0.001)
+    assert timing["repeat"] == 3
+    assert timing["number"] >= 1
+    assert 0 < timing["min"] <= timing["median"]
+
+
+def test_run_and_compare_benchmarks(tmpdir):
+    results = run_benchmarks(
+        "dynamics.compute_acceleration*", quick=True, repeat=2, min_time=0.001
+    )
+    (case_id,) = results["results"]
+    assert case_id == (
+        "dynamics.compute_acceleration[pn_order=0,radiation=False,spin=False]"
+    )
+    assert results["machine"]["cpu_count"] >= 1
+
+    baseline = json.loads(json.dumps(results))
+    baseline["results"][case_id]["median"] /= 10
+    ((_, _, _, ratio, regressed),) = compare(results, baseline, threshold=2.0)
+    assert ratio > 2.0 and regressed
+
+    path = str(tmpdir.join("baseline.json"))
+    with open(path, "w") as f:
+        json.dump(baseline, f)
+    output = str(tmpdir.join("results.json"))
+    argv = ["-k", case_id, "--repeat", "2", "--min-time", "0.001", "-o", output]
+    assert main(argv + ["--compare", path, "--threshold", "2"]) == 1
+    assert main(argv + ["--compare", output, "--threshold", "100"]) == 0
+    with open(output) as f:
+        assert case_id in json.load(f)["results"]
+
+
+def test_benchmark_temporary_files_removed(tmpdir, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmpdir))
+    results = run_benchmarks("io.*_data*", quick=True, repeat=1, min_time=0.001)
+    assert len(results["results"]) == 2
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_check_finite():
+    _check_finite(np.ones(3), np.zeros((2, 3)))
+    with pytest.raises(RuntimeError):
+        _check_finite(np.ones(3), np.array([1.0, np.nan]))
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+from BBH_SIM.cache import ResultCache, hash_inputs
+from BBH_SIM.events import Event
+from BBH_SIM.simulation import BBHSimulation
+
+
+def _simulation(dt=0.01, **kwargs):
+    return BBHSimulation(
+        1e10,
+        1e10,
+        np.array([0.0, 0.0, 0.0]),
+        np.array([1.0, 0.0, 0.0]),
+        np.array([0.0, 0.1, 0.0]),
+        np.array([0.0, -0.1, 0.0]),
+        0.0,
+        1.0,
+        dt,
+        pn_order=1,
+        **kwargs,
+    )
+
+
+def test_hash_inputs():
+    a = np.arange(4.0)
+    assert hash_inputs(a, {"x": 1, "y": 2}) == hash_inputs(a.copy(), {"y": 2, "x": 1})
+    assert hash_inputs(a) != hash_inputs(a.astype(np.float32))
+    assert hash_inputs(a) != hash_inputs(a.reshape(2, 2))
+
+
+def test_result_cache_run(tmpdir):
+    reference = _simulation()
+    reference.run()
+
+    cache = ResultCache(str(tmpdir.join("cache")))
+    first = _simulation()
+    first.run(cache=cache)
+    second = _simulation()
+    second.run(cache=cache)
+
+    assert cache.stats["misses"] == 1
+    assert cache.memory_hits == 1
+    assert np.array_equal(second.r1_array, reference.r1_array)
+    assert np.array_equal(second.r2, reference.r2)
+    assert second.step_stats == reference.step_stats
+    with pytest.raises(ValueError):
+        second.r1_array[0, 0] = 1.0
+
+    # A new process only finds the on-disk tier
+    cold = ResultCache(str(tmpdir.join("cache")))
+    third = _simulation()
+    third.run(cache=cold)
+    assert cold.disk_hits == 1
+    assert isinstance(third.r2_array, np.memmap)
+    assert np.array_equal(third.r2_array, reference.r2_array)
+
+    other = _simulation(dt=0.02)
+    other.run(cache=cold)
+    assert cold.misses == 1
+
+
+def _stop_at(t_stop):
+    return Event(lambda t, r, v: t - t_stop, name="stop")
+
+
+@pytest.mark.parametrize("events_first", [False, True])
+def test_result_cache_events(tmpdir, events_first):
+    cache = ResultCache(str(tmpdir.join("cache")))
+    runs = [
+        lambda: _simulation(),
+        lambda: _simulation(events=[_stop_at(0.605)]),
+        lambda: _simulation(events=[_stop_at(0.295)]),
+    ]
+    if events_first:
+        runs.reverse()
+    for make in runs:
+        make().run(cache=cache)
+    assert cache.misses == 3
+
+    plain = _simulation()
+    plain.run(cache=cache)
+    assert len(plain.t_array) == len(plain.r1_array) == 101
+    assert plain.termination is None
+
+    # Served from the on-disk tier, with the termination restored
+    stopped = _simulation(events=[_stop_at(0.605)])
+    stopped.run(cache=ResultCache(str(tmpdir.join("cache"))))
+    assert len(stopped.t_array) == len(stopped.r1_array) == 60
+    assert stopped.termination["name"] == "stop"
+    assert stopped.termination["t"] == pytest.approx(0.605)
+    assert isinstance(stopped.termination["r"], np.ndarray)
+    assert cache.misses == 3
+
+
+def test_result_cache_eviction(tmpdir):
+    cache = ResultCache(str(tmpdir.join("cache")), max_items=1, max_bytes=2000)
+    for i in range(4):
+        cache.put(str(i), {"x": np.full(100, float(i))})
+
+    assert cache.evictions == 2
+    assert cache.get("0") is None
+    assert np.array_equal(cache.get("3")[0]["x"], np.full(100, 3.0))
+    assert cache.get("2") is not None
+    assert cache.stats == {
+        "hits": 2,
+        "misses": 1,
+        "memory_hits": 1,
+        "disk_hits": 1,
+        "evictions": 2,
+    }
+
+
+def test_result_cache_waveform():
+    simulation = _simulation()
+    simulation.run()
+    cache = ResultCache()
+    args = (simulation.t_array, simulation.r1_array, simulation.r2_array, 1e10, 1e10)
+    first = cache.waveform(*args)
+    second = cache.waveform(*args)
+
+    assert second[0] is first[0]
+    assert cache.hits == 1
@@ -0,0 +1,62 @@
+import json
+import subprocess
+import sys
+
+import numpy as np
+from BBH_SIM.cli import load_job, main
+from BBH_SIM.io import load_arrays
+
+SIMULATION = {
+    "m1": 1e10,
+    "m2": 1e10,
+    "r1_init": [0.0, 0.0, 0.0],
+    "r2_init": [1.0, 0.0, 0.0],
+    "v1_init": [0.0, 0.1, 0.0],
+    "v2_init": [0.0, -0.1, 0.0],
+    "t_start": 0.0,
+    "t_end": 0.5,
+    "dt": 0.01,
+}
+
+
+def test_cli_runs_grid(tmp_path):
+    job_path = tmp_path / "job.json"
+    job_path.write_text(
+        json.dumps({"simulation": SIMULATION, "grid": {"pn_order": [0, 1, 2]}})
+    )
+    output = tmp_path / "out"
+
+    assert main([str(job_path), "-o", str(output), "-q"]) == 0
+
+    summary = json.loads((output / "summary.json").read_text())
+    assert len(summary["runs"]) == 3
+    assert [run["params"]["pn_order"] for run in summary["runs"]] == [0, 1, 2]
+    arrays, metadata = load_arrays(str(output / summary["runs"][2]["file"]))
+    assert metadata["pn_order"] == 2
+    assert arrays["r1"].shape == (51, 3)
+    assert arrays["h_plus"].shape == (51,)
+
+
+def test_cli_toml_job_with_plots(tmp_path):
+    job_path = tmp_path / "job.toml"
+    lines = [f'output = "{(tmp_path / "out").as_posix()}"', 'format = "npy"']
+    lines += ['plot = ["orbits_2d", "waveform"]', "", "[simulation]"]
+    lines += [f"{key} = {json.dumps(value)}" for key, value in SIMULATION.items()]
+    job_path.write_text("\n".join(lines) + "\n")
+
+    job = load_job(str(job_path))
+    assert job["runs"] == [SIMULATION]
+    assert main([str(job_path), "-q"]) == 0
+
+    arrays, _ = load_arrays(str(tmp_path / "out" / "run_0000"))
+    assert np.all(np.isfinite(arrays["r2"]))
+    assert (tmp_path / "out" / "run_0000_orbits_2d.png").exists()
+    assert (tmp_path / "out" / "run_0000_waveform.png").exists()
+
+
+def test_cli_does_not_import_matplotlib():
+    code = "import sys, BBH_SIM.cli; print('matplotlib' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
@@ -1,5 +1,6 @@
 import numpy as np
 from BBH_SIM.dynamics import (
+    ForceModel,
     compute_acceleration,
     compute_1pn_correction,
     compute_2pn_correction,
@@ -66,3 +67,60 @@ def test_compute_spin_effects():
     assert np.allclose(
         a_spin, np.array([0.00000000e00, 0.00000000e00, -1.48317778e-29]), rtol=1e-6
     )
+
+
+def test_compute_acceleration_newtonian_matches_force_model():
+    rng = np.random.default_rng(1)
+    r = rng.normal(size=(4, 3))
+    v = rng.normal(size=(4, 3))
+    m1 = rng.uniform(1.0, 2.0, size=4)
+    m2 = rng.uniform(1.0, 2.0, size=4)
+    batched = compute_acceleration(r, v, m1, m2, pn_order=0)
+    assert np.array_equal(batched, ForceModel(m1, m2, pn_order=0)(r, v))
+    for i in range(4):
+        a = compute_acceleration(r[i], v[i], m1[i], m2[i], pn_order=0)
+        assert np.array_equal(a, ForceModel(m1[i], m2[i], pn_order=0)(r[i], v[i]))
+
+
+def test_compute_acceleration_batched():
+    rng = np.random.default_rng(0)
+    r = rng.normal(size=(5, 3))
+    v = rng.normal(scale=0.1, size=(5, 3))
+    m1 = rng.uniform(1.0, 2.0, size=5)
+    m2 = rng.uniform(1.0, 2.0, size=5)
+    s1 = rng.normal(size=(5, 3))
+    s2 = rng.normal(size=(5, 3))
+    a = compute_acceleration(r, v, m1, m2, pn_order=2, radiation=True, spins=(s1, s2))
+    assert a.shape == (5, 3)
+    for i in range(5):
+        a_i = compute_acceleration(
+            r[i], v[i], m1[i], m2[i], pn_order=2, radiation=True, spins=(s1[i], s2[i])
+        )
+        assert np.allclose(a[i], a_i, rtol=1e-12)
+
+
+def test_force_model():
+    r = np.array([1.0, 0.2, -0.1])
+    v = np.array([0.05, 0.1, 0.02])
+    m1 = 2e10
+    m2 = 1e10
+    s1 = np.array([0.1, 0.1, 0.1])
+    s2 = np.array([0.0, 0.0, -0.1])
+    r_mag = np.linalg.norm(r)
+    v_mag = np.linalg.norm(v)
+    expected = (
+        compute_acceleration(r, v, m1, m2, pn_order=0)
+        + compute_1pn_correction(r, v, r_mag, v_mag, m1, m2)
+        + compute_2pn_correction(r, v, r_mag, v_mag, m1, m2)
+        + compute_radiation_reaction(r, v, r_mag, m1, m2)
+        + compute_spin_effects(r, v, r_mag, (s1, s2))
+    )
+
+    model = ForceModel(m1, m2, pn_order=2, radiation=True, spins=(s1, s2))
+    assert len(model.terms) == 4
+    out = np.empty(3)
+    a = model(r, v, out=out)
+    assert a is out
+    assert np.allclose(a, expected, rtol=1e-12)
+
+    assert ForceModel(m1, m2, pn_order=0).terms == []
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from BBH_SIM.dynamics import G, c
+from BBH_SIM.events import (
+    Event,
+    NonFiniteEvent,
+    isco_event,
+    locate_root,
+    peters_time,
+    separation_event,
+)
+from BBH_SIM.simulation import BBHSimulation
+
+
+def _head_on(dt=0.01, t_end=1.0, m=1.0, **kwargs):
+    # Light bodies move freely, so the separation is 1 - t
+    return BBHSimulation(
+        m,
+        m,
+        np.array([0.0, 0.0, 0.0]),
+        np.array([1.0, 0.0, 0.0]),
+        np.array([0.5, 0.0, 0.0]),
+        np.array([-0.5, 0.0, 0.0]),
+        0.0,
+        t_end,
+        dt,
+        **kwargs,
+    )
+
+
+def test_locate_root():
+    t = locate_root(np.cos, 0.0, 3.0, 1.0, np.cos(3.0))
+    assert np.isclose(t, np.pi / 2, rtol=0, atol=1e-14)
+    assert np.cos(t) <= 0
+
+
+@pytest.mark.parametrize("integrator", ["euler", "rk4", "dopri5"])
+def test_terminal_separation_event(integrator):
+    simulation = _head_on(integrator=integrator, events=[separation_event(0.5)])
+    simulation.run(velocities=True)
+
+    assert simulation.termination["name"] == "separation"
+    assert np.isclose(simulation.termination["t"], 0.5, atol=1e-12)
+    assert np.isclose(np.linalg.norm(simulation.r2 - simulation.r1), 0.5)
+    assert len(simulation.r1_array) == len(simulation.t_array) <= 51
+    separation = np.linalg.norm(simulation.r2_array - simulation.r1_array, axis=1)
+    assert np.all(separation >= 0.5 - 1e-12)
+
+
+def test_non_terminal_events():
+    events = [
+        Event(lambda t, r, v: t - 0.25, terminal=False, name="quarter"),
+        separation_event(0.2, terminal=False),
+    ]
+    simulation = _head_on(events=events, record_every=10)
+    simulation.run()
+
+    assert simulation.termination is None
+    assert [record["name"] for record in simulation.event_log] == [
+        "quarter",
+        "separation",
+    ]
+    assert np.isclose(simulation.event_log[0]["t"], 0.25)
+    assert np.isclose(simulation.event_log[1]["t"], 0.8)
+    assert len(simulation.t_array) == 11
+
+
+def test_non_finite_event():
+    # Massless bodies meet exactly, where the force is 0 / 0
+    simulation = _head_on(dt=0.25, t_end=2.0, m=0.0, events=[NonFiniteEvent()])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        simulation.run()
+
+    assert simulation.termination["name"] == "nonfinite"
+    assert np.all(np.isfinite(simulation.r1_array))
+    assert np.all(np.isfinite(simulation.r1))
+    assert simulation.t_array[-1] < simulation.termination["t"] + 1e-12
+
+
+def test_peters_t_end_and_isco():
+    m = 30 * 2e30
+    r_isco = 6 * G * 2 * m / c**2
+    simulation = BBHSimulation(
+        m,
+        m,
+        np.zeros(3),
+        np.array([10 * r_isco, 0.0, 0.0]),
+        np.zeros(3),
+        np.zeros(3),
+        0.0,
+        "peters",
+        1e-3,
+        events=[isco_event(m, m)],
+    )
+
+    assert np.isclose(simulation.t_end, peters_time(m, m, 10 * r_isco))
+    assert np.isclose(peters_time(m, m, 1.0, e=0.5), peters_time(m, m, 1.0) * 0.75**3.5)
+    assert simulation.events[0].name == "isco"
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+from BBH_SIM.dynamics import G
+from BBH_SIM.events import peters_time
+from BBH_SIM.hybrid import HybridSimulation, peters_phase, peters_separation
+
+M = 1e30
+A0 = 1e6
+
+
+def test_peters_separation_and_phase():
+    t_merge = peters_time(M, M, A0)
+    t = np.linspace(0.0, t_merge, 1001)
+    a = peters_separation(M, M, A0, t)
+
+    assert a[0] == A0
+    assert a[-1] == pytest.approx(0.0, abs=1e-6 * A0)
+    assert np.all(np.diff(a) < 0)
+
+    # The phase advances at the Keplerian angular frequency
+    phi = peters_phase(M, M, A0, t[:10])
+    omega = np.sqrt(G * 2 * M / a[:10] ** 3)
+    assert np.allclose(np.diff(phi) / np.diff(t[:10]), omega[:-1], rtol=1e-2)
+
+
+def test_hybrid_stays_bound_after_handover():
+    a_h = 0.3 * A0
+    hybrid = HybridSimulation(
+        M,
+        M,
+        A0,
+        0.0,
+        "peters",
+        1e-4,
+        handover_separation=a_h,
+        early_dt=10.0,
+        integrator="rk4",
+    )
+    period = 2 * np.pi * np.sqrt(a_h**3 / (G * 2 * M))
+    hybrid.t_end = hybrid.t_handover + 1.5 * period
+    hybrid.run(velocities=True)
+
+    n = hybrid.n_early
+    assert hybrid.t_array[n] == hybrid.t_handover
+    assert np.all(np.diff(hybrid.t_array) > 0)
+    r, v = hybrid.orbit(hybrid.t_handover)
+    assert np.allclose(hybrid.r2_array[n] - hybrid.r1_array[n], r)
+    assert np.allclose(hybrid.v2_array[n] - hybrid.v1_array[n], v)
+
+    # The direct integration continues the circular orbit for over an orbit
+    separation = np.linalg.norm(hybrid.r2_array - hybrid.r1_array, axis=1)
+    assert np.allclose(separation[n:], a_h, rtol=1e-3)
+    relative = hybrid.r2_array[n:] - hybrid.r1_array[n:]
+    angle = np.unwrap(np.arctan2(relative[:, 1], relative[:, 0]))
+    assert angle[-1] - angle[0] > 2 * np.pi
+
+    # Early samples follow the orbit-averaged separation
+    expected = peters_separation(M, M, A0, hybrid.t_array[:n])
+    assert np.allclose(separation[:n], expected)
+
+
+@pytest.mark.parametrize("reduced", [False, True])
+def test_hybrid_unequal_masses_keep_centre_of_mass(reduced):
+    m1, m2 = M, 3 * M
+    a_h = 0.3 * A0
+    hybrid = HybridSimulation(
+        m1,
+        m2,
+        A0,
+        0.0,
+        "peters",
+        1e-4,
+        handover_separation=a_h,
+        early_dt=10.0,
+        integrator="rk4",
+        reduced=reduced,
+    )
+    period = 2 * np.pi * np.sqrt(a_h**3 / (G * (m1 + m2)))
+    hybrid.t_end = hybrid.t_handover + period
+    hybrid.run(velocities=True)
+
+    n = hybrid.n_early
+    assert 0 < n < len(hybrid.t_array)
+    centre = (m1 * hybrid.r1_array + m2 * hybrid.r2_array) / (m1 + m2)
+    velocity = (m1 * hybrid.v1_array + m2 * hybrid.v2_array) / (m1 + m2)
+    assert np.allclose(centre, 0.0, rtol=0, atol=1e-9 * A0)
+    assert np.allclose(velocity, 0.0, rtol=0, atol=1e-9 * np.abs(hybrid.v1_array).max())
+
+    # The lighter body moves three times as far from the centre
+    r1 = np.linalg.norm(hybrid.r1_array, axis=1)
+    r2 = np.linalg.norm(hybrid.r2_array, axis=1)
+    assert np.allclose(r1, 3 * r2)
+    assert np.allclose(r1[n:] + r2[n:], a_h, rtol=1e-3)
+
+
+def test_hybrid_reduced_direct_phase_matches():
+    kwargs = dict(handover_separation=2 * A0, integrator="rk4")
+    full = HybridSimulation(M, M, A0, 0.0, 0.05, 1e-3, **kwargs)
+    full.run()
+    reduced = HybridSimulation(M, M, A0, 0.0, 0.05, 1e-3, reduced=True, **kwargs)
+    reduced.run()
+
+    assert full.n_early == 0
+    assert np.allclose(full.r1_array, reduced.r1_array, rtol=0, atol=1e-6 * A0)
+    assert np.allclose(full.r2_array, reduced.r2_array, rtol=0, atol=1e-6 * A0)
+
+
+def test_hybrid_handover_frequency():
+    f_gw = 10.0
+    hybrid = HybridSimulation(M, M, A0, 0.0, 1.0, 1e-2, handover_frequency=f_gw)
+    omega = np.sqrt(G * 2 * M / hybrid.handover_separation**3)
+    assert omega / np.pi == pytest.approx(f_gw)
+
+    with pytest.raises(ValueError):
+        HybridSimulation(M, M, A0, 0.0, 1.0, 1e-2)
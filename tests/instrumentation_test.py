@@ -0,0 +1,66 @@
+import numpy as np
+from BBH_SIM.instrumentation import RunStats
+from BBH_SIM.simulation import BBHSimulation
+
+
+def _binary(**kwargs):
+    return BBHSimulation(
+        1e10,
+        1e10,
+        np.array([0.0, 0.0, 0.0]),
+        np.array([1.0, 0.0, 0.0]),
+        np.array([0.0, 0.1, 0.0]),
+        np.array([0.0, -0.1, 0.0]),
+        0.0,
+        1.0,
+        0.01,
+        **kwargs,
+    )
+
+
+def test_run_stats_collected():
+    simulation = _binary()
+    simulation.run(chunk_size=32)
+    stats = simulation.stats
+
+    assert isinstance(stats, RunStats)
+    assert stats.n_steps == simulation.step_stats["n_accepted"]
+    assert stats.n_samples == len(simulation.t_array)
+    assert stats.n_chunks == -(-len(simulation.t_array) // 32)
+    assert stats.t == simulation.t_array[-1]
+    assert stats.peak_memory >= 2 * simulation.r1_array.nbytes
+    assert stats.steps_per_second > 0
+    assert stats.term_calls == {}
+
+
+def test_instrumented_run_matches_plain_run():
+    plain = _binary(pn_order=2, radiation=True)
+    plain.run()
+    instrumented = _binary(pn_order=2, radiation=True)
+    instrumented.run(instrument=True)
+    stats = instrumented.stats
+
+    assert np.array_equal(plain.r1_array, instrumented.r1_array)
+    assert np.array_equal(plain.r2_array, instrumented.r2_array)
+    n = instrumented.step_stats["n_evaluations"]
+    for name in ("newtonian", "1pn", "2pn", "radiation_reaction"):
+        assert stats.term_calls[name] == n
+        assert stats.term_time[name] >= 0
+    assert "spin_effects" not in stats.term_calls
+
+
+def test_step_and_chunk_hooks():
+    times = []
+    chunks = []
+    simulation = _binary(integrator="dopri5", rtol=1e-8, atol=1e-10)
+    simulation.run(
+        chunk_size=16,
+        on_step=lambda stats: times.append(stats.t),
+        on_chunk=lambda stats, chunk: chunks.append(len(chunk[0])),
+    )
+
+    assert len(times) == simulation.step_stats["n_accepted"]
+    assert np.all(np.diff(times) > 0)
+    assert times[-1] >= simulation.t_array[-1]
+    assert sum(chunks) == len(simulation.t_array)
+    assert simulation.stats.as_dict()["n_chunks"] == len(chunks)
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from BBH_SIM.integrators import (
+    DormandPrince,
+    INTEGRATORS,
+    get_integrator,
+    hermite_interpolate,
+    register_integrator,
+)
+
+
+def _oscillator(_t, y):
+    return np.array([y[1], -y[0]])
+
+
+def test_dormand_prince_dense_output():
+    solver = DormandPrince(_oscillator, 0.0, [1.0, 0.0], 0.1, rtol=1e-9, atol=1e-12)
+    t_eval = np.linspace(0.0, 10.0, 57)
+    y = []
+    for t in t_eval:
+        while solver.t < t:
+            solver.step(t_eval[-1])
+        y.append(solver.dense(t))
+    y = np.array(y)
+
+    assert np.isclose(solver.t, 10.0)
+    assert np.allclose(y[:, 0], np.cos(t_eval), atol=1e-8)
+    assert np.allclose(y[:, 1], -np.sin(t_eval), atol=1e-8)
+    assert solver.n_evaluations == 1 + 6 * (solver.n_accepted + solver.n_rejected)
+
+
+def test_dormand_prince_step_size_limits():
+    solver = DormandPrince(_oscillator, 0.0, [1.0, 0.0], 0.1, h_max=0.05)
+    solver.step()
+    assert solver.t <= 0.05
+    assert solver.h <= 0.05
+
+    solver = DormandPrince(_oscillator, 0.0, [1.0, 0.0], 1.0, rtol=1e-12, h_min=0.5)
+    with pytest.raises(RuntimeError):
+        solver.step()
+
+
+def test_dormand_prince_stops_instead_of_shrinking_forever():
+    solver = DormandPrince(_oscillator, 0.0, [np.nan, 0.0], 0.1)
+    with pytest.raises(RuntimeError, match="Non-finite"):
+        solver.step()
+
+    # A jump that no step size resolves, without an explicit h_min
+    def jump(t, y):
+        return np.array([1e12 if t > 0.5 else 0.0])
+
+    solver = DormandPrince(jump, 0.0, [0.0], 0.1)
+    with pytest.raises(RuntimeError, match="underflowed"):
+        while solver.t < 1.0:
+            solver.step(1.0)
+
+
+@pytest.mark.parametrize(
+    "name, order",
+    [("euler", 1), ("verlet", 2), ("rk4", 4), ("yoshida4", 4), ("yoshida6", 6)],
+)
+def test_fixed_step_convergence_order(name, order):
+    stepper = get_integrator(name)
+
+    def error(dt):
+        r, v = np.array([1.0]), np.array([0.0])
+        for _ in range(round(2.0 / dt)):
+            r, v = stepper(lambda r, v: -r, r, v, dt)
+        return abs(r[0] - np.cos(2.0))
+
+    measured = np.log2(error(0.1) / error(0.05))
+    assert abs(measured - order) < 0.3
+
+
+def test_register_integrator():
+    def stepper(accel, r, v, dt):
+        return r + v * dt, v
+
+    register_integrator("drift", stepper)
+    try:
+        assert get_integrator("drift") is stepper
+    finally:
+        del INTEGRATORS["drift"]
+    with pytest.raises(ValueError):
+        get_integrator("drift")
+
+
+def test_hermite_interpolate():
+    # Cubic Hermite interpolation is exact for cubic polynomials
+    def x(t):
+        return t**3 - 2 * t + 1
+
+    def dx(t):
+        return 3 * t**2 - 2
+
+    r, v = hermite_interpolate(0.5, x(0.5), dx(0.5), 1.5, x(1.5), dx(1.5), 0.8)
+    assert np.isclose(r, x(0.8))
+    assert np.isclose(v, dx(0.8))
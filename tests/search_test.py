@@ -0,0 +1,43 @@
+import numpy as np
+from BBH_SIM.search import TemplateBank, matched_filter
+
+
+def _chirp(n, f0, f1, dt):
+    t = np.arange(n) * dt
+    return np.sin(2 * np.pi * (f0 + (f1 - f0) * t / t[-1] / 2) * t) * np.hanning(n)
+
+
+def test_template_bank_recovers_injection():
+    dt = 1e-3
+    n = 4096
+    templates = [_chirp(1000, f0, 2 * f0, dt) for f0 in (30.0, 60.0, 90.0)]
+    bank = TemplateBank(templates, dt, n)
+    psd = np.full(len(bank.frequencies), 2e-3)
+    sigma = bank.sigma(psd)
+
+    data = np.zeros(n)
+    data[1500:2500] = 3.0 * templates[1]
+    snr = bank.filter(data, psd)
+
+    assert snr.shape == (3, n)
+    assert np.argmax(snr[1]) == 1500
+    assert np.isclose(snr[1, 1500], 3.0 * sigma[1])
+    assert snr[1].max() > 2 * max(snr[0].max(), snr[2].max())
+
+
+def test_matched_filter_maximizes_over_phase():
+    dt = 1e-3
+    n = 2048
+    t = np.arange(500) * dt
+    envelope = np.hanning(500)
+    h_plus = np.cos(2 * np.pi * 50 * t) * envelope
+    h_cross = np.sin(2 * np.pi * 50 * t) * envelope
+
+    data = np.zeros(n)
+    data[100:600] = h_cross
+    psd = np.ones(n // 2 + 1)
+    snr = matched_filter([(h_plus, h_cross)], data, psd, dt)
+    reference = matched_filter([h_cross], data, psd, dt)
+
+    assert np.argmax(snr[0]) == 100
+    assert np.isclose(snr[0, 100], reference[0, 100], rtol=1e-2)
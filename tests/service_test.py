@@ -0,0 +1,95 @@
+import asyncio
+
+import numpy as np
+import pytest
+from BBH_SIM.cache import ResultCache
+from BBH_SIM.service import ServiceClient, SimulationService
+from BBH_SIM.simulation import BBHSimulation
+
+PARAMS = {
+    "m1": 1e10,
+    "m2": 1e10,
+    "r1_init": [0.0, 0.0, 0.0],
+    "r2_init": [1.0, 0.0, 0.0],
+    "v1_init": [0.0, 0.1, 0.0],
+    "v2_init": [0.0, -0.1, 0.0],
+    "t_start": 0.0,
+    "t_end": 1.0,
+    "dt": 0.001,
+    "pn_order": 1,
+}
+
+
+def test_service_round_trip():
+    async def scenario():
+        async with SimulationService(max_workers=1) as service:
+            host, port = await service.start()
+            async with ServiceClient(host, port) as client:
+                arrays, metadata = await client.simulate(PARAMS)
+                metrics = await client.metrics()
+        return arrays, metadata, metrics
+
+    arrays, metadata, metrics = asyncio.run(scenario())
+    kwargs = dict(PARAMS)
+    for key in ("r1_init", "r2_init", "v1_init", "v2_init"):
+        kwargs[key] = np.array(kwargs[key])
+    simulation = BBHSimulation(**kwargs)
+    simulation.run()
+
+    assert np.array_equal(arrays["t"], simulation.t_array)
+    assert np.array_equal(arrays["r1"], simulation.r1_array)
+    assert np.array_equal(arrays["r2"], simulation.r2_array)
+    assert arrays["h_plus"].shape == simulation.t_array.shape
+    assert metadata["pn_order"] == 1
+    assert metrics["completed"] == 1
+    assert metrics["queue_depth"] == 0
+    assert metrics["latency"]["count"] == 1
+
+
+def test_service_coalesces_identical_requests(tmp_path):
+    cache = ResultCache()
+
+    async def scenario():
+        async with SimulationService(max_workers=2, cache=cache) as service:
+            path = await service.start(path=str(tmp_path / "bbh.sock"))
+
+            async def request(params):
+                async with ServiceClient(path=path) as client:
+                    return await client.simulate(params, waveform=False)
+
+            other = dict(PARAMS, m2=2e10)
+            results = await asyncio.gather(
+                *[request(PARAMS) for _ in range(4)], request(other)
+            )
+            again = await request(PARAMS)
+            return results, again, service.metrics
+
+    results, again, metrics = asyncio.run(scenario())
+    assert metrics["requests"] == 6
+    assert metrics["completed"] == 2
+    # Identical requests share the running simulation or, if it already
+    # finished, the cached result
+    assert metrics["coalesced"] + cache.hits == 4
+    for arrays, _ in results[1:4]:
+        assert np.array_equal(arrays["r1"], results[0][0]["r1"])
+    assert not np.array_equal(results[4][0]["r1"], results[0][0]["r1"])
+    assert np.array_equal(again[0]["r1"], results[0][0]["r1"])
+    assert "h_plus" not in again[0]
+
+
+def test_service_reports_errors():
+    async def scenario():
+        async with SimulationService(max_workers=1) as service:
+            host, port = await service.start()
+            async with ServiceClient(host, port) as client:
+                with pytest.raises(RuntimeError, match="integrator"):
+                    await client.simulate(dict(PARAMS, integrator="leapfrog2"))
+                # The connection stays usable after an error
+                arrays, _ = await client.simulate(PARAMS, waveform=False)
+                metrics = await client.metrics()
+        return arrays, metrics
+
+    arrays, metrics = asyncio.run(scenario())
+    assert len(arrays["t"]) == 1001
+    assert metrics["failed"] == 1
+    assert metrics["completed"] == 1
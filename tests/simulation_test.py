@@ -1,5 +1,8 @@
 import numpy as np
-from BBH_SIM.simulation import BBHSimulation
+import pytest
+from BBH_SIM.io import load_arrays
+from BBH_SIM.simulation import BBHSimulation, BBHEnsemble
+from BBH_SIM.store import TrajectoryStore
 
 
 def test_bbh_simulation():
@@ -23,3 +26,480 @@ def test_bbh_simulation():
     assert simulation.r1_array_2d.shape == (11, 2)
     assert simulation.r2_array_2d.shape == (11, 2)
     assert np.allclose(simulation.t_array, np.arange(0.0, 1.1, 0.1))
+
+
+def test_bbh_ensemble_matches_single_runs():
+    m1 = np.array([1.0, 2.0, 1.5])
+    m2 = np.array([1.0, 1.0, 3.0])
+    r1_init = np.zeros((3, 3))
+    r2_init = np.array([[1.0, 0.0, 0.0], [2.0, 0.0, 0.0], [0.0, 1.5, 0.0]])
+    v1_init = np.array([[0.0, 0.1, 0.0], [0.0, 0.2, 0.0], [0.1, 0.0, 0.0]])
+    v2_init = -v1_init
+    pn_order = np.array([0, 1, 2])
+    radiation = np.array([False, True, True])
+
+    ensemble = BBHEnsemble(
+        m1,
+        m2,
+        r1_init,
+        r2_init,
+        v1_init,
+        v2_init,
+        0.0,
+        1.0,
+        0.1,
+        pn_order=pn_order,
+        radiation=radiation,
+    )
+    ensemble.run()
+
+    assert ensemble.r1_array.shape == (3, 11, 3)
+    assert ensemble.r2_array.shape == (3, 11, 3)
+    for i in range(3):
+        simulation = BBHSimulation(
+            m1[i],
+            m2[i],
+            r1_init[i].copy(),
+            r2_init[i].copy(),
+            v1_init[i].copy(),
+            v2_init[i].copy(),
+            0.0,
+            1.0,
+            0.1,
+            pn_order=pn_order[i],
+            radiation=radiation[i],
+        )
+        simulation.run()
+        assert np.allclose(ensemble.r1_array[i], simulation.r1_array)
+        assert np.allclose(ensemble.r2_array[i], simulation.r2_array)
+
+
+def test_bbh_ensemble_masks_merged_binaries():
+    r1_init = np.zeros((2, 3))
+    r2_init = np.array([[1.0, 0.0, 0.0], [1.0, 0.0, 0.0]])
+    v1_init = np.zeros((2, 3))
+    v2_init = np.array([[0.0, 0.0, 0.0], [-1.0, 0.0, 0.0]])
+
+    ensemble = BBHEnsemble(
+        np.ones(2),
+        np.ones(2),
+        r1_init,
+        r2_init,
+        v1_init,
+        v2_init,
+        0.0,
+        1.0,
+        0.1,
+        r_min=0.5,
+    )
+    ensemble.run()
+
+    assert np.all(ensemble.active == [True, False])
+    assert np.isclose(ensemble.t_stop[1], 0.5)
+    assert np.all(np.isfinite(ensemble.r2_array[0]))
+    assert np.all(np.isnan(ensemble.r2_array[1, 6:]))
+
+
+def test_bbh_simulation_out_buffers():
+    simulation = BBHSimulation(
+        1.0,
+        1.0,
+        np.array([0.0, 0.0, 0.0]),
+        np.array([1.0, 0.0, 0.0]),
+        np.array([0.0, 0.1, 0.0]),
+        np.array([0.0, -0.1, 0.0]),
+        0.0,
+        1.0,
+        0.1,
+    )
+    r1_out = np.zeros((11, 3))
+    r2_out = np.zeros((11, 3))
+    simulation.run(out=(r1_out, r2_out))
+
+    assert simulation.r1_array is r1_out
+    assert simulation.r2_array is r2_out
+    assert np.shares_memory(simulation.r1_array_2d, r1_out)
+    assert np.shares_memory(simulation.r2_array_2d, r2_out)
+    assert np.allclose(simulation.r2_array_2d, r2_out[:, :2])
+
+
+def test_bbh_simulation_adaptive():
+    m = 1e10
+    r1_init = np.array([0.0, 0.0, 0.0])
+    r2_init = np.array([1.0, 0.0, 0.0])
+    v1_init = np.array([0.0, 0.1, 0.0])
+    v2_init = np.array([0.0, -0.1, 0.0])
+    output_times = np.linspace(0.0, 2.0, 5)
+
+    simulation = BBHSimulation(
+        m,
+        m,
+        r1_init.copy(),
+        r2_init.copy(),
+        v1_init.copy(),
+        v2_init.copy(),
+        0.0,
+        2.0,
+        0.01,
+        integrator="dopri5",
+        rtol=1e-10,
+        atol=1e-12,
+        output_times=output_times,
+    )
+    simulation.run()
+
+    assert simulation.r1_array.shape == (5, 3)
+    assert np.allclose(simulation.t_array, output_times)
+    assert np.allclose(simulation.r1_array[0], r1_init)
+    assert np.allclose(simulation.r2_array[0], r2_init)
+    assert simulation.step_stats["n_accepted"] > 0
+
+    # A fine fixed-step run converges to the adaptive solution
+    reference = BBHSimulation(
+        m,
+        m,
+        r1_init.copy(),
+        r2_init.copy(),
+        v1_init.copy(),
+        v2_init.copy(),
+        0.0,
+        2.0 - 1e-4,
+        1e-4,
+    )
+    reference.run()
+    assert np.allclose(simulation.r2_array[-1], reference.r2_array[-1], atol=1e-3)
+
+
+def test_bbh_simulation_integrators():
+    args = (
+        1e10,
+        1e10,
+        np.array([0.0, 0.0, 0.0]),
+        np.array([1.0, 0.0, 0.0]),
+        np.array([0.0, 0.1, 0.0]),
+        np.array([0.0, -0.1, 0.0]),
+        0.0,
+        1.0,
+        0.1,
+    )
+    final = []
+    for integrator in ("verlet", "rk4", "yoshida4", "yoshida6"):
+        simulation = BBHSimulation(
+            *[a.copy() if isinstance(a, np.ndarray) else a for a in args],
+            integrator=integrator,
+        )
+        simulation.run()
+        assert simulation.r1_array.shape == (11, 3)
+        final.append(simulation.r2_array[-1])
+    assert np.allclose(final, final[-1], atol=1e-3)
+
+    with pytest.raises(ValueError):
+        BBHSimulation(*args, integrator="unknown")
+
+
+@pytest.mark.parametrize("integrator", ["euler", "rk4", "dopri5"])
+def test_bbh_simulation_reduced(integrator):
+    def make(reduced):
+        return BBHSimulation(
+            1e10,
+            3e10,
+            np.array([0.0, 0.0, 0.0]),
+            np.array([1.0, 0.0, 0.0]),
+            np.array([0.0, 0.1, 0.05]),
+            np.array([0.0, -0.1, 0.0]),
+            0.0,
+            1.0,
+            0.1,
+            pn_order=2,
+            integrator=integrator,
+            rtol=1e-10,
+            atol=1e-12,
+            reduced=reduced,
+        )
+
+    full = make(False)
+    full.run()
+    reduced = make(True)
+    reduced.run()
+
+    assert np.allclose(reduced.r1_array, full.r1_array, rtol=1e-6, atol=1e-12)
+    assert np.allclose(reduced.r2_array, full.r2_array, rtol=1e-6, atol=1e-12)
+    assert np.allclose(reduced.v1, full.v1)
+    assert np.allclose(reduced.v2, full.v2)
+
+
+@pytest.mark.parametrize("reduced", [False, True])
+def test_bbh_simulation_attractive(reduced, tmp_path):
+    m1, m2 = 1e9, 3e9
+    simulation = BBHSimulation(
+        m1,
+        m2,
+        np.array([0.0, 0.0, 0.0]),
+        np.array([1.0, 0.0, 0.0]),
+        np.array([0.0, 0.1, 0.0]),
+        np.array([0.0, -0.1, 0.0]),
+        0.0,
+        1.0,
+        0.01,
+        integrator="rk4",
+        reduced=reduced,
+        attractive=True,
+    )
+    simulation.run(velocities=True)
+
+    # The separation is pulled together and the centre of mass moves uniformly
+    r = simulation.r2_array - simulation.r1_array
+    assert np.all(np.linalg.norm(r[1:], axis=1) < 1.0)
+    centre = (m1 * simulation.r1_array + m2 * simulation.r2_array) / (m1 + m2)
+    velocity = (m1 * simulation.v1_array + m2 * simulation.v2_array) / (m1 + m2)
+    assert np.allclose(velocity, [0.0, -0.05, 0.0])
+    assert np.allclose(centre[:, 0], 0.75)
+    assert np.allclose(np.diff(centre, axis=0), [0.0, -0.05 * 0.01, 0.0])
+
+    simulation.save_data(tmp_path / "run.npz")
+    loaded = BBHSimulation(
+        m1, m2, np.zeros(3), np.ones(3), np.zeros(3), np.zeros(3), 0.0, 1.0, 0.01
+    )
+    loaded.load_data(tmp_path / "run.npz")
+    assert loaded.attractive
+
+
+@pytest.mark.parametrize("reduced", [False, True])
+def test_bbh_simulation_iter_run(reduced):
+    def make():
+        return BBHSimulation(
+            1e10,
+            2e10,
+            np.array([0.0, 0.0, 0.0]),
+            np.array([1.0, 0.0, 0.0]),
+            np.array([0.0, 0.1, 0.0]),
+            np.array([0.0, -0.1, 0.0]),
+            0.0,
+            1.0,
+            0.1,
+            pn_order=1,
+            reduced=reduced,
+        )
+
+    reference = make()
+    reference.run()
+
+    simulation = make()
+    chunks = list(simulation.iter_run(chunk_size=4))
+    assert [len(t) for t, *_ in chunks] == [4, 4, 3]
+    t, r1, r2, v1, v2 = (np.concatenate(block) for block in zip(*chunks))
+    assert np.allclose(t, reference.t_array)
+    assert np.allclose(r1, reference.r1_array)
+    assert np.allclose(r2, reference.r2_array)
+    assert np.allclose(v1[-1], reference.v1)
+    assert np.allclose(v2[-1], reference.v2)
+    assert np.allclose(simulation.r2, reference.r2)
+
+
+def _circular_binary(t_end=1.0, **kwargs):
+    return BBHSimulation(
+        1e10,
+        1e10,
+        np.array([0.0, 0.0, 0.0]),
+        np.array([1.0, 0.0, 0.0]),
+        np.array([0.0, 0.1, 0.0]),
+        np.array([0.0, -0.1, 0.0]),
+        0.0,
+        t_end,
+        0.01,
+        **kwargs,
+    )
+
+
+def test_bbh_simulation_dopri5_non_finite_state():
+    simulation = BBHSimulation(
+        1e10,
+        1e10,
+        np.array([0.0, 0.0, 0.0]),
+        np.array([1.0, 0.0, 0.0]),
+        np.array([0.0, 0.1, 0.0]),
+        np.array([np.nan, 0.0, 0.0]),
+        0.0,
+        1.0,
+        0.01,
+        integrator="dopri5",
+    )
+    with pytest.raises(RuntimeError, match="Non-finite"):
+        simulation.run()
+
+
+def test_bbh_simulation_record_every():
+    full = _circular_binary()
+    full.run()
+    decimated = _circular_binary(record_every=10)
+    decimated.run()
+
+    assert np.allclose(decimated.t_array, full.t_array[::10])
+    assert np.allclose(decimated.r1_array, full.r1_array[::10])
+    assert np.allclose(decimated.r2_array, full.r2_array[::10])
+    assert np.allclose(decimated.r2, full.r2)
+
+
+def test_bbh_simulation_fixed_step_output_times():
+    output_times = np.array([0.0, 0.123, 0.5, 0.777, 1.0])
+    simulation = _circular_binary(integrator="rk4", output_times=output_times)
+    simulation.run()
+    reference = _circular_binary(
+        integrator="dopri5", rtol=1e-12, atol=1e-14, output_times=output_times
+    )
+    reference.run()
+
+    assert np.allclose(simulation.t_array, output_times)
+    assert np.allclose(simulation.r1_array[0], [0.0, 0.0, 0.0])
+    assert np.allclose(simulation.r1_array, reference.r1_array, atol=1e-8)
+    assert np.allclose(simulation.r2_array, reference.r2_array, atol=1e-8)
+
+
+@pytest.mark.parametrize("filename", ["run", "run.npy", "run.npz"])
+def test_bbh_simulation_save_load_binary(tmpdir, filename):
+    simulation = _circular_binary(pn_order=1)
+    simulation.run(velocities=True)
+    h_plus = np.ones(len(simulation.t_array))
+    path = str(tmpdir.join(filename))
+    format = "npy" if filename == "run" else None
+    simulation.save_data(path, format, waveform=(h_plus, 2 * h_plus))
+
+    loaded = BBHSimulation(
+        0.0, 0.0, np.zeros(3), np.zeros(3), np.zeros(3), np.zeros(3), 0.0, 0.0, 1.0
+    )
+    waveform = loaded.load_data(path, mmap=filename != "run.npz")
+
+    assert loaded.m1 == simulation.m1
+    assert loaded.pn_order == 1
+    assert loaded.dt == simulation.dt
+    assert np.allclose(loaded.t_array, simulation.t_array)
+    assert np.allclose(loaded.r1_array, simulation.r1_array)
+    assert np.allclose(loaded.r2_array_2d, simulation.r2_array_2d)
+    assert np.allclose(loaded.v2_array, simulation.v2_array)
+    assert np.allclose(waveform[1], 2 * h_plus)
+    if filename != "run.npz":
+        assert tmpdir.join(filename).isdir()
+        assert isinstance(loaded.r1_array, np.memmap)
+
+
+def test_bbh_simulation_save_npy_replaces_earlier_save(tmpdir):
+    simulation = _circular_binary()
+    simulation.run(velocities=True)
+    path = str(tmpdir.join("run"))
+    simulation.save_data(path, "npy", waveform=(simulation.t_array, simulation.t_array))
+
+    simulation = _circular_binary()
+    simulation.run()
+    simulation.save_data(path, "npy")
+    arrays, _ = load_arrays(path)
+    assert sorted(arrays) == ["r1", "r2", "t"]
+
+    loaded = _circular_binary()
+    assert loaded.load_data(path) is None
+    assert loaded.v1_array is None
+
+
+def test_bbh_simulation_save_without_extension_is_text(tmpdir):
+    simulation = _circular_binary()
+    simulation.run()
+    path = str(tmpdir.join("run"))
+    simulation.save_data(path)
+
+    assert tmpdir.join("run").isfile()
+    assert np.loadtxt(path).shape == (len(simulation.t_array), 10)
+
+
+def test_bbh_simulation_run_to_store(tmpdir):
+    reference = _circular_binary(pn_order=1)
+    reference.run()
+
+    store = TrajectoryStore(str(tmpdir.join("store")), chunk_size=16)
+    simulation = _circular_binary(pn_order=1)
+    simulation.run(store=store, chunk_size=10)
+
+    assert simulation.store is store
+    assert store.metadata["m1"] == simulation.m1
+    assert len(store) == len(reference.t_array)
+    assert np.allclose(store.read("t"), reference.t_array)
+    assert np.allclose(store.read("r1"), reference.r1_array)
+    assert np.allclose(store.read("r2"), reference.r2_array)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"pn_order": 1},
+        {"integrator": "rk4", "record_every": 3},
+        {"integrator": "rk4", "output_times": np.linspace(0.0, 1.0, 37)},
+        {"integrator": "dopri5", "reduced": True},
+    ],
+)
+def test_bbh_simulation_checkpoint_resume(tmpdir, kwargs):
+    reference = _circular_binary(**kwargs)
+    reference.run(velocities=True)
+
+    # Interrupt a run after two chunks
+    path = str(tmpdir.join("checkpoint.npz"))
+    simulation = _circular_binary(**kwargs)
+    chunks = simulation.iter_run(chunk_size=10)
+    next(chunks)
+    next(chunks)
+    simulation.checkpoint(path)
+
+    resumed = BBHSimulation.resume(path)
+    resumed.run(velocities=True)
+
+    assert np.array_equal(resumed.r1_array[20:], reference.r1_array[20:])
+    assert np.array_equal(resumed.v2_array[20:], reference.v2_array[20:])
+    assert np.all(np.isnan(resumed.r1_array[:20]))
+    assert np.array_equal(resumed.r2, reference.r2)
+    assert resumed.step_stats == reference.step_stats
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"pn_order": 1, "record_every": 3},
+        {"integrator": "dopri5"},
+    ],
+)
+def test_bbh_simulation_extend(kwargs):
+    reference = _circular_binary(t_end=2.0, **kwargs)
+    reference.run()
+
+    simulation = _circular_binary(**kwargs)
+    simulation.run()
+    n = len(simulation.t_array)
+    simulation.extend(2.0)
+
+    assert np.array_equal(simulation.t_array, reference.t_array)
+    assert np.array_equal(simulation.r1_array, reference.r1_array)
+    assert np.array_equal(simulation.r2_array_2d[n:], reference.r2_array_2d[n:])
+    assert np.array_equal(simulation.r2, reference.r2)
+
+
+def test_bbh_simulation_resume_into_store(tmpdir):
+    reference = _circular_binary()
+    reference.run()
+
+    # Write three chunks, checkpoint, then get killed after a fourth one
+    path = str(tmpdir.join("checkpoint.npz"))
+    store = TrajectoryStore(str(tmpdir.join("store")), chunk_size=16)
+    simulation = _circular_binary()
+    chunks = simulation.iter_run(chunk_size=10)
+    for i in range(4):
+        t, r1, r2, v1, v2 = next(chunks)
+        store.append(t, r1=r1, r2=r2, v1=v1, v2=v2)
+        if i == 2:
+            simulation.checkpoint(path)
+
+    resumed = BBHSimulation.resume(path)
+    store = TrajectoryStore(str(tmpdir.join("store")))
+    resumed.run(store=store, chunk_size=10)
+    resumed.extend(1.5)
+    reference.extend(1.5)
+
+    assert len(store) == len(reference.t_array)
+    assert np.array_equal(store.read("t"), reference.t_array)
+    assert np.array_equal(store.read("r1"), reference.r1_array)
+    assert np.array_equal(resumed.v2, reference.v2)
@@ -0,0 +1,43 @@
+import numpy as np
+from BBH_SIM.store import TrajectoryStore
+
+
+def test_trajectory_store_append_and_window(tmpdir):
+    path = str(tmpdir.join("store"))
+    store = TrajectoryStore(path, fields=("r1", "r2"), chunk_size=4)
+    t = np.arange(10.0)
+    r1 = np.column_stack((t, 2 * t, 3 * t))
+    store.append(t[:3], r1=r1[:3], r2=-r1[:3])
+    store.append(t[3:], r1=r1[3:], r2=-r1[3:])
+    store.flush()
+
+    assert len(store) == 10
+    assert len(store.chunks) == 3
+    assert store.t_range == (0.0, 9.0)
+
+    reopened = TrajectoryStore(path)
+    assert reopened.fields == ("r1", "r2")
+    window = reopened.window(2.5, 6.0)
+    assert np.allclose(window["t"], [3.0, 4.0, 5.0, 6.0])
+    assert np.allclose(window["r1"], r1[3:7])
+    assert np.allclose(window["r2"], -r1[3:7])
+    assert np.allclose(reopened.read("r1"), r1)
+    assert len(list(reopened.iter_chunks(4.5, 5.5))) == 1
+
+    reopened.append(np.array([10.0]), r1=np.ones((1, 3)), r2=np.ones((1, 3)))
+    assert len(TrajectoryStore(path)) == 11
+
+
+def test_trajectory_store_truncate(tmpdir):
+    path = str(tmpdir.join("store"))
+    store = TrajectoryStore(path, fields=("r1",), chunk_size=4)
+    t = np.arange(10.0)
+    store.append(t, r1=np.column_stack((t, t, t)))
+    store.truncate(6)
+
+    assert len(store.chunks) == 2
+    assert store.t_range == (0.0, 5.0)
+    store.append(np.array([6.0]), r1=np.zeros((1, 3)))
+    reopened = TrajectoryStore(path)
+    assert np.allclose(reopened.read("t"), np.arange(7.0))
+    assert not tmpdir.join("store", "chunk_000002.dat").exists()
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from BBH_SIM.surrogate import Surrogate, build_surrogate, simulate_waveforms
+from BBH_SIM.waveform import quadrupole_waveform
+
+
+def _params(m1, m2, **kwargs):
+    return dict(
+        m1=m1,
+        m2=m2,
+        r1_init=[0.0, 0.0, 0.0],
+        r2_init=[1.0, 0.0, 0.0],
+        v1_init=[0.0, 0.1, 0.0],
+        v2_init=[0.0, -0.1, 0.0],
+        t_start=0.0,
+        t_end=1.0,
+        dt=0.01,
+        **kwargs,
+    )
+
+
+def _grid(n):
+    masses = np.linspace(1e10, 2e10, n)
+    return [_params(m1, m2) for m1 in masses for m2 in masses]
+
+
+@pytest.mark.parametrize("method", ["svd", "greedy"])
+def test_surrogate_reproduces_training_set(method):
+    params = _grid(4)
+    t, h_plus, h_cross = simulate_waveforms(params)
+    surrogate = Surrogate.fit(t, h_plus, h_cross, params, method=method)
+
+    assert surrogate.names == ("m1", "m2")
+    assert np.allclose(
+        surrogate.basis @ surrogate.basis.conj().T, np.eye(len(surrogate))
+    )
+    # The interpolation is exact at the training points, up to the truncation
+    # of the basis at a squared error of 1e-10
+    assert surrogate.validate(params, h_plus, h_cross).max() < 1e-4
+
+
+def test_surrogate_vectorized_evaluation_and_error():
+    held_out = [_params(1.3e10, 1.7e10), _params(1.9e10, 1.1e10)]
+    surrogate = build_surrogate(_grid(5), validation=held_out, align="start")
+
+    assert surrogate.validation["max"] < 1e-2
+    single_plus, single_cross = surrogate.evaluate({"m1": 1.3e10, "m2": 1.7e10})
+    assert single_plus.shape == surrogate.t.shape
+    many_plus, many_cross = surrogate.evaluate(
+        {"m1": np.full(1000, 1.3e10), "m2": np.full(1000, 1.7e10)}
+    )
+    assert many_plus.shape == (1000, len(surrogate.t))
+    assert np.allclose(many_plus, single_plus)
+    assert np.allclose(many_cross, single_cross)
+
+
+def test_surrogate_peak_alignment_and_spins(tmp_path):
+    masses = np.linspace(1e10, 2e10, 3)
+    spins = np.linspace(0.0, 0.5, 3)
+    params = [
+        _params(m, 1e10, spin=True, spin1=[0.0, 0.0, s], spin2=[0.0, 0.0, 0.0])
+        for m in masses
+        for s in spins
+    ]
+    t, h_plus, h_cross = simulate_waveforms(params, waveform=quadrupole_waveform)
+    surrogate = Surrogate.fit(t, h_plus, h_cross, params, align="peak")
+    assert surrogate.names == ("m1", "m2", "spin1", "spin2")
+    # Only the varying components are interpolated
+    assert surrogate.mask.sum() == 2
+
+    # Waveforms are aligned with zero phase at the reference sample
+    h = np.array(surrogate.evaluate(params)).transpose(1, 0, 2)
+    reference = h[:, :, surrogate.reference]
+    assert np.allclose(reference[:, 1], 0.0, atol=1e-8 * np.abs(reference).max())
+
+    point = {"m1": 1.5e10, "m2": 1e10, "spin1": [0.0, 0.0, 0.2], "spin2": [0, 0, 0]}
+    for filename, format in [("a.npz", "npz"), ("b", "npz"), ("c", "npy")]:
+        path = str(tmp_path / filename)
+        surrogate.save(path, format=format)
+        loaded = Surrogate.load(path, format=format)
+        assert loaded.names == surrogate.names
+        for a, b in zip(surrogate.evaluate(point), loaded.evaluate(point)):
+            assert np.array_equal(a, b)
+    assert (tmp_path / "b.npz").is_file()
+    assert (tmp_path / "c").is_dir()
@@ -0,0 +1,94 @@
+import numpy as np
+from BBH_SIM.events import Event
+from BBH_SIM.simulation import BBHSimulation
+from BBH_SIM.sweep import parameter_grid, sweep
+from BBH_SIM.waveform import generate_waveform
+
+
+def _base_params():
+    return {
+        "m1": 1.0,
+        "m2": 1.0,
+        "r1_init": np.array([0.0, 0.0, 0.0]),
+        "r2_init": np.array([1.0, 0.0, 0.0]),
+        "v1_init": np.array([0.0, 0.1, 0.0]),
+        "v2_init": np.array([0.0, -0.1, 0.0]),
+        "t_start": 0.0,
+        "t_end": 1.0,
+        "dt": 0.1,
+    }
+
+
+def _after_half(t, r, v):
+    # Module level, so that workers can unpickle it
+    return t - 0.55
+
+
+def _run(p):
+    kwargs = {k: (v.copy() if isinstance(v, np.ndarray) else v) for k, v in p.items()}
+    simulation = BBHSimulation(**kwargs)
+    simulation.run()
+    return simulation
+
+
+def test_parameter_grid():
+    grid = parameter_grid({"m1": [1.0, 2.0], "pn_order": [0, 1, 2]})
+    assert len(grid) == 6
+    assert grid[0] == {"m1": 1.0, "pn_order": 0}
+    assert grid[-1] == {"m1": 2.0, "pn_order": 2}
+
+
+def test_sweep():
+    params = []
+    for m2, dt in [(1.0, 0.1), (2.0, 0.05), (3.0, 0.2)]:
+        p = _base_params()
+        p.update(m2=m2, dt=dt, pn_order=1)
+        params.append(p)
+
+    calls = []
+    result = sweep(
+        params,
+        max_workers=2,
+        chunksize=2,
+        progress=lambda done, total: calls.append((done, total)),
+    )
+
+    assert len(result) == 3
+    assert calls[-1] == (3, 3)
+    assert np.all(result.timings > 0)
+    for i, p in enumerate(params):
+        simulation = _run(p)
+        h_plus, h_cross = generate_waveform(
+            simulation.t_array,
+            simulation.r1_array,
+            simulation.r2_array,
+            p["m1"],
+            p["m2"],
+        )
+        assert np.allclose(result.t_arrays[i], simulation.t_array)
+        assert np.allclose(result.r1_arrays[i], simulation.r1_array)
+        assert np.allclose(result.r2_arrays[i], simulation.r2_array)
+        assert np.allclose(result.h_plus[i], h_plus)
+        assert np.allclose(result.h_cross[i], h_cross)
+
+
+def test_sweep_output_grids():
+    options = [
+        {"record_every": 3},
+        {"integrator": "dopri5", "output_times": np.array([0.0, 0.25, 0.7, 1.0])},
+        {"events": [Event(_after_half, terminal=True)]},
+        {"dt": 0.03},
+        {"m1": 4.3e23, "m2": 4.3e23, "t_end": "peters"},
+    ]
+    params = [dict(_base_params(), **option) for option in options]
+    result = sweep(params, max_workers=2, waveform=False)
+
+    assert result.h_plus is None
+    for i, p in enumerate(params):
+        simulation = _run(p)
+        assert result.n_samples[i] == len(simulation.t_array)
+        assert np.array_equal(result.t_arrays[i], simulation.t_array)
+        assert np.allclose(result.r1_arrays[i], simulation.r1_array)
+        assert np.allclose(result.r2_arrays[i], simulation.r2_array)
+    # The terminal event shortens its run below the 11 samples of the grid
+    assert result.n_samples[2] == 5
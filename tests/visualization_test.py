@@ -1,6 +1,18 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from BBH_SIM.visualization import plot_orbits_3d, plot_waveform, plot_from_file
+from BBH_SIM.simulation import BBHSimulation
+from BBH_SIM.store import TrajectoryStore
+from PIL import Image
+from BBH_SIM.visualization import (
+    animate_trajectories_2d,
+    animate_trajectories_3d,
+    plot_orbits_2d,
+    plot_orbits_3d,
+    plot_waveform,
+    plot_from_file,
+    _downsample_indices,
+    _frame_indices,
+)
 
 
 def test_plot_orbits_3d():
@@ -31,3 +43,131 @@ def test_plot_from_file(tmpdir):
     plt.close()
     plot_from_file(file_path, plot_type="waveform", show=False)
     plt.close()
+
+
+def test_plot_from_binary_file(tmpdir):
+    simulation = BBHSimulation(
+        1.0,
+        1.0,
+        np.array([0.0, 0.0, 0.0]),
+        np.array([1.0, 0.0, 0.0]),
+        np.array([0.0, 0.1, 0.0]),
+        np.array([0.0, -0.1, 0.0]),
+        0.0,
+        1.0,
+        0.1,
+    )
+    simulation.run()
+    for name, format in (("run", "npy"), ("run.npz", None)):
+        path = str(tmpdir.join(name))
+        simulation.save_data(path, format)
+        plot_from_file(path, plot_type="orbits", show=False)
+        plt.close()
+        plot_from_file(path, plot_type="waveform", show=False)
+        plt.close()
+
+
+def test_plot_from_store(tmpdir):
+    store = TrajectoryStore(
+        str(tmpdir.join("store")),
+        fields=("r1", "r2"),
+        chunk_size=8,
+        metadata={"m1": 1.0, "m2": 1.0},
+    )
+    t_array = np.linspace(0, 1, 20)
+    r = np.column_stack((np.cos(t_array), np.sin(t_array), t_array))
+    store.append(t_array, r1=r, r2=-r)
+    plot_orbits_3d(store, show=False)
+    plt.close()
+    plot_waveform(store, show=False)
+    plt.close()
+
+
+def test_frame_indices():
+    assert list(_frame_indices(10)) == list(range(1, 11))
+    assert list(_frame_indices(10, frame_stride=3)) == [3, 6, 9, 10]
+    assert list(_frame_indices(1000, max_frames=10)) == list(range(100, 1001, 100))
+
+
+def _helix(n=200):
+    t = np.linspace(0, 4 * np.pi, n)
+    r = np.column_stack((np.cos(t), np.sin(t), t))
+    return r, -r
+
+
+def test_animate_trajectories_trail(tmpdir):
+    r1, r2 = _helix()
+    ani = animate_trajectories_2d(
+        r1, r2, str(tmpdir.join("orbit.gif")), max_frames=5, trail=30, writer="pillow"
+    )
+    line1 = ani._fig.axes[0].lines[0]
+    assert len(line1.get_xdata()) == 30
+    assert Image.open(str(tmpdir.join("orbit.gif"))).n_frames == 5
+    plt.close("all")
+
+
+def test_animate_trajectories_parallel_export(tmpdir):
+    r1, r2 = _helix()
+    path = str(tmpdir.join("orbit.gif"))
+    ani = animate_trajectories_3d(
+        r1, r2, path, frame_stride=25, trail=50, writer="pillow", workers=2, dpi=20
+    )
+
+    assert ani is None
+    with Image.open(path) as image:
+        assert image.n_frames == 8
+        assert image.size == (128, 96)
+        assert image.info["loop"] == 0
+        image.seek(7)
+        assert image.info["duration"] == 30  # 1/30 s in whole centiseconds
+
+
+def test_animate_parallel_export_fractional_canvas(tmpdir):
+    r1, r2 = _helix()
+    path = str(tmpdir.join("orbit.gif"))
+    # 6.4 x 4.8 inches at 72 dpi is 460.8 x 345.6 pixels
+    with plt.rc_context({"figure.figsize": (6.4, 4.8)}):
+        animate_trajectories_2d(
+            r1, r2, path, max_frames=3, writer="pillow", workers=2, dpi=72
+        )
+
+    with Image.open(path) as image:
+        assert image.n_frames == 3
+        assert image.size == (460, 345)
+
+
+def test_downsample_indices_keep_extremes(tmpdir):
+    t = np.linspace(0, 1, 100000)
+    h = np.memmap(str(tmpdir.join("h.dat")), dtype=float, mode="w+", shape=(len(t), 2))
+    h[:, 0] = t**2 * np.sin(2 * np.pi * 200 * t**2)
+    h[:, 1] = t**2 * np.cos(2 * np.pi * 200 * t**2)
+    idx = _downsample_indices((h,), 2000)
+
+    assert len(idx) <= 2000
+    assert idx[0] == 0 and idx[-1] == len(t) - 1
+    assert np.all(np.diff(idx) > 0)
+    # The envelope of every segment of 1000 samples is kept
+    for start in range(0, len(t), 1000):
+        stop = start + 1000
+        segment = (idx >= start) & (idx < stop)
+        assert np.max(h[idx[segment], 0]) == np.max(h[start:stop, 0])
+        assert np.min(h[idx[segment], 1]) == np.min(h[start:stop, 1])
+    assert _downsample_indices((h,), None) is None
+
+
+def test_plots_downsample_large_inputs():
+    t = np.linspace(0, 10, 50000)
+    r = np.column_stack((np.cos(t), np.sin(t), t))
+    plot_waveform(t, np.sin(t), np.cos(t), show=False, max_points=1000)
+    assert len(plt.gca().lines[0].get_xdata()) <= 1000
+    plt.close()
+
+    plot_orbits_2d(r, -r, show=False, max_points=1000)
+    line = plt.gca().lines[0]
+    assert len(line.get_xdata()) <= 1000
+    assert line.get_marker() == "None"
+    plt.close()
+
+    plot_orbits_3d(r, -r, show=False, max_points=None)
+    assert len(plt.gca().lines[0].get_xdata()) == len(t)
+    plt.close()
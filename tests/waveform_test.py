@@ -1,5 +1,13 @@
 import numpy as np
-from BBH_SIM.waveform import generate_waveform, compute_h_plus, compute_h_cross
+from BBH_SIM.store import TrajectoryStore
+import pytest
+from BBH_SIM.dynamics import G, c
+from BBH_SIM.waveform import (
+    generate_waveform,
+    compute_h_plus,
+    compute_h_cross,
+    quadrupole_waveform,
+)
 
 
 def test_generate_waveform():
@@ -27,3 +35,127 @@ def test_compute_h_cross():
     m2 = 1.0
     h_cross = compute_h_cross(r, m1, m2)
     assert np.isclose(h_cross, 0.5)
+
+
+def test_generate_waveform_from_store(tmpdir):
+    t_array = np.linspace(0, 10, 100)
+    r1_array = np.zeros((100, 3))
+    r2_array = np.column_stack((1 + t_array, np.zeros(100), np.zeros(100)))
+    store = TrajectoryStore(
+        str(tmpdir.join("store")),
+        fields=("r1", "r2"),
+        chunk_size=30,
+        metadata={"m1": 1.0, "m2": 2.0},
+    )
+    store.append(t_array, r1=r1_array, r2=r2_array)
+
+    h_plus, h_cross = generate_waveform(store)
+    expected = generate_waveform(t_array, r1_array, r2_array, 1.0, 2.0)
+    assert np.allclose(h_plus, expected[0])
+    assert np.allclose(h_cross, expected[1])
+
+
+def test_generate_waveform_matches_per_point_functions():
+    rng = np.random.default_rng(1)
+    r1_array = rng.normal(size=(50, 3))
+    r2_array = rng.normal(size=(50, 3))
+    h_plus, h_cross = generate_waveform(np.arange(50.0), r1_array, r2_array, 1.0, 3.0)
+    for i in range(50):
+        r = r2_array[i] - r1_array[i]
+        assert np.isclose(h_plus[i], compute_h_plus(r, 1.0, 3.0))
+        assert np.isclose(h_cross[i], compute_h_cross(r, 1.0, 3.0))
+
+
+def test_generate_waveform_ensemble():
+    rng = np.random.default_rng(2)
+    r1_array = rng.normal(size=(3, 40, 3))
+    r2_array = rng.normal(size=(3, 40, 3))
+    m1 = np.array([1.0, 2.0, 5.0])
+    m2 = np.array([3.0, 1.0, 0.5])
+    h_plus, h_cross = generate_waveform(np.arange(40.0), r1_array, r2_array, m1, m2)
+
+    assert h_plus.shape == h_cross.shape == (3, 40)
+    for i in range(3):
+        single = generate_waveform(
+            np.arange(40.0), r1_array[i], r2_array[i], m1[i], m2[i]
+        )
+        assert np.allclose(h_plus[i], single[0])
+        assert np.allclose(h_cross[i], single[1])
+
+
+def _circular_orbit(n_orbits=5, n=10001):
+    m = 5e29
+    radius = 1e6
+    omega = np.sqrt(2 * G * m / radius**3)
+    t = np.linspace(0, n_orbits * 2 * np.pi / omega, n)
+    phase = omega * t
+    r = radius * np.stack((np.cos(phase), np.sin(phase), np.zeros(n)), axis=-1)
+    v = radius * omega * np.stack((-np.sin(phase), np.cos(phase), np.zeros(n)), axis=-1)
+    amplitude = 4 * G * (m / 2) * omega**2 * radius**2 / c**4
+    return t, m, r, v, omega, amplitude
+
+
+@pytest.mark.parametrize("inclination", [0.0, 0.7, np.pi / 2])
+def test_quadrupole_waveform_circular_orbit(inclination):
+    t, m, r, v, omega, amplitude = _circular_orbit()
+    a = -(omega**2) * r
+    h_plus, h_cross = quadrupole_waveform(
+        t, -r / 2, r / 2, m, m, -v / 2, v / 2, -a / 2, a / 2, inclination, 2.0
+    )
+
+    cos_i = np.cos(inclination)
+    expected_plus = -amplitude / 2 * (1 + cos_i**2) / 2 * np.cos(2 * omega * t)
+    expected_cross = -amplitude / 2 * cos_i * np.sin(2 * omega * t)
+    assert np.allclose(h_plus, expected_plus, atol=1e-9 * amplitude)
+    assert np.allclose(h_cross, expected_cross, atol=1e-9 * amplitude)
+
+    # Finite differences of the positions alone
+    h_plus_fd, _ = quadrupole_waveform(
+        t, -r / 2, r / 2, m, m, inclination=inclination, distance=2.0
+    )
+    assert np.allclose(h_plus_fd[2:-2], h_plus[2:-2], atol=1e-4 * amplitude)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 10, 1000])
+@pytest.mark.parametrize("velocities", [False, True])
+def test_quadrupole_waveform_from_store(tmpdir, chunk_size, velocities):
+    t, m, r, v, omega, amplitude = _circular_orbit(n_orbits=1, n=101)
+    # Uneven sampling, whose finite differences depend on the neighbouring steps
+    t = t + 0.3 * (t[1] - t[0]) * np.sin(np.arange(101))
+    fields = ("r1", "r2", "v1", "v2") if velocities else ("r1", "r2")
+    arrays = {"r1": -r / 2, "r2": r / 2, "v1": -v / 2, "v2": v / 2}
+    store = TrajectoryStore(
+        str(tmpdir.join("store")),
+        fields=fields,
+        chunk_size=chunk_size,
+        metadata={"m1": m, "m2": m},
+    )
+    store.append(t, **{name: arrays[name] for name in fields})
+
+    h_plus, h_cross = quadrupole_waveform(store, inclination=0.7)
+    expected = quadrupole_waveform(
+        t,
+        -r / 2,
+        r / 2,
+        m,
+        m,
+        arrays["v1"] if velocities else None,
+        arrays["v2"] if velocities else None,
+        inclination=0.7,
+    )
+    assert np.allclose(h_plus, expected[0], rtol=0, atol=1e-12 * amplitude)
+    assert np.allclose(h_cross, expected[1], rtol=0, atol=1e-12 * amplitude)
+
+
+def test_quadrupole_waveform_ensemble():
+    t, m, r, v, omega, amplitude = _circular_orbit(n=2001)
+    r1 = np.stack((-r / 2, -r))
+    r2 = np.stack((r / 2, r))
+    masses = np.array([m, 2 * m])
+    h_plus, h_cross = quadrupole_waveform(t, r1, r2, masses, masses)
+
+    assert h_plus.shape == (2, len(t))
+    for i in range(2):
+        single = quadrupole_waveform(t, r1[i], r2[i], masses[i], masses[i])
+        assert np.allclose(h_plus[i], single[0])
+        assert np.allclose(h_cross[i], single[1])